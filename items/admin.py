@@ -1,10 +1,12 @@
 from django.contrib import admin, messages
-from django.db import transaction
-from .models import Category, Item, Match, Message, Profile
-from .matching import find_matches_for, explain_match
-import logging
-
-log = logging.getLogger(__name__)
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from .models import Category, Item, Match, MatchJob, Message, OutboundMessage, Profile
+from .matching import explain_breakdown
+from .jobs import enqueue_match_jobs
+from .signals import items_approved
+from . import token_index
 
 @admin.register(Category)
 class CategoryAdmin(admin.ModelAdmin):
@@ -17,6 +19,9 @@ class LostMatchInline(admin.TabularInline):
     can_delete = False
     readonly_fields = ("found_item", "score", "status")
 
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related("found_item")
+
 
 class FoundMatchInline(admin.TabularInline):
     model = Match
@@ -25,72 +30,97 @@ class FoundMatchInline(admin.TabularInline):
     can_delete = False
     readonly_fields = ("lost_item", "score", "status")
 
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related("lost_item")
+
 
 def approve_items(modeladmin, request, queryset):
     """
-    Bulk-approve selected items and attempt to refresh matches.
+    Bulk-approve selected items and queue a match refresh for each.
     """
     items = list(queryset)
 
-    updated = queryset.update(approved=True)
-
-    refreshed = 0
-    for item in items:
-        try:
-            with transaction.atomic():
-                try:
-                    candidates = find_matches_for(item, include_unapproved=True)
-                except TypeError:
-                    candidates = find_matches_for(item)
-
-                for other, score in candidates:
-                    if item.status == 'LOST':
-                        Match.objects.get_or_create(
-                            lost_item=item, found_item=other, defaults={'score': score}
-                        )
-                    else:
-                        Match.objects.get_or_create(
-                            lost_item=other, found_item=item, defaults={'score': score}
-                        )
-                refreshed += 1
-        except Exception as e:
-            log.exception("Match refresh failed for item %s: %s", item.pk, e)
+    updated = queryset.update(approved=True, updated_at=timezone.now())
+    token_index.set_approved([item.pk for item in items])
+    items_approved.send(sender=Item, item_ids=[item.pk for item in items])
+    queued = enqueue_match_jobs(items, include_unapproved=True)
 
     modeladmin.message_user(
         request,
-        f"Approved {updated} item(s). Refreshed matches for {refreshed} item(s).",
+        f"Approved {updated} item(s). Queued match refresh for {queued} item(s).",
         level=messages.SUCCESS,
     )
 
 approve_items.short_description = "Approve selected items (and refresh matches)"
 
+
+def _match_count(side):
+    """Subquery counting an item's live matches on one side (lost_item/found_item)."""
+    matches = (
+        Match.objects.filter(**{side: OuterRef("pk")})
+        .exclude(status=Match.RETIRED)
+        .order_by()
+        .values(side)
+        .annotate(n=Count("pk"))
+        .values("n")
+    )
+    return Coalesce(Subquery(matches, output_field=IntegerField()), Value(0))
+
 @admin.register(Item)
 class ItemAdmin(admin.ModelAdmin):
     list_display = ('id','title','status','category','owner','approved','building','date_lost_or_found','match_count')
     list_filter  = ('approved','status','category','building')
     search_fields = ('title','description','brand','model_or_markings','room_or_area')
     autocomplete_fields = ('owner','category')
+    list_select_related = ('category','owner')
+    # Skip the second, unfiltered COUNT(*) on every changelist view.
+    show_full_result_count = False
     actions = [approve_items]
     inlines = [LostMatchInline, FoundMatchInline]
 
+    def get_queryset(self, request):
+        qs = super().get_queryset(request)
+        return qs.annotate(match_total=_match_count("lost_item") + _match_count("found_item"))
+
     def match_count(self, obj):
-        return obj.lost_matches.count() + obj.found_matches.count()
+        return obj.match_total
     match_count.short_description = "Potential matches"
+    match_count.admin_order_field = "match_total"
 
 @admin.register(Match)
 class MatchAdmin(admin.ModelAdmin):
     list_display = ('id', 'lost_item', 'found_item', 'score', 'status', 'created_at')
     list_filter = ('status',)
     search_fields = ('lost_item__title', 'found_item__title')
+    list_select_related = ('lost_item', 'found_item')
+    show_full_result_count = False
+    autocomplete_fields = ('lost_item', 'found_item')
 
     readonly_fields = ('explanation',)
 
     def explanation(self, obj):
-        """Show why this lost/found pair matched."""
-        return explain_match(obj.lost_item, obj.found_item)
+        """Show why this lost/found pair matched, from the stored breakdown."""
+        if not obj.score_breakdown:
+            return "No breakdown saved (run rebuild_match_breakdowns)."
+        return explain_breakdown(obj.score_breakdown)
 
     explanation.short_description = "Match criteria"
 
+@admin.register(MatchJob)
+class MatchJobAdmin(admin.ModelAdmin):
+    list_display = ('id', 'kind', 'item', 'status', 'attempts', 'run_after', 'locked_by', 'updated_at')
+    list_filter = ('status', 'kind')
+    list_select_related = ('item',)
+    readonly_fields = ('last_error',)
+
+@admin.register(OutboundMessage)
+class OutboundMessageAdmin(admin.ModelAdmin):
+    list_display = ('id', 'recipient', 'channel', 'address', 'subject', 'status', 'attempts', 'run_after', 'sent_at')
+    list_filter = ('status', 'channel')
+    list_select_related = ('recipient',)
+    raw_id_fields = ('recipient', 'notification')
+    readonly_fields = ('last_error',)
+
 @admin.register(Message)
 class MessageAdmin(admin.ModelAdmin):
     list_display = ('id','item','sender','receiver','sent_at','is_read')
@@ -0,0 +1,233 @@
+"""
+Read-only JSON API for kiosk and mobile clients.
+
+    GET /api/items/               approved items (status/category/building filters)
+    GET /api/items/<id>/          one item; unapproved ones only to their owner and staff
+    GET /api/matches/             live matches on the user's own items (all of them for staff)
+    GET /api/notifications/       the user's notifications
+
+Authentication is the site session. Lists page by keyset cursor (the `next`
+and `previous` links; ?limit= up to MAX_LIMIT) and ?fields=a,b keeps only
+those fields of each object.
+
+?updated_since=<ISO 8601 datetime> turns a list into a changes feed: rows
+updated at or after that time, oldest first. Clients sync incrementally by
+passing the largest updated_at they have stored; rows sharing that
+timestamp are sent again rather than skipped. The matches feed includes
+retired matches (status RETIRED), which the plain list hides. Deleted rows,
+and rows that leave the list's scope, are not reported.
+
+Every response has an ETag over the returned rows' ids and updated_at (and
+the requested fields); a matching If-None-Match gets an empty 304.
+"""
+import hashlib
+from functools import wraps
+
+from django.db.models import Q
+from django.http import JsonResponse
+from django.urls import reverse
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers, quote_etag
+from django.utils.dateparse import parse_datetime
+from django.utils import timezone
+from django.views.decorators.http import require_safe
+
+from . import search
+from .models import Item, Match, Notification
+from .pagination import KeysetPaginator
+
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 200
+
+
+def _attr(name):
+    return lambda obj: getattr(obj, name)
+
+
+ITEM_FIELDS = {
+    "id": _attr("pk"),
+    "url": lambda i: reverse("items:item_detail", args=[i.pk]),
+    "status": _attr("status"),
+    "title": _attr("title"),
+    "description": _attr("description"),
+    "category": lambda i: i.category.name,
+    "color_primary": _attr("color_primary"),
+    "brand": _attr("brand"),
+    "model_or_markings": _attr("model_or_markings"),
+    "building": _attr("building"),
+    "room_or_area": _attr("room_or_area"),
+    "date_lost_or_found": _attr("date_lost_or_found"),
+    "photo": lambda i: i.photo.url if i.photo else None,
+    "approved": _attr("approved"),
+    "date_reported": _attr("date_reported"),
+    "updated_at": _attr("updated_at"),
+}
+# Columns ITEM_FIELDS reads; skips the stored match features.
+ITEM_COLUMNS = [
+    "id", "status", "title", "description", "category__name", "color_primary", "brand",
+    "model_or_markings", "building", "room_or_area", "date_lost_or_found", "photo", "approved",
+    "date_reported", "updated_at", "owner",
+]
+
+MATCH_FIELDS = {
+    "id": _attr("pk"),
+    "lost_item": _attr("lost_item_id"),
+    "lost_item_title": lambda m: m.lost_item.title,
+    "found_item": _attr("found_item_id"),
+    "found_item_title": lambda m: m.found_item.title,
+    "score": _attr("score"),
+    "score_breakdown": _attr("score_breakdown"),
+    "status": _attr("status"),
+    "created_at": _attr("created_at"),
+    "updated_at": _attr("updated_at"),
+}
+
+NOTIFICATION_FIELDS = {
+    "id": _attr("pk"),
+    "title": _attr("title"),
+    "message": _attr("message"),
+    "url": _attr("url"),
+    "match": _attr("match_id"),
+    "is_read": _attr("is_read"),
+    "created_at": _attr("created_at"),
+    "updated_at": _attr("updated_at"),
+}
+
+
+class BadRequest(ValueError):
+    pass
+
+
+def _error(message, status=400):
+    return JsonResponse({"error": message}, status=status)
+
+
+def _requested_fields(request, available):
+    raw = request.GET.get("fields")
+    if not raw:
+        return list(available)
+    fields = [f.strip() for f in raw.split(",") if f.strip()]
+    unknown = [f for f in fields if f not in available]
+    if unknown:
+        raise BadRequest(f"Unknown fields: {', '.join(unknown)}. Available: {', '.join(available)}")
+    return fields
+
+
+def _updated_since(request):
+    raw = request.GET.get("updated_since")
+    if not raw:
+        return None
+    # A "+" in an unencoded offset arrives as a space.
+    value = parse_datetime(raw.replace(" ", "+"))
+    if value is None:
+        raise BadRequest("updated_since must be an ISO 8601 datetime")
+    return timezone.make_aware(value) if timezone.is_naive(value) else value
+
+
+def _limit(request):
+    raw = request.GET.get("limit", "")
+    if not raw:
+        return DEFAULT_LIMIT
+    if not raw.isdigit() or not 1 <= int(raw) <= MAX_LIMIT:
+        raise BadRequest(f"limit must be between 1 and {MAX_LIMIT}")
+    return int(raw)
+
+
+def _etag(fields, versions):
+    digest = hashlib.md5(",".join(fields).encode())
+    for pk, updated_at in versions:
+        digest.update(f"|{pk}:{updated_at.isoformat()}".encode())
+    return quote_etag(digest.hexdigest())
+
+
+def _respond(request, etag, build):
+    """304 if If-None-Match matches `etag`, else JSON of build()."""
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        response = JsonResponse(build())
+    response["ETag"] = etag
+    patch_cache_control(response, private=True, no_cache=True)
+    patch_vary_headers(response, ["Cookie"])
+    return response
+
+
+def _list(request, qs, available, ordering):
+    try:
+        fields = _requested_fields(request, available)
+        since = _updated_since(request)
+        limit = _limit(request)
+    except BadRequest as e:
+        return _error(str(e))
+    if since is not None:
+        qs, ordering = qs.filter(updated_at__gte=since), ("updated_at", "id")
+    page = KeysetPaginator(qs, ordering, limit).get_page(request.GET)
+
+    def link(query):
+        return request.build_absolute_uri(f"{request.path}?{query}") if query else None
+
+    versions = [(obj.pk, obj.updated_at) for obj in page]
+    cursors = [page.next_cursor or "", page.previous_cursor or ""]
+    return _respond(request, _etag(fields + cursors, versions), lambda: {
+        "results": [{name: available[name](obj) for name in fields} for obj in page],
+        "next": link(page.next_query),
+        "previous": link(page.previous_query),
+    })
+
+
+def _login_required(view):
+    """Like login_required, but a JSON 401 instead of a redirect to the login page."""
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if not request.user.is_authenticated:
+            return _error("Authentication required", status=401)
+        return view(request, *args, **kwargs)
+    return wrapper
+
+
+@require_safe
+def items(request):
+    qs = search.filter_items(Item.objects.filter(approved=True), request.GET)
+    qs = qs.select_related("category").only(*ITEM_COLUMNS)
+    return _list(request, qs, ITEM_FIELDS, ("-date_reported", "-id"))
+
+
+@require_safe
+def item(request, pk):
+    obj = Item.objects.select_related("category").only(*ITEM_COLUMNS).filter(pk=pk).first()
+    user = request.user
+    if obj is None or not (obj.approved or user.is_staff or obj.owner_id == user.id):
+        return _error("Not found", status=404)
+    try:
+        fields = _requested_fields(request, ITEM_FIELDS)
+    except BadRequest as e:
+        return _error(str(e))
+    return _respond(
+        request, _etag(fields, [(obj.pk, obj.updated_at)]),
+        lambda: {name: ITEM_FIELDS[name](obj) for name in fields},
+    )
+
+
+@require_safe
+@_login_required
+def matches(request):
+    qs = Match.objects.select_related("lost_item", "found_item").only(
+        "id", "score", "score_breakdown", "status", "created_at", "updated_at",
+        "lost_item__title", "found_item__title",
+    )
+    # Retired matches are hidden, as on item_detail and the review pages,
+    # except from the changes feed: a client that synced a match learns it
+    # was retired from its status.
+    if "updated_since" not in request.GET:
+        qs = qs.exclude(status=Match.RETIRED)
+    if not request.user.is_staff:
+        # Through the owner's item ids rather than joined owner columns, so
+        # each side is an index search instead of a scan of every match.
+        own = Item.objects.filter(owner=request.user).values("id")
+        qs = qs.filter(Q(lost_item__in=own) | Q(found_item__in=own))
+    return _list(request, qs, MATCH_FIELDS, ("-created_at", "-id"))
+
+
+@require_safe
+@_login_required
+def notifications(request):
+    qs = Notification.objects.filter(recipient=request.user)
+    return _list(request, qs, NOTIFICATION_FIELDS, ("-created_at", "-id"))
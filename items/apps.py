@@ -1,4 +1,7 @@
 from django.apps import AppConfig
 class ItemsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
-    name = 'items'
\ No newline at end of file
+    name = 'items'
+
+    def ready(self):
+        from . import checks, signals  # noqa: F401
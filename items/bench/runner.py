@@ -0,0 +1,113 @@
+"""
+Benchmark harness: times the matcher, the rebuild command and the main views
+against whatever data is in the database, and reports p50/p95 latency,
+query counts and peak memory per benchmark.
+"""
+import random
+import time
+import tracemalloc
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from items import page_cache
+from items.matching import find_matches_for, item_score_breakdown, store_matches
+from items.models import Item
+from items.score_cache import get_pair_cache
+
+User = get_user_model()
+
+
+def _percentile(values, pct):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(pct / 100 * (len(values) - 1))))]
+
+
+def measure(fn, args_list, setup=None):
+    """
+    Call fn(*args) for each args tuple, after an untimed setup() if given.
+    Returns latency percentiles (ms), queries per call and the peak traced
+    memory of one extra call (KiB).
+    """
+    timings, queries = [], []
+    for args in args_list:
+        if setup is not None:
+            setup()
+        with CaptureQueriesContext(connection) as ctx:
+            start = time.perf_counter()
+            fn(*args)
+            timings.append((time.perf_counter() - start) * 1000)
+        queries.append(len(ctx.captured_queries))
+
+    # Tracing slows everything down, so memory is measured on a separate call.
+    if setup is not None:
+        setup()
+    tracemalloc.start()
+    fn(*args_list[0])
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "samples": len(timings),
+        "p50_ms": round(_percentile(timings, 50), 3),
+        "p95_ms": round(_percentile(timings, 95), 3),
+        "mean_ms": round(sum(timings) / len(timings), 3),
+        "queries_mean": round(sum(queries) / len(queries), 1),
+        "queries_max": max(queries),
+        "peak_memory_kib": round(peak / 1024, 1),
+    }
+
+
+def _cold_find_matches(item):
+    cache = get_pair_cache()
+    if cache is not None:
+        cache.clear()
+    return find_matches_for(item)
+
+
+def _get(client, url):
+    response = client.get(url)
+    assert response.status_code == 200, (url, response.status_code)
+
+
+def run_suite(samples=50, seed=0):
+    """Run every benchmark; returns {benchmark name: metrics}."""
+    rng = random.Random(seed)
+    ids = list(Item.objects.filter(status__in=[Item.LOST, Item.FOUND]).values_list("pk", flat=True))
+    if not ids:
+        return {}
+    sample = list(Item.objects.filter(pk__in=rng.sample(ids, min(samples, len(ids)))))
+    lost = [i for i in sample if i.status == Item.LOST] or sample
+    found = [i for i in sample if i.status == Item.FOUND] or sample
+    pairs = [(rng.choice(lost), rng.choice(found)) for _ in range(samples)]
+
+    results = {
+        "item_score_breakdown": measure(item_score_breakdown, pairs),
+        "find_matches_for": measure(_cold_find_matches, [(i,) for i in sample]),
+    }
+
+    # Give the rebuild command a realistic set of matches to rescore.
+    for item in lost:
+        store_matches(item, find_matches_for(item))
+    results["rebuild_match_breakdowns"] = measure(
+        lambda: call_command("rebuild_match_breakdowns", stdout=StringIO()), [()] * 3
+    )
+
+    staff, _ = User.objects.get_or_create(username="bench-staff", defaults={"is_staff": True})
+    anonymous, client = Client(), Client()
+    client.force_login(staff)
+    views = {
+        "home": (anonymous, reverse("items:home")),
+        "item_list": (anonymous, reverse("items:item_list")),
+        "item_list_search": (anonymous, reverse("items:item_list") + "?q=laptop&status=LOST"),
+        "review_items": (client, reverse("items:review_items")),
+    }
+    for name, (c, url) in views.items():
+        # Drop cached listing fragments so each call renders the page.
+        results[name] = measure(_get, [(c, url)] * max(3, samples // 5), setup=page_cache.bump_listing_version)
+    return results
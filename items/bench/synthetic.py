@@ -0,0 +1,124 @@
+"""
+Seeded synthetic lost-and-found data for benchmarks.
+
+generate(n, seed) creates n items (plus categories and owners) with
+realistic titles, descriptions and locations. About a third of the lost
+items get a found counterpart describing the same object slightly
+differently, so the matcher has real work to do.
+"""
+import random
+from datetime import date, timedelta
+
+from django.contrib.auth import get_user_model
+
+from items.management.commands.seed_categories import DEFAULTS
+from items import search
+from items.models import Category, Item
+from items.token_index import index_items
+
+User = get_user_model()
+
+BUILDINGS = {
+    "Mammel Hall": ["Mammel Hall", "Mammel", "MH"],
+    "Peter Kiewit Institute": ["Peter Kiewit Institute", "PKI"],
+    "Criss Library": ["Criss Library", "Library"],
+    "Milo Bail Student Center": ["Milo Bail Student Center", "MBSC", "Student Center"],
+    "Arts and Sciences Hall": ["Arts and Sciences Hall", "ASH"],
+    "Durham Science Center": ["Durham Science Center", "DSC"],
+    "H&K": ["H&K", "HPER"],
+}
+ROOMS = ["Room 110", "Lobby", "2nd floor lounge", "Room 204", "Computer lab", "Study room B", "Cafeteria"]
+COLORS = ["Black", "Silver", "Blue", "Red", "White", "Grey", "Green", "Pink"]
+NOUNS = {
+    "Backpack": (["JanSport", "North Face", "Nike", "Herschel"], ["backpack", "bag", "bookbag"]),
+    "Laptop": (["Dell", "Apple", "HP", "Lenovo"], ["laptop", "notebook", "MacBook"]),
+    "Phone": (["Apple", "Samsung", "Google"], ["phone", "iPhone", "cell phone"]),
+    "Keys": (["Toyota", "Honda", "Ford"], ["keys", "key ring", "car key"]),
+    "ID Card": (["UNO"], ["MavCard", "ID card", "student ID"]),
+    "Water Bottle": (["Hydro Flask", "Yeti", "Nalgene"], ["water bottle", "bottle", "tumbler"]),
+    "Clothing": (["Nike", "Adidas", "Columbia"], ["jacket", "hoodie", "sweatshirt"]),
+    "Calculator": (["TI", "Casio"], ["calculator", "graphing calculator"]),
+    "Headphones": (["Sony", "Bose", "Apple"], ["headphones", "earbuds", "AirPods"]),
+}
+DETAILS = [
+    "has a sticker on the back", "small scratch near the corner", "name written inside",
+    "in a black case", "left on a table", "near the printers", "under a chair",
+    "with a keychain attached", "cracked screen", "initials on the tag",
+]
+
+
+def _description(rng, noun, building, room):
+    sentences = [f"{rng.choice(['Lost', 'Found', 'Left'])} my {noun} in {building}, {room.lower()}."]
+    sentences += [d.capitalize() + "." for d in rng.sample(DETAILS, rng.randint(0, 3))]
+    return " ".join(sentences)
+
+
+def _item(rng, owner, category, status, base_day, like=None):
+    brands, nouns = NOUNS.get(category.name, (["Generic"], [category.name.lower()]))
+    if like is None:
+        canonical = rng.choice(list(BUILDINGS))
+        color, brand, noun = rng.choice(COLORS), rng.choice(brands), rng.choice(nouns)
+        room, model = rng.choice(ROOMS), f"{rng.choice('ABCDEFX')}{rng.randint(100, 9999)}"
+        day = base_day - timedelta(days=rng.randint(0, 365))
+    else:
+        # Same object seen by someone else: same facts, different wording.
+        canonical = like["building"]
+        color, brand, room, model = like["color"], like["brand"], like["room"], like["model"]
+        noun = rng.choice(nouns)
+        day = like["day"] + timedelta(days=rng.randint(0, 5))
+    building = rng.choice(BUILDINGS[canonical])
+    item = Item(
+        owner=owner,
+        category=category,
+        status=status,
+        title=f"{color} {brand} {noun}",
+        description=_description(rng, noun, building, room),
+        color_primary=color,
+        brand=brand,
+        model_or_markings=model if rng.random() < 0.6 else "",
+        building=building,
+        room_or_area=room,
+        date_lost_or_found=day,
+        approved=rng.random() < 0.9,
+    )
+    item.refresh_match_features()
+    facts = dict(building=canonical, color=color, brand=brand, room=room, model=model, day=day)
+    return item, facts
+
+
+def generate(n, seed=0, batch_size=2000, owners=50):
+    """Create n synthetic items; returns the number created."""
+    rng = random.Random(seed)
+    categories = [Category.objects.get_or_create(name=name)[0] for name in DEFAULTS]
+    users = [
+        User.objects.get_or_create(username=f"bench{seed}_{i}")[0]
+        for i in range(owners)
+    ]
+    base_day = date.today()
+
+    created = 0
+    batch = []
+    while created + len(batch) < n:
+        category = rng.choice(categories)
+        lost, facts = _item(rng, rng.choice(users), category, Item.LOST, base_day)
+        batch.append(lost)
+        if rng.random() < 0.33 and created + len(batch) < n:
+            found, _ = _item(rng, rng.choice(users), category, Item.FOUND, base_day, like=facts)
+            batch.append(found)
+        elif rng.random() < 0.5 and created + len(batch) < n:
+            found, _ = _item(rng, rng.choice(users), rng.choice(categories), Item.FOUND, base_day)
+            batch.append(found)
+        if len(batch) >= batch_size:
+            created += _flush(batch)
+            batch = []
+    if batch:
+        created += _flush(batch)
+    return created
+
+
+def _flush(batch):
+    # bulk_create skips save() and signals, so index the rows explicitly.
+    Item.objects.bulk_create(batch)
+    index_items(batch)
+    search.index_items(batch)
+    return len(batch)
@@ -0,0 +1,39 @@
+from django.conf import settings
+from django.contrib.staticfiles.storage import ManifestFilesMixin, staticfiles_storage
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.checks import Error, Warning, register
+
+# setting -> (default alias, what goes wrong with a per-process cache, check id)
+SHARED_CACHES = {
+    "UNREAD_COUNT_CACHE": ("default", "unread badges will disagree between workers", "items.W001"),
+    "PUBLIC_PAGE_CACHE": ("default", "listing version bumps won't reach other workers", "items.W002"),
+}
+
+
+@register(deploy=True)
+def check_shared_caches(app_configs, **kwargs):
+    """Counters adjusted in one worker must be visible to the others."""
+    errors = []
+    for setting, (default, problem, check_id) in SHARED_CACHES.items():
+        alias = getattr(settings, setting, default)
+        if alias and isinstance(caches[alias], LocMemCache):
+            errors.append(Warning(
+                f"{setting} uses the per-process cache {alias!r}; {problem}.",
+                hint="Point it at a shared backend such as Redis or Memcached.",
+                id=check_id,
+            ))
+    return errors
+
+
+@register(deploy=True)
+def check_static_manifest(app_configs, **kwargs):
+    """Hashed static storage can't resolve any {% static %} tag without its manifest."""
+    if isinstance(staticfiles_storage, ManifestFilesMixin) and staticfiles_storage.read_manifest() is None:
+        return [Error(
+            f"No static files manifest ({staticfiles_storage.manifest_name}) in STATIC_ROOT; "
+            "every {% static %} tag will raise ValueError.",
+            hint="Run collectstatic as part of the deploy.",
+            id="items.E001",
+        )]
+    return []
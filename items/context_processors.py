@@ -1,12 +1,10 @@
-from .models import Notification
+from . import live, unread
 
 def unread_notifications(request):
     if not request.user.is_authenticated:
         return {"unread_notifications_count": 0}
 
-    count = Notification.objects.filter(
-        recipient=request.user,
-        is_read=False
-    ).count()
-
-    return {"unread_notifications_count": count}
+    return {
+        "unread_notifications_count": unread.unread_count(request.user.id),
+        "live_notifications": live.stream_enabled(),
+    }
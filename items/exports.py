@@ -0,0 +1,169 @@
+"""
+Streaming exports of items, matches and notifications as CSV or NDJSON.
+
+Rows are read with QuerySet.iterator() over select_related/only() querysets
+and encoded one at a time into ~64 KB chunks, so memory stays flat however
+many rows there are. The export view returns the chunks as a
+StreamingHttpResponse (through items.streaming, so ASGI sends them as they
+are produced instead of collecting the whole body first); the export_data
+command writes them to a file, which is the better fit for very large
+exports since it holds no web worker.
+
+Every dataset takes the item_list filters (q, status, category, building;
+applied to the match's lost item for matches and notifications) plus
+since/until dates (YYYY-MM-DD, inclusive) on its creation date.
+"""
+import csv
+import json
+from datetime import datetime, time, timedelta
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from . import search
+from .models import Item, Match, Notification
+
+CHUNK_ROWS = 2000
+CHUNK_BYTES = 64 * 1024
+FORMATS = {"csv": "text/csv; charset=utf-8", "ndjson": "application/x-ndjson"}
+ITEM_FILTERS = ("q", "status", "category", "building")
+
+
+def _iso(value):
+    return value.isoformat() if value else None
+
+
+def _filtered_items(params):
+    qs = search.filter_items(Item.objects.all(), params)
+    return search.search(qs, params["q"]) if params.get("q") else qs
+
+
+def _items(params):
+    qs = _filtered_items(params)
+    if not params.get("q"):
+        qs = qs.order_by("pk")
+    return qs.select_related("category", "owner").only(
+        "id", "external_id", "status", "title", "description", "color_primary", "brand",
+        "model_or_markings", "building", "room_or_area", "date_lost_or_found", "date_reported",
+        "updated_at", "approved", "category__name", "owner__username",
+    )
+
+
+def _matches(params):
+    qs = Match.objects.all()
+    if any(params.get(name) for name in ITEM_FILTERS):
+        qs = qs.filter(lost_item__in=_filtered_items(params).values("pk"))
+    return qs.order_by("pk").select_related("lost_item", "found_item").only(
+        "id", "score", "status", "created_at", "score_breakdown",
+        "lost_item__id", "lost_item__title", "found_item__id", "found_item__title",
+    )
+
+
+def _notifications(params):
+    qs = Notification.objects.all()
+    if any(params.get(name) for name in ITEM_FILTERS):
+        qs = qs.filter(match__lost_item__in=_filtered_items(params).values("pk"))
+    return qs.order_by("pk").select_related("recipient").only(
+        "id", "title", "message", "url", "is_read", "created_at", "match_id", "recipient__username",
+    )
+
+
+# dataset -> (queryset builder, date field for since/until, [(column, getter)])
+DATASETS = {
+    "items": (_items, "date_reported", [
+        ("id", lambda i: i.pk),
+        ("external_id", lambda i: i.external_id),
+        ("status", lambda i: i.status),
+        ("title", lambda i: i.title),
+        ("description", lambda i: i.description),
+        ("category", lambda i: i.category.name),
+        ("color_primary", lambda i: i.color_primary),
+        ("brand", lambda i: i.brand),
+        ("model_or_markings", lambda i: i.model_or_markings),
+        ("building", lambda i: i.building),
+        ("room_or_area", lambda i: i.room_or_area),
+        ("date_lost_or_found", lambda i: _iso(i.date_lost_or_found)),
+        ("date_reported", lambda i: _iso(i.date_reported)),
+        ("updated_at", lambda i: _iso(i.updated_at)),
+        ("approved", lambda i: i.approved),
+        ("owner", lambda i: i.owner.username),
+    ]),
+    "matches": (_matches, "created_at", [
+        ("id", lambda m: m.pk),
+        ("lost_item_id", lambda m: m.lost_item.pk),
+        ("lost_item_title", lambda m: m.lost_item.title),
+        ("found_item_id", lambda m: m.found_item.pk),
+        ("found_item_title", lambda m: m.found_item.title),
+        ("score", lambda m: m.score),
+        ("status", lambda m: m.status),
+        ("created_at", lambda m: _iso(m.created_at)),
+        ("score_breakdown", lambda m: m.score_breakdown),
+    ]),
+    "notifications": (_notifications, "created_at", [
+        ("id", lambda n: n.pk),
+        ("recipient", lambda n: n.recipient.username),
+        ("match_id", lambda n: n.match_id),
+        ("title", lambda n: n.title),
+        ("message", lambda n: n.message),
+        ("url", lambda n: n.url),
+        ("is_read", lambda n: n.is_read),
+        ("created_at", lambda n: _iso(n.created_at)),
+    ]),
+}
+
+
+def export_queryset(dataset, params):
+    """
+    The rows of `dataset` filtered by `params` (a dict or QueryDict). Raises
+    KeyError for an unknown dataset and ValueError for a malformed date.
+    """
+    build, date_field, _columns = DATASETS[dataset]
+    qs = build(params)
+    for name, lookup, offset in (("since", "gte", 0), ("until", "lt", 1)):
+        value = params.get(name)
+        if value:
+            day = parse_date(value)
+            if day is None:
+                raise ValueError(f"{name} must be a date (YYYY-MM-DD), not {value!r}")
+            # A datetime bound rather than __date, so an index on the field applies.
+            bound = timezone.make_aware(datetime.combine(day + timedelta(days=offset), time.min))
+            qs = qs.filter(**{f"{date_field}__{lookup}": bound})
+    return qs
+
+
+class _Echo:
+    """File-like object whose write() hands back the line, for csv.writer."""
+
+    def write(self, value):
+        return value
+
+
+def _csv_value(value):
+    return json.dumps(value) if isinstance(value, (dict, list)) else value
+
+
+def _lines(dataset, fmt, rows):
+    columns = DATASETS[dataset][2]
+    if fmt == "csv":
+        writer = csv.writer(_Echo())
+        yield writer.writerow([name for name, _ in columns])
+        for row in rows:
+            yield writer.writerow([_csv_value(get(row)) for _, get in columns])
+    else:
+        encoder = DjangoJSONEncoder(separators=(",", ":"))
+        for row in rows:
+            yield encoder.encode({name: get(row) for name, get in columns}) + "\n"
+
+
+def stream(dataset, fmt, queryset):
+    """Encoded export of `queryset`, yielded in chunks of about CHUNK_BYTES."""
+    buffer, size = [], 0
+    for line in _lines(dataset, fmt, queryset.iterator(chunk_size=CHUNK_ROWS)):
+        buffer.append(line)
+        size += len(line)
+        if size >= CHUNK_BYTES:
+            yield "".join(buffer)
+            buffer, size = [], 0
+    if buffer:
+        yield "".join(buffer)
@@ -0,0 +1,76 @@
+"""
+Normalized match features for items.
+
+These are computed once when an Item is saved and stored on the row, so the
+matcher can compare items without re-normalizing their text for every pair.
+"""
+import re
+import zlib
+
+WORD_RE = re.compile(r"[a-z0-9]+")
+
+# Max number of hashed trigrams kept per text signature (bottom-k sketch).
+SIGNATURE_SIZE = 64
+
+
+def norm(s):
+    return WORD_RE.findall((s or "").lower())
+
+
+def tokens(s):
+    """Sorted, de-duplicated word tokens of a string."""
+    return sorted(set(norm(s)))
+
+
+def key(s):
+    return (s or "").strip().lower()
+
+
+def shingle_signature(text, size=SIGNATURE_SIZE):
+    """
+    Bottom-k sketch of the character trigrams in `text`.
+
+    Trigrams are hashed with crc32 (stable across processes) and the `size`
+    smallest hashes are kept, sorted. Short texts keep every trigram.
+    """
+    text = " ".join(norm(text))
+    if not text:
+        return []
+    if len(text) < 3:
+        grams = {text}
+    else:
+        grams = {text[i:i + 3] for i in range(len(text) - 2)}
+    return sorted({zlib.crc32(g.encode("utf-8")) for g in grams})[:size]
+
+
+def match_features(item):
+    """Feature column values for an item, keyed by field name."""
+    return {
+        "building_key": key(item.building),
+        "color_key": key(item.color_primary),
+        "brand_tokens": tokens(item.brand),
+        "model_tokens": tokens(item.model_or_markings),
+        "room_tokens": tokens(item.room_or_area),
+        "title_shingles": shingle_signature(item.title),
+        "description_shingles": shingle_signature(item.description),
+    }
+
+
+def fill_match_features(item_model, batch_size=500):
+    """
+    Recompute the feature columns of every row of `item_model` (Item, or
+    its historical version in a migration), walking the table in pk order
+    one batch at a time so no cursor is open while a batch is written.
+    Returns the number of rows updated.
+    """
+    updated, last_pk = 0, 0
+    while True:
+        batch = list(item_model.objects.filter(pk__gt=last_pk).order_by("pk")[:batch_size])
+        if not batch:
+            return updated
+        for item in batch:
+            for name, value in match_features(item).items():
+                setattr(item, name, value)
+        item_model.objects.bulk_update(batch, list(match_features(batch[0])))
+        updated += len(batch)
+        last_pk = batch[-1].pk
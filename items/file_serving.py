@@ -0,0 +1,181 @@
+"""
+Media and static file serving for deployments without a separate file server.
+
+serve() is a drop-in replacement for django.views.static.serve that adds:
+
+- ETag / Last-Modified validation (304 responses),
+- single-range HTTP Range requests (206 / 416),
+- far-future immutable caching for hashed static names (app.1a2b3c4d5e6f.css),
+- precompressed .br / .gz siblings chosen by Accept-Encoding,
+- offloading the body to the front-end server with X-Sendfile or
+  X-Accel-Redirect (settings.FILE_SERVING_SENDFILE), falling back to
+  streaming the file in chunks from Python (as an async iterator under
+  ASGI, see items.streaming).
+
+Settings:
+
+    FILE_SERVING_SENDFILE = None | "x-sendfile" | "x-accel-redirect"
+    FILE_SERVING_ACCEL_LOCATIONS = {"/srv/app/media": "/_protected/media/"}
+    FILE_SERVING_MAX_AGE = 3600      # for names without a content hash
+"""
+import mimetypes
+import os
+import re
+from pathlib import Path
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import Http404, HttpResponse, StreamingHttpResponse
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers, quote_etag
+from django.utils.http import http_date
+from django.views.decorators.http import require_safe
+
+from .streaming import streaming_body
+
+CHUNK_SIZE = 64 * 1024
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+
+# ManifestStaticFilesStorage inserts a 12 hex digit content hash before the extension.
+HASHED_NAME_RE = re.compile(r"\.[0-9a-f]{12}\.[^./]+$")
+RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+# Accept-Encoding token -> file suffix, in order of preference.
+PRECOMPRESSED = (("br", ".br"), ("gzip", ".gz"))
+
+
+def _accepts(request, coding):
+    accepted = request.META.get("HTTP_ACCEPT_ENCODING", "")
+    return any(part.split(";")[0].strip() == coding for part in accepted.split(","))
+
+
+def _pick_variant(request, fullpath):
+    """(path to send, content coding or None) honouring precompressed siblings."""
+    for coding, suffix in PRECOMPRESSED:
+        candidate = fullpath.with_name(fullpath.name + suffix)
+        if _accepts(request, coding) and candidate.is_file():
+            return candidate, coding
+    return fullpath, None
+
+
+def _has_precompressed(fullpath):
+    return any(fullpath.with_name(fullpath.name + suffix).is_file() for _, suffix in PRECOMPRESSED)
+
+
+def parse_range(header, size):
+    """
+    (start, end) inclusive for a single "bytes=" range, None to ignore the
+    header (absent, malformed or multi-range), or "unsatisfiable".
+    """
+    match = RANGE_RE.match(header.strip()) if header else None
+    if not match:
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:  # suffix range: the last N bytes
+        length = int(last)
+        if length == 0:
+            return "unsatisfiable"
+        return max(0, size - length), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        return "unsatisfiable"
+    return start, end
+
+
+def _file_chunks(path, start, length):
+    with open(path, "rb") as f:
+        f.seek(start)
+        while length > 0:
+            chunk = f.read(min(CHUNK_SIZE, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+
+
+def _sendfile_response(path, document_root):
+    mode = getattr(settings, "FILE_SERVING_SENDFILE", None)
+    if mode == "x-sendfile":
+        response = HttpResponse()
+        response["X-Sendfile"] = str(path)
+        return response
+    if mode == "x-accel-redirect":
+        locations = getattr(settings, "FILE_SERVING_ACCEL_LOCATIONS", {})
+        prefix = locations.get(str(document_root))
+        if prefix is None:
+            return None
+        response = HttpResponse()
+        relative = path.relative_to(document_root).as_posix()
+        response["X-Accel-Redirect"] = prefix.rstrip("/") + "/" + relative
+        return response
+    if mode:
+        raise ValueError(f"Unknown FILE_SERVING_SENDFILE mode: {mode!r}")
+    return None
+
+
+@require_safe
+def serve(request, path, document_root=None):
+    """Serve `path` from `document_root`; see the module docstring."""
+    try:
+        fullpath = Path(safe_join(document_root, path))
+    except SuspiciousFileOperation:
+        raise Http404("Invalid path")
+    if not fullpath.is_file():
+        raise Http404(f"“{path}” does not exist")
+
+    sent, coding = _pick_variant(request, fullpath)
+    stat = sent.stat()
+    etag = quote_etag(f"{stat.st_size:x}-{stat.st_mtime_ns:x}" + (f"-{coding}" if coding else ""))
+    last_modified = int(stat.st_mtime)
+
+    def finish(response):
+        response["ETag"] = etag
+        response["Last-Modified"] = http_date(last_modified)
+        if HASHED_NAME_RE.search(fullpath.name):
+            patch_cache_control(response, public=True, max_age=IMMUTABLE_MAX_AGE, immutable=True)
+        else:
+            patch_cache_control(response, public=True, max_age=getattr(settings, "FILE_SERVING_MAX_AGE", 3600))
+        if coding or _has_precompressed(fullpath):
+            patch_vary_headers(response, ["Accept-Encoding"])
+        return response
+
+    not_modified = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if not_modified is not None:
+        return finish(not_modified)
+
+    content_type, original_encoding = mimetypes.guess_type(str(fullpath))
+    content_type = content_type or "application/octet-stream"
+
+    def headers(response):
+        response["Content-Type"] = content_type
+        if coding or original_encoding:
+            response["Content-Encoding"] = coding or original_encoding
+        return finish(response)
+
+    offloaded = _sendfile_response(sent, Path(os.path.abspath(document_root)))
+    if offloaded is not None:
+        return headers(offloaded)
+
+    size = stat.st_size
+    byte_range = None
+    if_range = request.META.get("HTTP_IF_RANGE")
+    if if_range is None or if_range == etag:
+        byte_range = parse_range(request.META.get("HTTP_RANGE"), size)
+
+    if byte_range == "unsatisfiable":
+        response = HttpResponse(status=416)
+        response["Content-Range"] = f"bytes */{size}"
+        return finish(response)
+
+    start, end = byte_range or (0, size - 1)
+    length = max(0, end - start + 1)
+    body = () if request.method == "HEAD" else _file_chunks(sent, start, length)
+    response = StreamingHttpResponse(streaming_body(request, body), status=206 if byte_range else 200)
+    response["Content-Length"] = str(length)
+    response["Accept-Ranges"] = "bytes"
+    if byte_range:
+        response["Content-Range"] = f"bytes {start}-{end}/{size}"
+    return headers(response)
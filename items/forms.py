@@ -37,6 +37,13 @@ class ItemForm(forms.ModelForm):
         ]
 
 
+class ImportItemForm(ItemForm):
+    """ItemForm rules for import_items rows; the command resolves category and owner itself."""
+
+    class Meta(ItemForm.Meta):
+        fields = [f for f in ItemForm.Meta.fields if f not in ("category", "photo")]
+
+
 class ProfileForm(forms.ModelForm):
     class Meta:
         model = User
@@ -0,0 +1,168 @@
+"""
+Database-backed queue for match generation and other post-save work.
+
+Views enqueue a MatchJob instead of scoring inline, and saving a new photo
+queues a thumbnail build; the run_match_worker command claims jobs under a
+lease, runs them, retries failures with exponential backoff and marks a
+job DEAD once it runs out of attempts.
+"""
+import logging
+from datetime import timedelta
+
+from django.db import IntegrityError, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from . import thumbnails
+from .matching import find_matches_for, rescore_existing_matches, store_matches
+from .models import Item, MatchJob
+
+logger = logging.getLogger(__name__)
+
+BACKOFF_BASE_SECONDS = 30
+BACKOFF_MAX_SECONDS = 3600
+
+
+def backoff_delay(attempts, base=BACKOFF_BASE_SECONDS, cap=BACKOFF_MAX_SECONDS):
+    """Delay before retry number `attempts` (1-based): base, 2*base, 4*base, ... up to cap."""
+    return timedelta(seconds=min(cap, base * 2 ** max(0, attempts - 1)))
+
+
+def enqueue_match_job(item, include_unapproved=False):
+    """Queue match generation for an item, reusing its pending job if there is one."""
+    job, created = MatchJob.objects.get_or_create(
+        item=item,
+        kind=MatchJob.MATCH,
+        status=MatchJob.PENDING,
+        defaults={"include_unapproved": include_unapproved},
+    )
+    if not created and include_unapproved and not job.include_unapproved:
+        MatchJob.objects.filter(pk=job.pk).update(include_unapproved=True)
+        job.include_unapproved = True
+    return job
+
+
+def enqueue_match_jobs(items, include_unapproved=False):
+    """Bulk version of enqueue_match_job. Returns the number of items queued."""
+    ids = [item.pk for item in items]
+    pending = MatchJob.objects.filter(item_id__in=ids, kind=MatchJob.MATCH, status=MatchJob.PENDING)
+    if include_unapproved:
+        pending.update(include_unapproved=True)
+    queued = set(pending.values_list("item_id", flat=True))
+    MatchJob.objects.bulk_create(
+        [MatchJob(item_id=pk, include_unapproved=include_unapproved) for pk in ids if pk not in queued],
+        ignore_conflicts=True,
+    )
+    return len(ids)
+
+
+def enqueue_batch_match_job(items, include_unapproved=False):
+    """
+    Queue one job generating matches for all of `items`, for bulk inserts
+    where a job per item would only add queue traffic. Items deleted
+    before it runs are skipped.
+    """
+    return MatchJob.objects.create(item_ids=[item.pk for item in items], include_unapproved=include_unapproved)
+
+
+def enqueue_thumbnail_job(item):
+    """Queue building the item's photo thumbnails, reusing its pending job if there is one."""
+    job, _created = MatchJob.objects.get_or_create(item=item, kind=MatchJob.THUMBNAILS, status=MatchJob.PENDING)
+    return job
+
+
+def refresh_matches_after_edit(item, changed_fields):
+    """
+    Update an edited item's matches. If a field that decides candidates
+    changed, queue a full candidate search; otherwise rescore only the
+    affected components of the existing matches.
+    """
+    changed_fields = set(changed_fields)
+    if changed_fields & item.CANDIDATE_FIELDS:
+        enqueue_match_job(item)
+        return
+    rescore_existing_matches(item, changed_fields)
+
+
+def claim_jobs(worker_id, limit=10, lease_seconds=300):
+    """
+    Claim up to `limit` runnable jobs: pending jobs that are due, and running
+    jobs whose lease expired (their worker died). Each claim is a conditional
+    UPDATE, so two workers never take the same job.
+    """
+    now = timezone.now()
+    claimable = Q(status=MatchJob.PENDING, run_after__lte=now) | Q(
+        status=MatchJob.RUNNING, lease_expires_at__lt=now
+    )
+    candidates = list(
+        MatchJob.objects.filter(claimable).order_by("run_after", "pk").values_list("pk", flat=True)[:limit]
+    )
+    claimed = []
+    for pk in candidates:
+        taken = MatchJob.objects.filter(claimable, pk=pk).update(
+            status=MatchJob.RUNNING,
+            locked_by=worker_id,
+            lease_expires_at=now + timedelta(seconds=lease_seconds),
+            attempts=F("attempts") + 1,
+            updated_at=now,
+        )
+        if taken:
+            claimed.append(pk)
+    return list(MatchJob.objects.filter(pk__in=claimed).select_related("item").order_by("pk"))
+
+
+def job_items(job):
+    if job.item_id is not None:
+        return [job.item]
+    return list(Item.objects.filter(pk__in=job.item_ids).order_by("pk"))
+
+
+def run_job(job):
+    if job.kind == MatchJob.THUMBNAILS:
+        thumbnails.ensure_thumbnails(job.item)
+        return
+    with transaction.atomic():
+        for item in job_items(job):
+            store_matches(item, find_matches_for(item, include_unapproved=job.include_unapproved))
+
+
+def complete_job(job):
+    MatchJob.objects.filter(pk=job.pk).update(
+        status=MatchJob.DONE, lease_expires_at=None, last_error="", updated_at=timezone.now(),
+    )
+
+
+def fail_job(job, error):
+    now = timezone.now()
+    if job.attempts >= job.max_attempts:
+        MatchJob.objects.filter(pk=job.pk).update(
+            status=MatchJob.DEAD, lease_expires_at=None, last_error=error, updated_at=now,
+        )
+        return
+    try:
+        with transaction.atomic():
+            MatchJob.objects.filter(pk=job.pk).update(
+                status=MatchJob.PENDING,
+                run_after=now + backoff_delay(job.attempts),
+                lease_expires_at=None,
+                last_error=error,
+                updated_at=now,
+            )
+    except IntegrityError:
+        # The item was queued again meanwhile; that job covers this one.
+        MatchJob.objects.filter(pk=job.pk).delete()
+
+
+def process_jobs(worker_id, limit=10, lease_seconds=300):
+    """Claim and run one batch of jobs. Returns the number of jobs claimed."""
+    jobs = claim_jobs(worker_id, limit=limit, lease_seconds=lease_seconds)
+    for job in jobs:
+        try:
+            run_job(job)
+        except Exception as e:
+            target = f"item {job.item_id}" if job.item_id is not None else f"{len(job.item_ids)} items"
+            logger.exception("Match job %s for %s failed: %s", job.pk, target, e)
+            fail_job(job, f"{type(e).__name__}: {e}")
+        else:
+            complete_job(job)
+    return len(jobs)
@@ -0,0 +1,189 @@
+"""
+Live notification events, delivered to browsers as server-sent events.
+
+New Notification rows are published (after commit) to a broker, which fans
+them out to the asyncio queues of that user's open streams. Streams are
+coroutines, not threads, so idle connections cost a queue and a timer each;
+serve them from the ASGI app (mavfinder/asgi.py) under uvicorn or daphne.
+Under WSGI, Django has to consume the whole stream before sending any of
+it, so the stream is off unless settings.NOTIFICATION_STREAM_ENABLED says
+the site is served over ASGI, and WSGI requests are refused regardless.
+
+The broker is settings.NOTIFICATION_BROKER (a dotted path). The default
+InProcessBroker only reaches streams in the process that created the
+notification; multi-worker deployments need a broker with the same
+subscribe/unsubscribe/publish interface backed by something shared, such
+as Redis pub/sub. Clients that miss events (reconnects, a different
+worker, a full queue) catch up from the database via Last-Event-ID.
+"""
+import asyncio
+import json
+import threading
+from collections import defaultdict
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.utils.module_loading import import_string
+
+from . import unread
+from .models import Notification
+
+# Put on a queue that overflowed: the stream closes and the client
+# reconnects, replaying what it missed from the database.
+RESYNC = object()
+
+
+class InProcessBroker:
+    """Pub/sub between threads and event loops of a single process."""
+
+    def __init__(self, queue_size=100):
+        self.queue_size = queue_size
+        self._subscribers = defaultdict(set)  # user id -> {(loop, queue)}
+        self._lock = threading.Lock()
+
+    def subscribe(self, user_id):
+        """A new asyncio.Queue receiving the user's events. Call from the event loop."""
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        with self._lock:
+            self._subscribers[user_id].add((asyncio.get_running_loop(), queue))
+        return queue
+
+    def unsubscribe(self, user_id, queue):
+        with self._lock:
+            subscribers = self._subscribers.get(user_id, set())
+            subscribers.difference_update({s for s in subscribers if s[1] is queue})
+            if not subscribers:
+                self._subscribers.pop(user_id, None)
+
+    def subscriber_count(self, user_id=None):
+        with self._lock:
+            if user_id is not None:
+                return len(self._subscribers.get(user_id, ()))
+            return sum(len(s) for s in self._subscribers.values())
+
+    def publish(self, user_id, event):
+        """Deliver `event` to the user's open streams; safe from any thread."""
+        with self._lock:
+            targets = list(self._subscribers.get(user_id, ()))
+        for loop, queue in targets:
+            try:
+                loop.call_soon_threadsafe(_offer, queue, event)
+            except RuntimeError:  # the stream's loop has shut down
+                self.unsubscribe(user_id, queue)
+
+
+def _offer(queue, event):
+    try:
+        queue.put_nowait(event)
+    except asyncio.QueueFull:
+        while not queue.empty():
+            queue.get_nowait()
+        queue.put_nowait(RESYNC)
+
+
+_broker = None
+
+
+def stream_enabled(request=None):
+    """Whether to offer the stream, and (given a request) serve it to that request."""
+    if not getattr(settings, "NOTIFICATION_STREAM_ENABLED", False):
+        return False
+    return request is None or isinstance(request, ASGIRequest)
+
+
+def get_broker():
+    global _broker
+    if _broker is None:
+        path = getattr(settings, "NOTIFICATION_BROKER", "items.live.InProcessBroker")
+        _broker = import_string(path)()
+    return _broker
+
+
+@receiver(setting_changed)
+def _reset_broker(setting, **kwargs):
+    global _broker
+    if setting == "NOTIFICATION_BROKER":
+        _broker = None
+
+
+def notification_event(notification, unread_count):
+    return {
+        "id": notification.id,
+        "event": "notification",
+        "data": {
+            "id": notification.id,
+            "title": notification.title,
+            "url": notification.url,
+            "created_at": notification.created_at.isoformat(),
+            "unread": unread_count,
+        },
+    }
+
+
+def publish_notification(notification):
+    """Publish a newly committed notification with the recipient's unread count."""
+    user_id = notification.recipient_id
+    get_broker().publish(user_id, notification_event(notification, unread.unread_count(user_id)))
+
+
+def format_event(event):
+    lines = []
+    if event.get("id") is not None:
+        lines.append(f"id: {event['id']}")
+    lines.append(f"event: {event['event']}")
+    lines.append(f"data: {json.dumps(event['data'], separators=(',', ':'))}")
+    return "\n".join(lines) + "\n\n"
+
+
+def missed_events(user_id, last_event_id):
+    limit = getattr(settings, "NOTIFICATION_STREAM_REPLAY_LIMIT", 50)
+    missed = list(
+        Notification.objects.filter(recipient_id=user_id, id__gt=last_event_id).order_by("id")[:limit]
+    )
+    count = unread.unread_count(user_id)
+    return [notification_event(n, count) for n in missed]
+
+
+async def event_stream(user_id, last_event_id=None):
+    """
+    SSE body for one client: a retry hint, any notifications after
+    last_event_id, the current unread count, then live notifications with
+    heartbeat comments in between. Ends after NOTIFICATION_STREAM_MAX_AGE
+    seconds so abandoned connections are eventually dropped; browsers
+    reconnect on their own.
+    """
+    broker = get_broker()
+    heartbeat = getattr(settings, "NOTIFICATION_STREAM_HEARTBEAT", 15)
+    max_age = getattr(settings, "NOTIFICATION_STREAM_MAX_AGE", 600)
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + max_age
+
+    # Subscribe before reading the database so nothing falls in between.
+    queue = broker.subscribe(user_id)
+    try:
+        yield f"retry: {getattr(settings, 'NOTIFICATION_STREAM_RETRY_MS', 3000)}\n\n"
+        seen = last_event_id or 0
+        if last_event_id is not None:
+            for event in await sync_to_async(missed_events)(user_id, last_event_id):
+                seen = max(seen, event["id"])
+                yield format_event(event)
+        count = await sync_to_async(unread.unread_count)(user_id)
+        yield format_event({"event": "unread", "data": {"unread": count}})
+
+        while (remaining := deadline - loop.time()) > 0:
+            try:
+                event = await asyncio.wait_for(queue.get(), min(heartbeat, remaining))
+            except asyncio.TimeoutError:
+                yield ": keepalive\n\n"
+                continue
+            if event is RESYNC:
+                break
+            if event["id"] <= seen:
+                continue
+            seen = event["id"]
+            yield format_event(event)
+    finally:
+        broker.unsubscribe(user_id, queue)
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+from items.features import fill_match_features
+from items.models import Item
+from items.score_cache import get_pair_cache
+
+
+class Command(BaseCommand):
+    help = "Recompute the stored match features for all items"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500)
+
+    def handle(self, *args, **opts):
+        updated = fill_match_features(Item, batch_size=opts["batch_size"])
+        # Features changed without touching updated_at, so cached pairs are stale.
+        if get_pair_cache() is not None:
+            get_pair_cache().clear()
+        self.stdout.write(self.style.SUCCESS(f"Updated features for {updated} items"))
@@ -0,0 +1,75 @@
+import json
+import random
+import time
+
+from django.core.management.base import BaseCommand
+from items.models import Item
+from items.matching import text_similarity
+
+WORDS = (
+    "black blue silver red green white grey dell apple hp lenovo samsung "
+    "laptop phone charger backpack bottle jacket keys wallet card calculator "
+    "headphones case sticker scratch cracked screen left found lost near the "
+    "in on by library mammel hall pki arts room lobby desk table bench floor"
+).split()
+
+
+def _text(rng, words):
+    return " ".join(rng.choice(WORDS) for _ in range(words))
+
+
+def _synthetic_pairs(n, seed):
+    rng = random.Random(seed)
+    pairs = []
+    for _ in range(n):
+        a = Item(title=_text(rng, rng.randint(2, 6)), description=_text(rng, rng.randint(0, 250)))
+        b = Item(title=_text(rng, rng.randint(2, 6)), description=_text(rng, rng.randint(0, 250)))
+        a.refresh_match_features()
+        b.refresh_match_features()
+        pairs.append((a, b))
+    return pairs
+
+
+def _db_pairs(n, seed):
+    lost = list(Item.objects.filter(status=Item.LOST).order_by("?")[:n])
+    found = list(Item.objects.filter(status=Item.FOUND).order_by("?")[:n])
+    rng = random.Random(seed)
+    return [(a, rng.choice(found)) for a in lost] if found else []
+
+
+def _run(pairs, engine):
+    start = time.perf_counter()
+    scores = [round(20.0 * text_similarity(a, b, engine), 2) for a, b in pairs]
+    return scores, time.perf_counter() - start
+
+
+class Command(BaseCommand):
+    help = "Compare title_desc_fuzzy scores and speed of the trigram and SequenceMatcher engines"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--pairs", type=int, default=500)
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--source", choices=["synthetic", "db"], default="synthetic")
+
+    def handle(self, *args, **opts):
+        make = _db_pairs if opts["source"] == "db" else _synthetic_pairs
+        pairs = make(opts["pairs"], opts["seed"])
+        if not pairs:
+            self.stdout.write(self.style.WARNING("No pairs to compare"))
+            return
+
+        sequence, sequence_secs = _run(pairs, "sequence")
+        trigram, trigram_secs = _run(pairs, "trigram")
+        diffs = sorted(abs(s - t) for s, t in zip(sequence, trigram))
+
+        report = {
+            "pairs": len(pairs),
+            "source": opts["source"],
+            "sequence_ms_per_pair": round(1000 * sequence_secs / len(pairs), 4),
+            "trigram_ms_per_pair": round(1000 * trigram_secs / len(pairs), 4),
+            "speedup": round(sequence_secs / trigram_secs, 1) if trigram_secs else None,
+            "mean_abs_diff": round(sum(diffs) / len(diffs), 2),
+            "p95_abs_diff": round(diffs[int(0.95 * (len(diffs) - 1))], 2),
+            "max_abs_diff": round(diffs[-1], 2),
+        }
+        self.stdout.write(json.dumps(report, indent=2))
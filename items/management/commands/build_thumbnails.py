@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+from items.models import Item
+from items.thumbnails import ensure_thumbnails
+
+
+class Command(BaseCommand):
+    help = "Build missing or stale photo thumbnails (see items.thumbnails)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--force", action="store_true",
+                            help="Rebuild every item's thumbnails, e.g. after changing ITEM_THUMBNAIL_WIDTHS.")
+        parser.add_argument("--batch-size", type=int, default=200)
+
+    def handle(self, *args, **opts):
+        qs = Item.objects.exclude(photo="").exclude(photo__isnull=True).order_by("pk")
+        built = 0
+        for item in qs.iterator(chunk_size=opts["batch_size"]):
+            if opts["force"]:
+                item.photo_thumbnails = {**item.photo_thumbnails, "source": None}
+            if ensure_thumbnails(item):
+                built += 1
+        self.stdout.write(self.style.SUCCESS(f"Built thumbnails for {built} items"))
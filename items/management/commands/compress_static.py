@@ -0,0 +1,49 @@
+import gzip
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+try:
+    import brotli
+except ImportError:  # optional: only .gz variants are written without it
+    brotli = None
+
+COMPRESSIBLE = {".css", ".js", ".mjs", ".map", ".svg", ".json", ".html", ".txt", ".xml"}
+MIN_SIZE = 1024
+
+
+class Command(BaseCommand):
+    help = "Write precompressed .gz (and .br, if brotli is installed) copies of collected static files"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--root", default=None, help="Directory to compress (default: STATIC_ROOT).")
+
+    def handle(self, *args, **opts):
+        root = opts["root"] or settings.STATIC_ROOT
+        encoders = [(".gz", lambda data: gzip.compress(data, compresslevel=9, mtime=0))]
+        if brotli is not None:
+            encoders.append((".br", lambda data: brotli.compress(data, quality=11)))
+        else:
+            self.stdout.write("brotli not installed; writing .gz only")
+
+        written = 0
+        for dirpath, _dirnames, filenames in os.walk(root):
+            for filename in filenames:
+                path = os.path.join(dirpath, filename)
+                if os.path.splitext(filename)[1] not in COMPRESSIBLE or os.path.getsize(path) < MIN_SIZE:
+                    continue
+                with open(path, "rb") as f:
+                    data = f.read()
+                mtime = os.path.getmtime(path)
+                for suffix, encode in encoders:
+                    target = path + suffix
+                    if os.path.exists(target) and os.path.getmtime(target) >= mtime:
+                        continue
+                    compressed = encode(data)
+                    if len(compressed) >= len(data):
+                        continue
+                    with open(target, "wb") as f:
+                        f.write(compressed)
+                    written += 1
+        self.stdout.write(self.style.SUCCESS(f"Wrote {written} precompressed files"))
@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand, CommandError
+from items import exports
+
+
+class Command(BaseCommand):
+    help = "Export items, matches or notifications as CSV or NDJSON"
+
+    def add_arguments(self, parser):
+        parser.add_argument("dataset", choices=sorted(exports.DATASETS))
+        parser.add_argument("--format", choices=sorted(exports.FORMATS), default="csv")
+        parser.add_argument("--output", help="File to write (default: standard output).")
+        for name in exports.ITEM_FILTERS:
+            parser.add_argument(f"--{name}", default="", help="Same as the item list filter.")
+        parser.add_argument("--since", default="", help="Created on or after YYYY-MM-DD.")
+        parser.add_argument("--until", default="", help="Created on or before YYYY-MM-DD.")
+
+    def handle(self, *args, **opts):
+        dataset, fmt = opts["dataset"], opts["format"]
+        try:
+            qs = exports.export_queryset(dataset, opts)
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        chunks = exports.stream(dataset, fmt, qs)
+        if not opts["output"]:
+            for chunk in chunks:
+                self.stdout.write(chunk, ending="")
+            return
+        with open(opts["output"], "w", newline="", encoding="utf-8") as f:
+            f.writelines(chunks)
+        self.stderr.write(f"Wrote {dataset} to {opts['output']}")
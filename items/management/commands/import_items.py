@@ -0,0 +1,200 @@
+import csv
+import json
+import os
+from itertools import islice
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import IntegrityError, transaction
+from items import page_cache, search, token_index
+from items.forms import ImportItemForm
+from items.jobs import enqueue_batch_match_job
+from items.models import Category, Item
+
+User = get_user_model()
+
+
+def read_rows(path, fmt):
+    """Yield (line number, row dict) from a CSV or JSON Lines file, one row at a time."""
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        if fmt == "csv":
+            reader = csv.DictReader(f)
+            for row in reader:
+                yield reader.line_num, row
+            return
+        for line_num, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError as e:
+                yield line_num, {"__error__": f"Invalid JSON: {e}"}
+                continue
+            yield line_num, row if isinstance(row, dict) else {"__error__": "Expected a JSON object"}
+
+
+class Command(BaseCommand):
+    help = "Import items from lost-and-found desk logs (CSV or JSON Lines)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("paths", nargs="+", help="CSV (.csv) or JSON Lines (.jsonl) files.")
+        parser.add_argument("--format", choices=["csv", "jsonl"],
+                            help="File format (default: from each file's extension).")
+        parser.add_argument("--owner",
+                            help="Username or email owning rows without an owner column.")
+        parser.add_argument("--source", default="",
+                            help="Prefix for external ids, e.g. the desk name, so desks can reuse ids.")
+        parser.add_argument("--approved", action="store_true",
+                            help="Publish imported items immediately instead of queueing them for review.")
+        parser.add_argument("--batch-size", type=int, default=500,
+                            help="Rows validated and inserted per transaction.")
+        parser.add_argument("--errors", help="Write rejected rows and their errors to this CSV file.")
+        parser.add_argument("--dry-run", action="store_true",
+                            help="Validate and report without writing anything.")
+
+    def handle(self, *args, **opts):
+        self.opts = opts
+        self.categories = {}
+        self.owners = {}
+        self.default_owner = None
+        if opts["owner"]:
+            self.default_owner = self._owner(opts["owner"])  # a user id
+            if self.default_owner is None:
+                raise CommandError(f"Unknown owner: {opts['owner']}")
+
+        self.counts = {"imported": 0, "existing": 0, "invalid": 0}
+        error_file = open(opts["errors"], "w", newline="", encoding="utf-8") if opts["errors"] else None
+        self.error_writer = csv.writer(error_file) if error_file else None
+        if self.error_writer:
+            self.error_writer.writerow(["file", "line", "external_id", "errors"])
+        try:
+            for path in opts["paths"]:
+                self._import_file(path)
+        finally:
+            if error_file:
+                error_file.close()
+
+        prefix = "Dry run: would import" if opts["dry_run"] else "Imported"
+        self.stdout.write(self.style.SUCCESS(
+            f"{prefix} {self.counts['imported']} items; skipped {self.counts['existing']} already imported, "
+            f"{self.counts['invalid']} invalid"
+        ))
+
+    def _import_file(self, path):
+        fmt = self.opts["format"] or os.path.splitext(path)[1].lstrip(".").lower()
+        if fmt not in ("csv", "jsonl"):
+            raise CommandError(f"Can't tell the format of {path}; pass --format")
+        rows = read_rows(path, fmt)
+        while batch := list(islice(rows, self.opts["batch_size"])):
+            self._import_batch(path, batch)
+            self.stdout.write(f"  {path}: {self.counts['imported']} imported so far")
+
+    # Cached lookups: desk logs repeat the same few categories and owners.
+
+    def _category(self, value):
+        value = str(value).strip()
+        key = value.lower()
+        if key not in self.categories:
+            qs = Category.objects.filter(pk=int(value)) if value.isdigit() else Category.objects.filter(
+                name__iexact=value
+            )
+            self.categories[key] = qs.values_list("pk", flat=True).first()
+        return self.categories[key]
+
+    def _owner(self, value):
+        value = str(value).strip()
+        if value not in self.owners:
+            field = "email__iexact" if "@" in value else "username"
+            self.owners[value] = User.objects.filter(**{field: value}).values_list("pk", flat=True).first()
+        return self.owners[value]
+
+    def _reject(self, path, line_num, external_id, errors):
+        self.counts["invalid"] += 1
+        if self.error_writer:
+            self.error_writer.writerow([path, line_num, external_id, json.dumps(errors)])
+
+    def _build(self, path, line_num, row):
+        """An unsaved Item for the row, or None after recording why it was rejected."""
+        if "__error__" in row:
+            self._reject(path, line_num, "", {"__all__": [row["__error__"]]})
+            return None
+        data = {k: "" if v is None else str(v) for k, v in row.items() if k}
+        external_id = data.pop("external_id", "").strip()
+        errors = {}
+        if not external_id:
+            errors["external_id"] = ["This field is required."]
+        else:
+            external_id = f"{self.opts['source']}:{external_id}" if self.opts["source"] else external_id
+
+        category_id = self._category(data["category"]) if data.get("category", "").strip() else None
+        if category_id is None:
+            errors["category"] = [f"Unknown category: {data.get('category', '')!r}"]
+        owner = data.get("owner", "").strip()
+        owner_id = self._owner(owner) if owner else self.default_owner
+        if owner_id is None:
+            errors["owner"] = [f"Unknown owner: {owner!r}" if owner else "No owner in the row and no --owner."]
+
+        form = ImportItemForm(data=data)
+        for field, messages in form.errors.items():
+            errors[field] = list(messages)
+        if errors:
+            self._reject(path, line_num, external_id, errors)
+            return None
+
+        item = form.save(commit=False)
+        item.external_id = external_id
+        item.category_id = category_id
+        item.owner_id = owner_id
+        item.approved = self.opts["approved"]
+        # bulk_create skips Item.save(), which normally derives these.
+        item.refresh_match_features()
+        return item
+
+    def _import_batch(self, path, batch):
+        items = {}
+        for line_num, row in batch:
+            item = self._build(path, line_num, row)
+            if item is None:
+                continue
+            if item.external_id in items:
+                self._reject(path, line_num, item.external_id, {"external_id": ["Repeated within the file."]})
+                continue
+            items[item.external_id] = item
+
+        new = self._not_imported(items)
+        self.counts["existing"] += len(items) - len(new)
+        if self.opts["dry_run"]:
+            self.counts["imported"] += len(new)
+            return
+
+        while new:
+            try:
+                with transaction.atomic():
+                    self._insert(new)
+            except IntegrityError:
+                # A concurrent import took some of these external ids after
+                # the check above; skip those rows and insert the rest.
+                remaining = self._not_imported({item.external_id: item for item in new})
+                if len(remaining) == len(new):
+                    raise
+                self.counts["existing"] += len(new) - len(remaining)
+                for item in remaining:
+                    item.pk = None  # set by any INSERT that ran before the failing one
+                new = remaining
+                continue
+            self.counts["imported"] += len(new)
+            return
+
+    def _not_imported(self, items):
+        """The items of {external_id: item} whose external id isn't in the database yet."""
+        existing = set(Item.objects.filter(external_id__in=list(items)).values_list("external_id", flat=True))
+        return [item for key, item in items.items() if key not in existing]
+
+    def _insert(self, items):
+        Item.objects.bulk_create(items)
+        # bulk_create sends no post_save, so do the receivers' work per batch.
+        token_index.index_items(items)
+        search.index_items(items)
+        # One job scores the whole batch rather than one job per item.
+        enqueue_batch_match_job(items)
+        transaction.on_commit(page_cache.bump_listing_version)
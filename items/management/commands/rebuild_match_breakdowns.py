@@ -1,16 +1,143 @@
-from django.core.management.base import BaseCommand
-from items.models import Match
-from items.matching import item_score_breakdown
+import json
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+from itertools import chain
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections, transaction
+from django.db.models import Q
+from django.utils import timezone
+from items.models import Item, Match
+from items.matching import item_score_breakdown, refresh_best_scores
+
+
+def _init_worker():
+    import django
+    django.setup()
+
+
+def score_chunk(pairs):
+    """Score (match id, lost item, found item) triples; runs in a worker process."""
+    return [(match_id, item_score_breakdown(lost, found)) for match_id, lost, found in pairs]
+
 
 class Command(BaseCommand):
     help = "Rebuild score_breakdown for all matches"
 
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=500,
+                            help="Matches read, scored and written per chunk.")
+        parser.add_argument("--workers", type=int, default=1,
+                            help="Scoring processes (1 scores in this process).")
+        parser.add_argument("--since", type=date.fromisoformat,
+                            help="Only matches created, or with an item updated, on or after YYYY-MM-DD.")
+        parser.add_argument("--category",
+                            help="Only matches whose lost item is in this category (name or id).")
+        parser.add_argument("--checkpoint",
+                            help="JSON file recording progress, so an interrupted run can --resume.")
+        parser.add_argument("--resume", action="store_true",
+                            help="Continue after the last match recorded in --checkpoint.")
+
     def handle(self, *args, **opts):
-        updated = 0
-        for m in Match.objects.select_related("lost_item", "found_item"):
-            bd = item_score_breakdown(m.lost_item, m.found_item)
-            m.score = bd["total"]
-            m.score_breakdown = bd
-            m.save(update_fields=["score", "score_breakdown"])
-            updated += 1
-        self.stdout.write(self.style.SUCCESS(f"Updated {updated} matches"))
+        chunk_size = opts["chunk_size"]
+        checkpoint = opts["checkpoint"]
+        if opts["resume"] and not checkpoint:
+            raise CommandError("--resume needs --checkpoint")
+
+        qs = Match.objects.all()
+        if opts["since"]:
+            since = opts["since"]
+            qs = qs.filter(
+                Q(created_at__date__gte=since)
+                | Q(lost_item__updated_at__date__gte=since)
+                | Q(found_item__updated_at__date__gte=since)
+            )
+        if opts["category"]:
+            category = opts["category"]
+            if category.isdigit():
+                qs = qs.filter(lost_item__category_id=int(category))
+            else:
+                qs = qs.filter(lost_item__category__name__iexact=category)
+
+        last_id = 0
+        if opts["resume"] and os.path.exists(checkpoint):
+            with open(checkpoint) as f:
+                last_id = json.load(f)["last_match_id"]
+            self.stdout.write(f"Resuming after match {last_id}")
+        qs = qs.filter(pk__gt=last_id)
+
+        total = qs.count()
+        self.stdout.write(f"Rescoring {total} matches")
+        chunks = self._chunks(qs, chunk_size)
+
+        self.updated = 0
+        self.started = time.monotonic()
+        if opts["workers"] > 1:
+            self._run_pool(chunks, opts["workers"], total, checkpoint)
+        else:
+            for chunk in chunks:
+                self._write(score_chunk(chunk), total, checkpoint)
+
+        if checkpoint and os.path.exists(checkpoint):
+            os.remove(checkpoint)
+        self.stdout.write(self.style.SUCCESS(f"Updated {self.updated} matches"))
+
+    def _chunks(self, qs, chunk_size):
+        """
+        (match id, lost item, found item) lists of up to `chunk_size`, in pk
+        order. Each chunk is one keyset query fetched in full, so memory
+        doesn't grow with the table and no cursor stays open while results
+        are written back on the same connection.
+        """
+        qs = qs.select_related("lost_item", "found_item").order_by("pk")
+        last_pk = 0
+        while True:
+            matches = list(qs.filter(pk__gt=last_pk)[:chunk_size])
+            if not matches:
+                return
+            yield [(m.pk, m.lost_item, m.found_item) for m in matches]
+            last_pk = matches[-1].pk
+
+    def _run_pool(self, chunks, workers, total, checkpoint):
+        first = next(chunks, None)
+        if first is None:
+            return
+        # With the fork start method every worker is forked on the first
+        # submit; close the connection the first chunk was read on just
+        # before, so none inherits it. Later reads reopen it in this process.
+        connections.close_all()
+        pending = deque()
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+            # Keep a bounded number of chunks in flight and write them back in
+            # order, so memory stays flat and the checkpoint only moves forward.
+            for chunk in chain([first], chunks):
+                pending.append(pool.submit(score_chunk, chunk))
+                if len(pending) >= workers * 2:
+                    self._write(pending.popleft().result(), total, checkpoint)
+            while pending:
+                self._write(pending.popleft().result(), total, checkpoint)
+
+    def _write(self, scored, total, checkpoint):
+        now = timezone.now()
+        batch = [
+            Match(pk=match_id, score=bd["total"], score_breakdown=bd, updated_at=now)
+            for match_id, bd in scored
+        ]
+        ids = [match.pk for match in batch]
+        with transaction.atomic():
+            Match.objects.bulk_update(batch, ["score", "score_breakdown", "updated_at"])
+            refresh_best_scores(
+                Item.objects.filter(Q(lost_matches__in=ids) | Q(found_matches__in=ids)).values("pk")
+            )
+        self.updated += len(batch)
+
+        if checkpoint:
+            with open(checkpoint, "w") as f:
+                json.dump({"last_match_id": scored[-1][0]}, f)
+
+        elapsed = time.monotonic() - self.started
+        rate = self.updated / elapsed if elapsed else 0
+        self.stdout.write(f"  {self.updated}/{total} matches ({rate:.0f}/s)")
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from items.token_index import rebuild
+
+
+class Command(BaseCommand):
+    help = "Rebuild the inverted token index used for match candidates"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500)
+
+    def handle(self, *args, **opts):
+        indexed = rebuild(batch_size=opts["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"Indexed {indexed} items"))
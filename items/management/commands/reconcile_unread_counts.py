@@ -0,0 +1,22 @@
+from itertools import islice
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from items import unread
+
+
+class Command(BaseCommand):
+    help = "Recount cached unread notification counts from the database (run periodically)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **opts):
+        batch_size = opts["batch_size"]
+        ids = get_user_model().objects.order_by("pk").values_list("pk", flat=True).iterator(chunk_size=batch_size)
+        users = unread_total = 0
+        for batch in iter(lambda: list(islice(ids, batch_size)), []):
+            counts = unread.reconcile(batch)
+            users += len(counts)
+            unread_total += sum(counts.values())
+        self.stdout.write(self.style.SUCCESS(f"Reconciled {users} users ({unread_total} unread notifications)"))
@@ -0,0 +1,90 @@
+import json
+import platform
+import subprocess
+from datetime import datetime, timezone
+
+import django
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import get_runner, setup_test_environment, teardown_test_environment
+from django.conf import settings
+
+from items.bench.runner import run_suite
+from items.bench.synthetic import generate
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+class Command(BaseCommand):
+    help = "Benchmark matching and the main views on seeded synthetic data (in a throwaway database)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sizes", default="1000,10000",
+                            help="Comma-separated item counts, e.g. 1000,10000,100000,1000000.")
+        parser.add_argument("--samples", type=int, default=50, help="Calls timed per benchmark.")
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--output", help="Write the JSON report to this file.")
+        parser.add_argument("--compare", help="Earlier JSON report to print p50/p95 changes against.")
+
+    def handle(self, *args, **opts):
+        try:
+            sizes = [int(s) for s in opts["sizes"].split(",") if s.strip()]
+        except ValueError:
+            raise CommandError("--sizes must be comma-separated integers")
+
+        report = {
+            "meta": {
+                "commit": _git_commit(),
+                "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                "python": platform.python_version(),
+                "django": django.get_version(),
+                "database": settings.DATABASES["default"]["ENGINE"],
+                "seed": opts["seed"],
+                "samples": opts["samples"],
+            },
+            "results": {},
+        }
+
+        setup_test_environment()
+        runner = get_runner(settings)(verbosity=0, interactive=False)
+        old_config = runner.setup_databases()
+        try:
+            generated = 0
+            for size in sorted(sizes):
+                self.stdout.write(f"Generating {size} items...")
+                generated += generate(size - generated, seed=opts["seed"] + size)
+                self.stdout.write(f"Benchmarking {size} items...")
+                report["results"][str(size)] = run_suite(samples=opts["samples"], seed=opts["seed"])
+        finally:
+            runner.teardown_databases(old_config)
+            teardown_test_environment()
+
+        output = json.dumps(report, indent=2)
+        if opts["output"]:
+            with open(opts["output"], "w") as f:
+                f.write(output + "\n")
+        self.stdout.write(output)
+
+        if opts["compare"]:
+            with open(opts["compare"]) as f:
+                self._compare(json.load(f), report)
+
+    def _compare(self, old, new):
+        label = old["meta"].get("commit") or old["meta"].get("created", "previous run")
+        self.stdout.write(f"\nChange vs {label}:")
+        for size, benches in new["results"].items():
+            for name, metrics in benches.items():
+                before = old["results"].get(size, {}).get(name)
+                if not before:
+                    continue
+                changes = []
+                for key in ("p50_ms", "p95_ms", "queries_mean"):
+                    if before[key]:
+                        changes.append(f"{key} {100 * (metrics[key] - before[key]) / before[key]:+.1f}%")
+                self.stdout.write(f"  {size:>8} {name:<26} " + "  ".join(changes))
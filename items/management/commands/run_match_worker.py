@@ -0,0 +1,34 @@
+import os
+import socket
+import time
+
+from django.core.management.base import BaseCommand
+from items.jobs import process_jobs
+
+
+class Command(BaseCommand):
+    help = "Run queued match generation and thumbnail jobs"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--once", action="store_true",
+                            help="Exit when no job is ready instead of polling.")
+        parser.add_argument("--batch", type=int, default=10, help="Jobs claimed at a time.")
+        parser.add_argument("--sleep", type=float, default=5.0, help="Seconds between polls when idle.")
+        parser.add_argument("--lease", type=int, default=300,
+                            help="Seconds before an unfinished job can be claimed by another worker.")
+
+    def handle(self, *args, **opts):
+        worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        processed = 0
+        try:
+            while True:
+                claimed = process_jobs(worker_id, limit=opts["batch"], lease_seconds=opts["lease"])
+                processed += claimed
+                if claimed:
+                    continue
+                if opts["once"]:
+                    break
+                time.sleep(opts["sleep"])
+        except KeyboardInterrupt:
+            pass
+        self.stdout.write(self.style.SUCCESS(f"Processed {processed} jobs"))
@@ -0,0 +1,41 @@
+import os
+import socket
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from items.outbox import RateLimiter, process_outbox
+
+
+class Command(BaseCommand):
+    help = "Deliver queued email and other outbound notifications"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--once", action="store_true",
+                            help="Exit when no message is due instead of polling.")
+        parser.add_argument("--batch", type=int, default=100, help="Messages claimed at a time.")
+        parser.add_argument("--sleep", type=float, default=5.0, help="Seconds between polls when idle.")
+        parser.add_argument("--lease", type=int, default=300,
+                            help="Seconds before an unfinished batch can be claimed by another worker.")
+        parser.add_argument("--rate", type=float,
+                            help="Messages sent per second at most (default: settings.OUTBOX_RATE_LIMIT).")
+
+    def handle(self, *args, **opts):
+        worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        rate = opts["rate"] if opts["rate"] is not None else getattr(settings, "OUTBOX_RATE_LIMIT", None)
+        throttle = RateLimiter(rate)
+        processed = 0
+        try:
+            while True:
+                claimed = process_outbox(
+                    worker_id, limit=opts["batch"], lease_seconds=opts["lease"], throttle=throttle,
+                )
+                processed += claimed
+                if claimed:
+                    continue
+                if opts["once"]:
+                    break
+                time.sleep(opts["sleep"])
+        except KeyboardInterrupt:
+            pass
+        self.stdout.write(self.style.SUCCESS(f"Processed {processed} messages"))
@@ -1,16 +1,26 @@
-import re
 from difflib import SequenceMatcher
 from datetime import timedelta
 
+import numpy as np
+from django.conf import settings
+from django.db.models import Case, FloatField, OuterRef, Q, Subquery, Value, When
+from django.db.models.functions import Coalesce
 from django.utils import timezone
 
-from .models import Item
+from .features import SIGNATURE_SIZE
+from .models import Item, Match
+from .score_cache import get_pair_cache, pair_key
+from .token_index import ranked_candidate_ids
 
-WORD_RE = re.compile(r"[a-z0-9]+")
+# Max candidates taken from each source (token index, same building).
+CANDIDATE_LIMIT = 50
 
+# Minimum total score for a pair to count as a match.
+MATCH_THRESHOLD = 40
 
-def norm(s):
-    return WORD_RE.findall((s or "").lower())
+# Bump whenever a change to the scoring alters breakdowns, so cached pair
+# scores from the old scoring are not reused.
+SCORING_VERSION = 2
 
 
 def jaccard(a, b):
@@ -22,6 +32,43 @@ def fuzzy(a, b):
     return SequenceMatcher(None, (a or "").lower(), (b or "").lower()).ratio()
 
 
+def signature_similarity(a, b, size=SIGNATURE_SIZE):
+    """
+    Dice similarity of two texts estimated from their bottom-k trigram
+    signatures (Item.title_shingles / description_shingles). Cost is bounded
+    by the signature size, whatever the length of the text.
+    """
+    if not a or not b:
+        return 0.0
+    A, B = set(a), set(b)
+    union = sorted(A | B)[:size]
+    shared = sum(1 for h in union if h in A and h in B)
+    j = shared / len(union)
+    return 2 * j / (1 + j)
+
+
+def fuzzy_engine():
+    """
+    "trigram" (default) compares stored signatures; "sequence" is the
+    compatibility mode that runs SequenceMatcher over the raw text.
+    """
+    return getattr(settings, "MATCH_FUZZY_ENGINE", "trigram")
+
+
+def scoring_version():
+    return f"{SCORING_VERSION}-{fuzzy_engine()}"
+
+
+def text_similarity(a, b, engine=None):
+    """0–1 title/description similarity used for the title_desc_fuzzy component."""
+    if (engine or fuzzy_engine()) == "sequence":
+        return max(fuzzy(a.title, b.title), fuzzy(a.description, b.description))
+    return max(
+        signature_similarity(a.title_shingles, b.title_shingles),
+        signature_similarity(a.description_shingles, b.description_shingles),
+    )
+
+
 def days_prox(a, b, max_days=30):
     """0–1 score based on how close the dates are."""
     if not a or not b:
@@ -30,7 +77,14 @@ def days_prox(a, b, max_days=30):
     return max(0.0, 1 - d / max_days)
 
 
-def candidate_queryset(new_item, include_unapproved=False):
+def candidate_queryset(new_item, include_unapproved=False, limit=CANDIDATE_LIMIT):
+    """
+    Opposite-status items in the same category and ±30 day window.
+
+    Candidates come from the token index (ranked by shared token weight) plus
+    the newest items logged in the same building, and are ordered by that
+    weight, exposed as `token_weight` on each candidate.
+    """
     # Only try to match LOST/FOUND.
     if new_item.status not in ("LOST", "FOUND"):
         return Item.objects.none()
@@ -48,57 +102,97 @@ def candidate_queryset(new_item, include_unapproved=False):
     if not include_unapproved:
         qs = qs.filter(approved=True)
 
-    if new_item.building:
-        qs = qs.filter(building__iexact=new_item.building)
+    weights = dict(ranked_candidate_ids(
+        new_item, opposite, start, end, include_unapproved=include_unapproved, limit=limit,
+    ))
+    if new_item.building_key:
+        same_building = qs.filter(building_key=new_item.building_key).order_by("-date_reported")
+        for pk in same_building.values_list("pk", flat=True)[:limit]:
+            weights.setdefault(pk, 0.0)
 
-    return qs.order_by("-date_reported")[:50]
+    if not weights:
+        return Item.objects.none()
 
+    return qs.filter(pk__in=list(weights)).annotate(
+        token_weight=Case(
+            *[When(pk=pk, then=Value(w)) for pk, w in weights.items()],
+            default=Value(0.0),
+            output_field=FloatField(),
+        )
+    ).order_by("-token_weight", "-date_reported")
 
-def item_score_breakdown(a, b):
 
-    breakdown = {
-        "building": 0.0,
-        "color": 0.0,
-        "brand_model_tokens": 0.0,
-        "title_desc_fuzzy": 0.0,
-        "date_proximity": 0.0,
-        "room_tokens": 0.0,
-        "total": 0.0,
-    }
+# Each score component, its max points, and the Item fields it reads.
 
+def _building_points(a, b):
     # building (20)
-    if (a.building or "").strip().lower() and (a.building or "").strip().lower() == (b.building or "").strip().lower():
-        breakdown["building"] = 20.0
+    return 20.0 if a.building_key and a.building_key == b.building_key else 0.0
+
 
+def _color_points(a, b):
     # color (15)
-    if a.color_primary and b.color_primary and a.color_primary.strip().lower() == b.color_primary.strip().lower():
-        breakdown["color"] = 15.0
+    return 15.0 if a.color_key and a.color_key == b.color_key else 0.0
 
+
+def _brand_model_points(a, b):
     # brand/model token overlap (max 25)
-    brand_score = jaccard(norm(a.brand), norm(b.brand))
-    model_score = jaccard(norm(a.model_or_markings), norm(b.model_or_markings))
-    breakdown["brand_model_tokens"] = round(25.0 * max(brand_score, model_score), 2)
+    brand_score = jaccard(a.brand_tokens, b.brand_tokens)
+    model_score = jaccard(a.model_tokens, b.model_tokens)
+    return round(25.0 * max(brand_score, model_score), 2)
+
 
+def _text_points(a, b):
     # title/description fuzzy (max 20)
-    title_score = fuzzy(a.title, b.title)
-    desc_score = fuzzy(a.description, b.description)
-    breakdown["title_desc_fuzzy"] = round(20.0 * max(title_score, desc_score), 2)
+    return round(20.0 * text_similarity(a, b), 2)
 
+
+def _date_points(a, b):
     # date proximity (max 10)
-    breakdown["date_proximity"] = round(10.0 * days_prox(a.date_lost_or_found, b.date_lost_or_found), 2)
+    return round(10.0 * days_prox(a.date_lost_or_found, b.date_lost_or_found), 2)
+
 
+def _room_points(a, b):
     # room/area tokens (max 10)
-    breakdown["room_tokens"] = round(10.0 * jaccard(norm(a.room_or_area), norm(b.room_or_area)), 2)
-
-    total = (
-        breakdown["building"]
-        + breakdown["color"]
-        + breakdown["brand_model_tokens"]
-        + breakdown["title_desc_fuzzy"]
-        + breakdown["date_proximity"]
-        + breakdown["room_tokens"]
-    )
-    breakdown["total"] = round(total, 1)
+    return round(10.0 * jaccard(a.room_tokens, b.room_tokens), 2)
+
+
+COMPONENTS = {
+    "building": (_building_points, {"building"}),
+    "color": (_color_points, {"color_primary"}),
+    "brand_model_tokens": (_brand_model_points, {"brand", "model_or_markings"}),
+    "title_desc_fuzzy": (_text_points, {"title", "description"}),
+    "date_proximity": (_date_points, {"date_lost_or_found"}),
+    "room_tokens": (_room_points, {"room_or_area"}),
+}
+
+
+def _total(breakdown):
+    return round(sum(breakdown[name] for name in COMPONENTS), 1)
+
+
+def item_score_breakdown(a, b):
+    breakdown = {name: points(a, b) for name, (points, _fields) in COMPONENTS.items()}
+    breakdown["total"] = _total(breakdown)
+    return breakdown
+
+
+def components_for_fields(fields):
+    """Names of the score components that read any of the given Item fields."""
+    fields = set(fields)
+    return {name for name, (_points, reads) in COMPONENTS.items() if reads & fields}
+
+
+def rescore_components(a, b, breakdown, components):
+    """
+    Recompute only `components` of an existing breakdown for the pair (a, b).
+    Falls back to a full score when the stored breakdown is incomplete.
+    """
+    if not breakdown or any(name not in breakdown for name in COMPONENTS):
+        return item_score_breakdown(a, b)
+    breakdown = dict(breakdown)
+    for name in components:
+        breakdown[name] = COMPONENTS[name][0](a, b)
+    breakdown["total"] = _total(breakdown)
     return breakdown
 
 
@@ -107,33 +201,362 @@ def item_score(a, b):
 
 
 
-def find_matches_for(new_item, include_unapproved=False):
+def _jaccard_many(tokens, others):
+    """
+    Jaccard of one token list against N token lists, as a float array.
+    Token lists are the de-duplicated ones stored on Item.
+    """
+    A = set(tokens)
+    sizes = np.fromiter((len(o) for o in others), dtype=np.int64, count=len(others))
+    inter = np.zeros(len(others), dtype=np.int64)
+    if A and sizes.any():
+        owner = np.repeat(np.arange(len(others)), sizes)
+        flat = np.array([t for o in others for t in o])
+        hits = np.isin(flat, np.array(list(A)))
+        inter = np.bincount(owner, weights=hits, minlength=len(others)).astype(np.int64)
+    union = len(A) + sizes - inter
+    out = np.zeros(len(others), dtype=np.float64)
+    np.divide(inter, union, out=out, where=union > 0)
+    return out
+
+
+def _days_prox_many(day, others, max_days=30):
+    """Vectorized days_prox() of one date against N dates."""
+    if not day:
+        return np.zeros(len(others), dtype=np.float64)
+    ords = np.array([o.toordinal() if o else np.nan for o in others], dtype=np.float64)
+    d = np.abs(ords - day.toordinal())
+    prox = np.maximum(0.0, 1 - d / max_days)
+    return np.where(np.isnan(prox), 0.0, prox)
+
+
+class ScoringStats:
+    """Counters for how many candidate pairs were scored or pruned."""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.candidates = 0
+        self.pruned_before_tokens = 0
+        self.pruned_before_fuzzy = 0
+        self.scored = 0
+        self.cache_hits = 0
+
+    @property
+    def pruned(self):
+        return self.pruned_before_tokens + self.pruned_before_fuzzy
+
+    def add(self, other):
+        self.candidates += other.candidates
+        self.pruned_before_tokens += other.pruned_before_tokens
+        self.pruned_before_fuzzy += other.pruned_before_fuzzy
+        self.scored += other.scored
+        self.cache_hits += other.cache_hits
+
+    def as_dict(self):
+        return {
+            "candidates": self.candidates,
+            "pruned_before_tokens": self.pruned_before_tokens,
+            "pruned_before_fuzzy": self.pruned_before_fuzzy,
+            "pruned": self.pruned,
+            "scored": self.scored,
+            "cache_hits": self.cache_hits,
+        }
+
+
+# Running totals for this process.
+scoring_stats = ScoringStats()
+
+# Slack for the rounding of components (2 dp each) and of the total (1 dp),
+# so a pair is only pruned when it cannot reach the threshold after rounding.
+PRUNE_MARGIN = 0.1
+
+
+def _size_ratio_many(sizes, others):
+    """Upper bound of a Jaccard-style overlap from set sizes alone: min/max."""
+    lo = np.minimum(sizes, others)
+    hi = np.maximum(sizes, others)
+    out = np.zeros(len(others), dtype=np.float64)
+    np.divide(lo, hi, out=out, where=(lo > 0))
+    return out
+
+
+def _sizes(lists):
+    return np.fromiter((len(x) for x in lists), dtype=np.int64, count=len(lists))
+
+
+def _text_bound_many(item, candidates, engine):
+    """Upper bound of text_similarity(item, c) for each candidate."""
+    if engine == "sequence":
+        return np.array([
+            max(
+                SequenceMatcher(None, (item.title or "").lower(), (c.title or "").lower()).real_quick_ratio(),
+                SequenceMatcher(None, (item.description or "").lower(), (c.description or "").lower()).real_quick_ratio(),
+            )
+            for c in candidates
+        ], dtype=np.float64)
+    # Shared hashes <= the smaller signature; the union >= the larger one.
+    title = _size_ratio_many(len(item.title_shingles), _sizes([c.title_shingles for c in candidates]))
+    desc = _size_ratio_many(len(item.description_shingles), _sizes([c.description_shingles for c in candidates]))
+    j = np.maximum(title, desc)
+    return 2 * j / (1 + j)
+
+
+def score_candidates(item, candidates, threshold=None, stats=None):
+    """
+    Score one item against many candidates at once.
+
+    Returns a list of breakdown dicts in candidate order, identical to calling
+    item_score_breakdown(item, c) for each c. Building, color, date and token
+    overlap are computed as NumPy arrays; only the fuzzy text part is per pair.
+
+    With a threshold, the cheap exact components (building, color, date, room)
+    are scored first, and the brand/model and fuzzy work is skipped for pairs
+    whose best possible total is still below it. Those entries are None.
+    """
+    candidates = list(candidates)
+    if not candidates:
+        return []
+    n = len(candidates)
+    run = ScoringStats()
+    run.candidates = n
+    engine = fuzzy_engine()
+
+    no_match = np.zeros(n, dtype=bool)
+    buildings = np.array([c.building_key for c in candidates], dtype=object)
+    same_building = (buildings == item.building_key) if item.building_key else no_match
+    colors = np.array([c.color_key for c in candidates], dtype=object)
+    same_color = (colors == item.color_key) if item.color_key else no_match
+    dates = 10.0 * _days_prox_many(item.date_lost_or_found, [c.date_lost_or_found for c in candidates])
+    rooms = 10.0 * _jaccard_many(item.room_tokens, [c.room_tokens for c in candidates])
+    cheap = 20.0 * same_building + 15.0 * same_color + dates + rooms
+
+    alive = np.ones(n, dtype=bool)
+    text_bound = None
+    if threshold is not None:
+        text_bound = 20.0 * _text_bound_many(item, candidates, engine)
+        brand_bound = np.maximum(
+            _size_ratio_many(len(item.brand_tokens), _sizes([c.brand_tokens for c in candidates])),
+            _size_ratio_many(len(item.model_tokens), _sizes([c.model_tokens for c in candidates])),
+        )
+        alive = cheap + 25.0 * brand_bound + text_bound + PRUNE_MARGIN >= threshold
+        run.pruned_before_tokens = int(n - alive.sum())
+
+    idx = np.flatnonzero(alive)
+    brand_model = np.zeros(n, dtype=np.float64)
+    if len(idx):
+        live = [candidates[i] for i in idx]
+        brand = _jaccard_many(item.brand_tokens, [c.brand_tokens for c in live])
+        model = _jaccard_many(item.model_tokens, [c.model_tokens for c in live])
+        brand_model[idx] = 25.0 * np.maximum(brand, model)
+
+    if threshold is not None:
+        before = int(alive.sum())
+        alive &= cheap + brand_model + text_bound + PRUNE_MARGIN >= threshold
+        run.pruned_before_fuzzy = before - int(alive.sum())
+
     results = []
-    for c in candidate_queryset(new_item, include_unapproved=include_unapproved):
-        bd = item_score_breakdown(new_item, c)
-        if bd["total"] >= 40:
+    for i, c in enumerate(candidates):
+        if not alive[i]:
+            results.append(None)
+            continue
+        text_score = text_similarity(item, c, engine)
+        breakdown = {
+            "building": 20.0 if same_building[i] else 0.0,
+            "color": 15.0 if same_color[i] else 0.0,
+            "brand_model_tokens": round(float(brand_model[i]), 2),
+            "title_desc_fuzzy": round(20.0 * text_score, 2),
+            "date_proximity": round(float(dates[i]), 2),
+            "room_tokens": round(float(rooms[i]), 2),
+        }
+        breakdown["total"] = round(
+            breakdown["building"]
+            + breakdown["color"]
+            + breakdown["brand_model_tokens"]
+            + breakdown["title_desc_fuzzy"]
+            + breakdown["date_proximity"]
+            + breakdown["room_tokens"],
+            1,
+        )
+        results.append(breakdown)
+    run.scored = n - run.pruned
+
+    scoring_stats.add(run)
+    if stats is not None:
+        stats.add(run)
+    return results
+
+
+def lost_found(a, b):
+    """Order a pair as (lost, found)."""
+    return (a, b) if a.status == Item.LOST else (b, a)
+
+
+def cached_score_candidates(item, candidates, threshold=None, stats=None):
+    """
+    score_candidates() through the pair score cache: cached breakdowns are
+    reused and only the misses are scored (and then cached).
+    """
+    cache = get_pair_cache()
+    candidates = list(candidates)
+    if cache is None or item.pk is None:
+        return score_candidates(item, candidates, threshold=threshold, stats=stats)
+
+    version = scoring_version()
+    keys = [pair_key(*lost_found(item, c), version) for c in candidates]
+    results = cache.get_many(keys)
+    misses = [i for i, key in enumerate(keys) if key not in results]
+
+    hits = ScoringStats()
+    hits.candidates = hits.cache_hits = len(candidates) - len(misses)
+    scoring_stats.add(hits)
+    if stats is not None:
+        stats.add(hits)
+
+    scored = score_candidates(item, [candidates[i] for i in misses], threshold=threshold, stats=stats)
+    fresh = {keys[i]: bd for i, bd in zip(misses, scored) if bd is not None}
+    cache.set_many(fresh)
+    results.update(fresh)
+    return [results.get(key) for key in keys]
+
+
+def find_matches_for(new_item, include_unapproved=False, stats=None):
+    candidates = list(candidate_queryset(new_item, include_unapproved=include_unapproved))
+    scored = cached_score_candidates(new_item, candidates, threshold=MATCH_THRESHOLD, stats=stats)
+    results = []
+    for c, bd in zip(candidates, scored):
+        if bd is not None and bd["total"] >= MATCH_THRESHOLD:
             results.append((c, bd["total"], bd))
     return results
 
 
+def _retire_if_weak(match):
+    """Retire a pending match that no longer qualifies; returns True if retired."""
+    lost, found = match.lost_item, match.found_item
+    compatible = (
+        lost.status == Item.LOST
+        and found.status == Item.FOUND
+        and lost.category_id == found.category_id
+    )
+    if match.status == Match.PENDING and (match.score < MATCH_THRESHOLD or not compatible):
+        match.status = Match.RETIRED
+        return True
+    return False
+
+
+def _item_matches(item):
+    return Match.objects.filter(Q(lost_item=item) | Q(found_item=item)).select_related(
+        "lost_item", "found_item"
+    )
+
+
+def refresh_best_scores(item_ids):
+    """
+    Recompute Item.best_match_score for `item_ids` (ids, or a values("pk")
+    queryset) with one UPDATE. Bulk writes to Match call this themselves;
+    single saves and deletes go through the signals in signals.py.
+    """
+    if isinstance(item_ids, (list, set, tuple)):
+        item_ids = [pk for pk in item_ids if pk is not None]
+        if not item_ids:
+            return 0
+    best = (
+        Match.objects.exclude(status=Match.RETIRED)
+        .filter(Q(lost_item=OuterRef("pk")) | Q(found_item=OuterRef("pk")))
+        .order_by("-score")
+        .values("score")[:1]
+    )
+    return Item.objects.filter(pk__in=item_ids).update(
+        best_match_score=Coalesce(Subquery(best), Value(Item.NO_MATCH_SCORE), output_field=FloatField()),
+    )
+
+
+def store_matches(item, results):
+    """
+    Bring an item's Match rows in line with the (candidate, score, breakdown)
+    results of find_matches_for(item).
+
+    New pairs are created and found pairs get the fresh score (a retired one
+    becomes pending again). Existing matches that were not found are rescored
+    directly and retired if they are pending and no longer qualify.
+    Returns the number of matches created.
+    """
+    existing = {(m.lost_item_id, m.found_item_id): m for m in _item_matches(item)}
+    new, changed = [], []
+    for other, score, breakdown in results:
+        lost, found = lost_found(item, other)
+        match = existing.pop((lost.pk, found.pk), None)
+        if match is None:
+            new.append(Match(lost_item=lost, found_item=found, score=score, score_breakdown=breakdown))
+            continue
+        match.score, match.score_breakdown = score, breakdown
+        if match.status == Match.RETIRED:
+            match.status = Match.PENDING
+        changed.append(match)
+
+    for match in existing.values():
+        if match.status == Match.RETIRED:
+            continue
+        match.score_breakdown = item_score_breakdown(match.lost_item, match.found_item)
+        match.score = match.score_breakdown["total"]
+        _retire_if_weak(match)
+        changed.append(match)
+
+    now = timezone.now()
+    for match in changed:
+        match.updated_at = now
+    Match.objects.bulk_create(new, ignore_conflicts=True)
+    Match.objects.bulk_update(changed, ["score", "score_breakdown", "status", "updated_at"])
+    touched = {item.pk}
+    for match in new + changed:
+        touched.update((match.lost_item_id, match.found_item_id))
+    refresh_best_scores(touched)
+    return len(new)
+
+
+def rescore_existing_matches(item, changed_fields):
+    """
+    Recompute only the score components that read `changed_fields` for the
+    item's existing matches, retiring pending ones that fall below the
+    threshold. Returns (rescored, retired).
+    """
+    components = components_for_fields(changed_fields)
+    if not components:
+        return 0, 0
+    matches = list(_item_matches(item).exclude(status=Match.RETIRED))
+    retired = 0
+    now = timezone.now()
+    for match in matches:
+        match.score_breakdown = rescore_components(
+            match.lost_item, match.found_item, match.score_breakdown, components
+        )
+        match.score = match.score_breakdown["total"]
+        match.updated_at = now
+        retired += _retire_if_weak(match)
+    Match.objects.bulk_update(matches, ["score", "score_breakdown", "status", "updated_at"])
+    refresh_best_scores({item.pk} | {m.lost_item_id for m in matches} | {m.found_item_id for m in matches})
+    return len(matches), retired
+
+
 def explain_match(a, b):
 
     details = []
     total = 0.0
 
     # Building
-    if (a.building or "").lower() == (b.building or "").lower():
+    if a.building_key == b.building_key:
         total += 20
         details.append("Same building (+20)")
 
     # Color
-    if a.color_primary and b.color_primary and a.color_primary.lower() == b.color_primary.lower():
+    if a.color_key and a.color_key == b.color_key:
         total += 15
         details.append(f"Same color ({a.color_primary}) (+15)")
 
     # Brand / model similarity
-    brand_sim = jaccard(norm(a.brand), norm(b.brand))
-    model_sim = jaccard(norm(a.model_or_markings), norm(b.model_or_markings))
+    brand_sim = jaccard(a.brand_tokens, b.brand_tokens)
+    model_sim = jaccard(a.model_tokens, b.model_tokens)
     brand_model_sim = max(brand_sim, model_sim)
     if brand_model_sim > 0:
         points = 25 * brand_model_sim
@@ -141,9 +564,7 @@ def explain_match(a, b):
         details.append(f"Brand/model similarity {brand_model_sim:.2f} (+{points:.1f})")
 
     # Title / description fuzzy similarity
-    title_sim = fuzzy(a.title, b.title)
-    desc_sim = fuzzy(a.description, b.description)
-    text_sim = max(title_sim, desc_sim)
+    text_sim = text_similarity(a, b)
     if text_sim > 0:
         points = 20 * text_sim
         total += points
@@ -157,7 +578,7 @@ def explain_match(a, b):
         details.append(f"Dates close ({date_prox:.2f}) (+{points:.1f})")
 
     # Room / area Jaccard
-    room_sim = jaccard(norm(a.room_or_area), norm(b.room_or_area))
+    room_sim = jaccard(a.room_tokens, b.room_tokens)
     if room_sim > 0:
         points = 10 * room_sim
         total += points
@@ -165,4 +586,25 @@ def explain_match(a, b):
 
     details.append(f"Total ≈ {round(total, 1)}")
 
-    return "; ".join(details)
\ No newline at end of file
+    return "; ".join(details)
+
+
+EXPLANATION_LABELS = {
+    "building": "Same building",
+    "color": "Same color",
+    "brand_model_tokens": "Brand/model similarity",
+    "title_desc_fuzzy": "Title/description similarity",
+    "date_proximity": "Dates close",
+    "room_tokens": "Room/area similarity",
+}
+
+
+def explain_breakdown(breakdown):
+    """explain_match-style summary of a stored score_breakdown, without rescoring."""
+    details = [
+        f"{label} (+{breakdown[name]:g})"
+        for name, label in EXPLANATION_LABELS.items()
+        if breakdown.get(name)
+    ]
+    details.append(f"Total ≈ {breakdown.get('total', 0)}")
+    return "; ".join(details)
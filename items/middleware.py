@@ -0,0 +1,64 @@
+import logging
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+from .query_stats import QueryStats
+
+logger = logging.getLogger(__name__)
+
+
+class QueryStatsMiddleware:
+    """
+    Record query count, duplicate fingerprints and DB time for each request.
+
+    The numbers are attached as request.query_stats and sent back in
+    X-Query-Count / X-Query-Duplicates headers and a Server-Timing "db" entry
+    (shown in the browser's network panel). Requests over
+    QUERY_STATS_WARN_QUERIES queries, or with duplicated queries, are logged.
+    Enabled by settings.QUERY_STATS_ENABLED, which defaults to DEBUG.
+
+    Under ASGI the middleware stays async, so long-lived streams don't hold
+    a worker thread. The stats hook the connection of the request's
+    thread-sensitive sync thread, where its ORM calls run. Queries a
+    streaming response makes while it streams are not counted.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not getattr(settings, "QUERY_STATS_ENABLED", settings.DEBUG):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.warn_queries = getattr(settings, "QUERY_STATS_WARN_QUERIES", 30)
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        with QueryStats() as stats:
+            request.query_stats = stats
+            response = self.get_response(request)
+        return self._report(request, response, stats)
+
+    async def __acall__(self, request):
+        stats = request.query_stats = QueryStats()
+        await sync_to_async(stats.__enter__)()
+        try:
+            response = await self.get_response(request)
+        finally:
+            await sync_to_async(stats.__exit__)(None, None, None)
+        return self._report(request, response, stats)
+
+    def _report(self, request, response, stats):
+        duplicates = stats.duplicates()
+        response["X-Query-Count"] = str(stats.count)
+        response["X-Query-Duplicates"] = str(len(duplicates))
+        response["Server-Timing"] = f'db;dur={stats.duration * 1000:.1f};desc="{stats.count} queries"'
+        if stats.count > self.warn_queries or duplicates:
+            logger.warning("%s %s: %s", request.method, request.path, stats.summary())
+        return response
@@ -0,0 +1,48 @@
+# Generated by Django 4.2.30 on 2026-10-17 23:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('items', '0003_profile_notification_match_breakdown'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='item',
+            name='brand_tokens',
+            field=models.JSONField(blank=True, default=list, editable=False),
+        ),
+        migrations.AddField(
+            model_name='item',
+            name='building_key',
+            field=models.CharField(blank=True, default='', editable=False, max_length=120),
+        ),
+        migrations.AddField(
+            model_name='item',
+            name='color_key',
+            field=models.CharField(blank=True, default='', editable=False, max_length=30),
+        ),
+        migrations.AddField(
+            model_name='item',
+            name='description_shingles',
+            field=models.JSONField(blank=True, default=list, editable=False),
+        ),
+        migrations.AddField(
+            model_name='item',
+            name='model_tokens',
+            field=models.JSONField(blank=True, default=list, editable=False),
+        ),
+        migrations.AddField(
+            model_name='item',
+            name='room_tokens',
+            field=models.JSONField(blank=True, default=list, editable=False),
+        ),
+        migrations.AddField(
+            model_name='item',
+            name='title_shingles',
+            field=models.JSONField(blank=True, default=list, editable=False),
+        ),
+    ]
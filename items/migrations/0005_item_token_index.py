@@ -0,0 +1,30 @@
+# Generated by Django 4.2.30 on 2026-10-17 23:31
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('items', '0004_item_match_features'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ItemToken',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('token', models.CharField(max_length=80)),
+                ('weight', models.FloatField()),
+                ('status', models.CharField(choices=[('LOST', 'Lost'), ('FOUND', 'Found'), ('CLAIMED', 'Claimed')], max_length=10)),
+                ('approved', models.BooleanField(default=False)),
+                ('category', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='items.category')),
+                ('item', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='match_tokens', to='items.item')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['token', 'status', 'category', 'approved'], name='itemtoken_lookup_idx')],
+                'unique_together': {('item', 'token')},
+            },
+        ),
+    ]
@@ -0,0 +1,40 @@
+from django.db import migrations
+
+FIELDS = "title, description, brand, model_or_markings, room_or_area"
+PG_VECTOR = (
+    "to_tsvector('english', coalesce(items_item.title, '') || ' ' || coalesce(items_item.description, '')"
+    " || ' ' || coalesce(items_item.brand, '') || ' ' || coalesce(items_item.model_or_markings, '')"
+    " || ' ' || coalesce(items_item.room_or_area, ''))"
+)
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == "sqlite":
+        schema_editor.execute(
+            f"CREATE VIRTUAL TABLE items_item_fts USING fts5({FIELDS}, tokenize='unicode61 remove_diacritics 2')"
+        )
+        schema_editor.execute(
+            f"INSERT INTO items_item_fts (rowid, {FIELDS}) SELECT id, {FIELDS} FROM items_item"
+        )
+    elif vendor == "postgresql":
+        schema_editor.execute(f"CREATE INDEX items_item_search_idx ON items_item USING GIN ({PG_VECTOR})")
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == "sqlite":
+        schema_editor.execute("DROP TABLE IF EXISTS items_item_fts")
+    elif vendor == "postgresql":
+        schema_editor.execute("DROP INDEX IF EXISTS items_item_search_idx")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('items', '0007_match_retired_status'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
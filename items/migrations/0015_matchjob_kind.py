@@ -0,0 +1,26 @@
+# Generated by Django 4.2.30 on 2026-10-18 00:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('items', '0014_matchjob_batch'),
+    ]
+
+    operations = [
+        migrations.RemoveConstraint(
+            model_name='matchjob',
+            name='matchjob_one_pending_per_item',
+        ),
+        migrations.AddField(
+            model_name='matchjob',
+            name='kind',
+            field=models.CharField(choices=[('MATCH', 'Match generation'), ('THUMBNAILS', 'Photo thumbnails')], default='MATCH', max_length=20),
+        ),
+        migrations.AddConstraint(
+            model_name='matchjob',
+            constraint=models.UniqueConstraint(condition=models.Q(('status', 'PENDING')), fields=('item', 'kind'), name='matchjob_one_pending_per_item_kind'),
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 4.2.30 on 2026-10-18 00:43
+
+from django.db import migrations, models
+from django.db.models import FloatField, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def fill_best_match_score(apps, schema_editor):
+    Item = apps.get_model("items", "Item")
+    Match = apps.get_model("items", "Match")
+    best = (
+        Match.objects.exclude(status="RETIRED")
+        .filter(Q(lost_item=OuterRef("pk")) | Q(found_item=OuterRef("pk")))
+        .order_by("-score")
+        .values("score")[:1]
+    )
+    Item.objects.update(best_match_score=Coalesce(Subquery(best), Value(-1.0), output_field=FloatField()))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('items', '0015_matchjob_kind'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='item',
+            name='best_match_score',
+            field=models.FloatField(default=-1.0, editable=False),
+        ),
+        migrations.RunPython(fill_best_match_score, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='item',
+            index=models.Index(condition=models.Q(('approved', False)), fields=['-best_match_score', '-id'], name='item_pending_score_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='item',
+            index=models.Index(condition=models.Q(('approved', True)), fields=['-best_match_score', '-id'], name='item_public_score_idx'),
+        ),
+    ]
@@ -0,0 +1,20 @@
+from django.db import migrations
+
+from items.features import fill_match_features
+
+
+def fill_features(apps, schema_editor):
+    # Rows written before 0004 have empty feature columns, which the matcher
+    # reads instead of the source fields.
+    fill_match_features(apps.get_model("items", "Item"))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('items', '0017_listing_and_feed_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(fill_features, migrations.RunPython.noop),
+    ]
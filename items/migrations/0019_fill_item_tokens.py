@@ -0,0 +1,20 @@
+from django.db import migrations
+
+from items import token_index
+
+
+def fill_item_tokens(apps, schema_editor):
+    # Items saved before 0005 have no index rows, so candidate_queryset
+    # would never find them.
+    token_index.rebuild(apps.get_model("items", "Item"), apps.get_model("items", "ItemToken"))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('items', '0018_fill_match_features'),
+    ]
+
+    operations = [
+        migrations.RunPython(fill_item_tokens, migrations.RunPython.noop),
+    ]
@@ -2,6 +2,9 @@ from django.db import models
 from django.contrib.auth import get_user_model
 from django.conf import settings
 from django.utils import timezone
+
+from .features import match_features
+
 User = get_user_model()
 
 class Category(models.Model):
@@ -12,6 +15,7 @@ class Category(models.Model):
 class Item(models.Model):
     LOST, FOUND, CLAIMED = 'LOST','FOUND','CLAIMED'
     STATUS_CHOICES = [(LOST,'Lost'),(FOUND,'Found'),(CLAIMED,'Claimed')]
+    NO_MATCH_SCORE = -1.0
 
     owner = models.ForeignKey(User, on_delete=models.CASCADE, related_name='items')
     category = models.ForeignKey(Category, on_delete=models.PROTECT, related_name='items')
@@ -30,22 +34,138 @@ class Item(models.Model):
     date_reported = models.DateTimeField(auto_now_add=True)
 
     photo = models.ImageField(upload_to='items/', blank=True, null=True)
+    # Manifest of resized copies of photo (see items.thumbnails), written after save.
+    photo_thumbnails = models.JSONField(default=dict, blank=True, editable=False)
 
     approved = models.BooleanField(default=False)
     updated_at = models.DateTimeField(auto_now=True)
+    # Score of the item's best non-retired match (NO_MATCH_SCORE without one),
+    # kept by matching.refresh_best_scores so the review queue can keyset-page on it.
+    best_match_score = models.FloatField(default=NO_MATCH_SCORE, editable=False)
+    # Row key from an imported desk log (import_items), so re-runs skip it.
+    external_id = models.CharField(max_length=100, unique=True, null=True, blank=True, editable=False)
+
+    # Normalized match features, derived from the fields above on save.
+    building_key = models.CharField(max_length=120, blank=True, default='', editable=False)
+    color_key = models.CharField(max_length=30, blank=True, default='', editable=False)
+    brand_tokens = models.JSONField(default=list, blank=True, editable=False)
+    model_tokens = models.JSONField(default=list, blank=True, editable=False)
+    room_tokens = models.JSONField(default=list, blank=True, editable=False)
+    title_shingles = models.JSONField(default=list, blank=True, editable=False)
+    description_shingles = models.JSONField(default=list, blank=True, editable=False)
+
+    # Fields the matcher reads; changes to CANDIDATE_FIELDS also change which
+    # items are candidates, so they need a full candidate search. Candidates
+    # come from the token index, so its source fields are among them.
+    MATCH_FIELDS = {
+        'status', 'category_id', 'building', 'date_lost_or_found', 'color_primary',
+        'brand', 'model_or_markings', 'room_or_area', 'title', 'description',
+    }
+    TOKEN_FIELD_WEIGHTS = [
+        ('brand', 3.0),
+        ('model_or_markings', 3.0),
+        ('title', 2.0),
+        ('room_or_area', 1.0),
+    ]
+    CANDIDATE_FIELDS = {'status', 'category_id', 'building', 'date_lost_or_found'} | {
+        field for field, _weight in TOKEN_FIELD_WEIGHTS
+    }
+
+    # Source fields the features are derived from, and the features themselves.
+    FEATURE_SOURCE_FIELDS = {
+        'building', 'color_primary', 'brand', 'model_or_markings',
+        'room_or_area', 'title', 'description',
+    }
+    FEATURE_FIELDS = [
+        'building_key', 'color_key', 'brand_tokens', 'model_tokens',
+        'room_tokens', 'title_shingles', 'description_shingles',
+    ]
+
+    class Meta:
+        ordering = ['-date_reported']
+        indexes = [
+            # Public listings (home, item_list, API) and the review queue, newest
+            # first in keyset order. Partial, because Django filters booleans as
+            # a bare `WHERE approved`, which can't seek on an approved column.
+            models.Index(
+                fields=['-date_reported', '-id'], condition=models.Q(approved=True), name='item_public_recent_idx',
+            ),
+            models.Index(
+                fields=['status', '-date_reported', '-id'], condition=models.Q(approved=True),
+                name='item_public_status_idx',
+            ),
+            models.Index(
+                fields=['-date_reported', '-id'], condition=models.Q(approved=False), name='item_pending_recent_idx',
+            ),
+            # Review queue sorted by best match score.
+            models.Index(
+                fields=['-best_match_score', '-id'], condition=models.Q(approved=False), name='item_pending_score_idx',
+            ),
+            models.Index(
+                fields=['-best_match_score', '-id'], condition=models.Q(approved=True), name='item_public_score_idx',
+            ),
+            # API changes feed.
+            models.Index(
+                fields=['updated_at', 'id'], condition=models.Q(approved=True), name='item_public_updated_idx',
+            ),
+            # Match candidates: status/category equality, then the date window.
+            models.Index(fields=['status', 'category', 'date_lost_or_found'], name='item_candidates_idx'),
+            # Public listing filtered by building.
+            models.Index(
+                fields=['building_key', '-date_reported', '-id'], condition=models.Q(approved=True),
+                name='item_public_building_idx',
+            ),
+            # Newest candidates logged in the same building.
+            models.Index(
+                fields=['building_key', 'status', 'category', '-date_reported'], name='item_building_recent_idx',
+            ),
+        ]
 
-    class Meta: ordering = ['-date_reported']
     def __str__(self): return f'{self.title} ({self.status})'
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._snapshot_match_fields()
+        return instance
+
+    def _snapshot_match_fields(self):
+        loaded = self.__dict__
+        self._loaded_match_values = {f: loaded[f] for f in self.MATCH_FIELDS if f in loaded}
+
+    def changed_match_fields(self):
+        """Match fields changed since the item was loaded (all of them for a new item)."""
+        loaded = getattr(self, '_loaded_match_values', None)
+        if loaded is None:
+            return set(self.MATCH_FIELDS)
+        return {f for f, value in loaded.items() if getattr(self, f) != value}
+
+    def refresh_match_features(self):
+        for name, value in match_features(self).items():
+            setattr(self, name, value)
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None:
+            self.refresh_match_features()
+        elif self.FEATURE_SOURCE_FIELDS.intersection(update_fields):
+            self.refresh_match_features()
+            kwargs['update_fields'] = set(update_fields) | set(self.FEATURE_FIELDS)
+        super().save(*args, **kwargs)
+        self._snapshot_match_fields()
+
 class Match(models.Model):
     PENDING = "PENDING"
     CONFIRMED = "CONFIRMED"
     REJECTED = "REJECTED"
+    # Pending match whose score dropped below the threshold after an edit.
+    RETIRED = "RETIRED"
 
     STATUS_CHOICES = [
         (PENDING, "Pending"),
         (CONFIRMED, "Confirmed"),
         (REJECTED, "Rejected"),
+        (RETIRED, "Retired"),
     ]
 
     lost_item = models.ForeignKey(Item, related_name="lost_matches", on_delete=models.CASCADE)
@@ -55,6 +175,21 @@ class Match(models.Model):
 
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=PENDING)
     created_at = models.DateTimeField(auto_now_add=True)
+    # auto_now doesn't apply to update()/bulk_update(); those set it explicitly.
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = [("lost_item", "found_item")]
+        indexes = [
+            # An item's matches, best first (item_detail, review queue). The
+            # unique (lost_item, found_item) index doesn't give score order.
+            models.Index(fields=["lost_item", "-score"], name="match_lost_score_idx"),
+            models.Index(fields=["found_item", "-score"], name="match_found_score_idx"),
+            models.Index(fields=["status", "-score"], name="match_status_score_idx"),
+            # Staff /api/matches/, newest first, and its changes feed.
+            models.Index(fields=["-created_at", "-id"], name="match_recent_idx"),
+            models.Index(fields=["updated_at", "id"], name="match_updated_idx"),
+        ]
 
     def __str__(self):
         return f"{self.lost_item} ↔ {self.found_item} ({self.score})"
@@ -88,6 +223,7 @@ class Notification(models.Model):
 
     is_read = models.BooleanField(default=False)
     created_at = models.DateTimeField(default=timezone.now)
+    updated_at = models.DateTimeField(auto_now=True)
     created_by = models.ForeignKey(
         settings.AUTH_USER_MODEL,
         on_delete=models.SET_NULL,
@@ -96,6 +232,16 @@ class Notification(models.Model):
         related_name="created_mavfinder_notifications",
     )
 
+    class Meta:
+        indexes = [
+            # Notifications page and API, newest first.
+            models.Index(fields=["recipient", "-created_at", "-id"], name="notification_recent_idx"),
+            # API changes feed.
+            models.Index(fields=["recipient", "updated_at", "id"], name="notification_updated_idx"),
+            # Unread counts only touch the (few) unread rows.
+            models.Index(fields=["recipient"], condition=models.Q(is_read=False), name="notification_unread_idx"),
+        ]
+
     def __str__(self):
         return f"Notif to {self.recipient} - {self.title}"
 
@@ -124,4 +270,136 @@ class Profile(models.Model):
     )
 
     def __str__(self):
-        return f"Profile: {self.user.username}"
\ No newline at end of file
+        return f"Profile: {self.user.username}"
+
+class ItemToken(models.Model):
+    """
+    Inverted index row: one match token of one item.
+
+    status/category/approved are copied from the item so candidate lookups
+    can be scoped without joining the item table.
+    """
+    item = models.ForeignKey(Item, on_delete=models.CASCADE, related_name="match_tokens")
+    token = models.CharField(max_length=80)
+    weight = models.FloatField()
+
+    status = models.CharField(max_length=10, choices=Item.STATUS_CHOICES)
+    category = models.ForeignKey(Category, on_delete=models.CASCADE, related_name="+")
+    approved = models.BooleanField(default=False)
+
+    class Meta:
+        unique_together = [("item", "token")]
+        indexes = [
+            models.Index(fields=["token", "status", "category", "approved"], name="itemtoken_lookup_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.token} -> {self.item_id}"
+
+
+class MatchJob(models.Model):
+    """
+    Queued background work on items, run by the run_match_worker command:
+    match generation for one item or for the items listed in item_ids (a
+    batch job, item unset), or building one item's photo thumbnails.
+    """
+    MATCH = "MATCH"
+    THUMBNAILS = "THUMBNAILS"
+
+    KIND_CHOICES = [
+        (MATCH, "Match generation"),
+        (THUMBNAILS, "Photo thumbnails"),
+    ]
+
+    PENDING = "PENDING"
+    RUNNING = "RUNNING"
+    DONE = "DONE"
+    DEAD = "DEAD"
+
+    STATUS_CHOICES = [
+        (PENDING, "Pending"),
+        (RUNNING, "Running"),
+        (DONE, "Done"),
+        (DEAD, "Dead"),
+    ]
+
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES, default=MATCH)
+    item = models.ForeignKey(Item, on_delete=models.CASCADE, related_name="match_jobs", null=True, blank=True)
+    item_ids = models.JSONField(default=list, blank=True)
+    include_unapproved = models.BooleanField(default=False)
+
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING)
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=5)
+    run_after = models.DateTimeField(default=timezone.now)
+    lease_expires_at = models.DateTimeField(null=True, blank=True)
+    locked_by = models.CharField(max_length=100, blank=True, default="")
+    last_error = models.TextField(blank=True, default="")
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            # At most one queued job of each kind per item; repeated requests reuse it.
+            models.UniqueConstraint(
+                fields=["item", "kind"],
+                condition=models.Q(status="PENDING"),
+                name="matchjob_one_pending_per_item_kind",
+            ),
+        ]
+        indexes = [
+            models.Index(fields=["status", "run_after"], name="matchjob_ready_idx"),
+        ]
+
+    def __str__(self):
+        target = f"item {self.item_id}" if self.item_id is not None else f"{len(self.item_ids)} items"
+        return f"{self.get_kind_display()} job {self.pk} for {target} ({self.status})"
+
+
+class OutboundMessage(models.Model):
+    """
+    Outbox row: one notification to deliver over an external channel
+    (email, phone), sent in batches by the run_outbox_worker command.
+    """
+    PENDING = "PENDING"
+    SENDING = "SENDING"
+    SENT = "SENT"
+    DEAD = "DEAD"
+
+    STATUS_CHOICES = [
+        (PENDING, "Pending"),
+        (SENDING, "Sending"),
+        (SENT, "Sent"),
+        (DEAD, "Dead"),
+    ]
+
+    recipient = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="outbound_messages",
+    )
+    notification = models.ForeignKey(
+        Notification, on_delete=models.SET_NULL, null=True, blank=True, related_name="outbound_messages",
+    )
+    channel = models.CharField(max_length=10, choices=Profile.CONTACT_CHOICES)
+    address = models.CharField(max_length=254)
+    subject = models.CharField(max_length=200)
+    body = models.TextField()
+
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING)
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=5)
+    run_after = models.DateTimeField(default=timezone.now)
+    lease_expires_at = models.DateTimeField(null=True, blank=True)
+    locked_by = models.CharField(max_length=100, blank=True, default="")
+    last_error = models.TextField(blank=True, default="")
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["status", "run_after"], name="outbox_ready_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.channel} to {self.address} ({self.status})"
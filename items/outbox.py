@@ -0,0 +1,222 @@
+"""
+Outbox for notifications delivered outside the site (email, phone).
+
+notify_match queues OutboundMessage rows with bulk_create, in the same
+transaction as the in-app Notification rows, instead of sending anything
+during the request. The run_outbox_worker command delivers them: each batch
+claims due messages under a lease, coalesces a user's pending messages on
+one channel into a single digest and hands the digests to that channel's
+sender, which sends them over one connection (one SMTP session per batch for
+email). Failures are retried with jobs.backoff_delay until max_attempts,
+then marked DEAD.
+
+Channels are settings.OUTBOX_CHANNELS, {Profile contact method: dotted path
+of a sender class}. A sender is built once per batch and implements
+send(digests, throttle) -> [error or None per digest], calling throttle()
+before each message. Users whose preferred method has no sender (phone,
+unless one is configured, and in-app) only get the in-app notification.
+"""
+import logging
+import smtplib
+import time
+import uuid
+from collections import namedtuple
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.mail import EmailMessage, get_connection
+from django.db.models import F, Q
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .jobs import backoff_delay
+from .models import OutboundMessage, Profile
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHANNELS = {Profile.CONTACT_EMAIL: "items.outbox.EmailSender"}
+
+# One message to send: every outbox row in it gets the same outcome.
+Digest = namedtuple("Digest", "recipient_id channel address subject body messages")
+
+
+def _channels():
+    return getattr(settings, "OUTBOX_CHANNELS", DEFAULT_CHANNELS)
+
+
+def _address(user, channel):
+    if channel == Profile.CONTACT_EMAIL:
+        return user.email
+    if channel == Profile.CONTACT_PHONE:
+        profile = getattr(user, "profile", None)
+        return profile.phone_number if profile else ""
+    return ""
+
+
+def enqueue_notifications(notifications):
+    """
+    Queue external delivery of newly created notifications on each
+    recipient's preferred contact method. Returns the number of rows queued.
+    """
+    notifications = list(notifications)
+    users = get_user_model().objects.filter(
+        pk__in={n.recipient_id for n in notifications}
+    ).select_related("profile")
+    users = {user.pk: user for user in users}
+    channels = _channels()
+    run_after = timezone.now() + timedelta(seconds=getattr(settings, "OUTBOX_DIGEST_WINDOW", 60))
+    site_url = getattr(settings, "SITE_URL", "").rstrip("/")
+
+    rows = []
+    for notification in notifications:
+        user = users[notification.recipient_id]
+        profile = getattr(user, "profile", None)
+        channel = profile.preferred_contact_method if profile else Profile.CONTACT_EMAIL
+        address = _address(user, channel)
+        if channel not in channels or not address:
+            continue
+        body = notification.message
+        if notification.url:
+            body += f"\n\n{site_url}{notification.url}"
+        rows.append(OutboundMessage(
+            recipient=user, notification=notification, channel=channel, address=address,
+            subject=notification.title, body=body, run_after=run_after,
+        ))
+    OutboundMessage.objects.bulk_create(rows)
+    return len(rows)
+
+
+class EmailSender:
+    """Sends digests as email over one connection per batch."""
+
+    def __init__(self):
+        self.from_email = settings.DEFAULT_FROM_EMAIL
+
+    def send(self, digests, throttle=lambda: None):
+        errors = [None] * len(digests)
+        connection = get_connection(fail_silently=False)
+        connection.open()
+        try:
+            for i, digest in enumerate(digests):
+                throttle()
+                message = EmailMessage(
+                    digest.subject, digest.body, self.from_email, [digest.address], connection=connection,
+                )
+                try:
+                    message.send()
+                except (smtplib.SMTPException, OSError) as e:
+                    errors[i] = f"{type(e).__name__}: {e}"
+        finally:
+            connection.close()
+        return errors
+
+
+class RateLimiter:
+    """Spaces calls at least 1/rate seconds apart; no limit when rate is falsy."""
+
+    def __init__(self, rate=None, clock=time.monotonic, sleep=time.sleep):
+        self.interval = 1 / rate if rate else 0
+        self.clock = clock
+        self.sleep = sleep
+        self._next = None
+
+    def __call__(self):
+        if not self.interval:
+            return
+        now = self.clock()
+        if self._next is not None and now < self._next:
+            self.sleep(self._next - now)
+            now = self._next
+        self._next = now + self.interval
+
+
+def claim_messages(worker_id, limit=100, lease_seconds=300):
+    """
+    Claim up to `limit` due messages (pending and due, or sending with an
+    expired lease) plus their recipients' other fresh pending messages, so
+    those ride along in the same digest. The claim is one conditional
+    UPDATE, so two workers never take the same row.
+    """
+    now = timezone.now()
+    claimable = Q(status=OutboundMessage.PENDING, run_after__lte=now) | Q(
+        status=OutboundMessage.SENDING, lease_expires_at__lt=now
+    )
+    due = list(
+        OutboundMessage.objects.filter(claimable)
+        .order_by("run_after", "pk")
+        .values_list("pk", "recipient_id")[:limit]
+    )
+    if not due:
+        return []
+    token = f"{worker_id}:{uuid.uuid4().hex[:8]}"
+    ride_along = Q(status=OutboundMessage.PENDING, attempts=0, recipient_id__in={r for _, r in due})
+    OutboundMessage.objects.filter((claimable & Q(pk__in=[pk for pk, _ in due])) | ride_along).update(
+        status=OutboundMessage.SENDING,
+        locked_by=token,
+        lease_expires_at=now + timedelta(seconds=lease_seconds),
+        attempts=F("attempts") + 1,
+    )
+    return list(OutboundMessage.objects.filter(status=OutboundMessage.SENDING, locked_by=token).order_by("pk"))
+
+
+def build_digests(messages):
+    """Coalesce messages into one Digest per (recipient, channel, address)."""
+    groups = {}
+    for message in messages:
+        groups.setdefault((message.recipient_id, message.channel, message.address), []).append(message)
+    digests = []
+    for (recipient_id, channel, address), group in groups.items():
+        if len(group) == 1:
+            subject, body = group[0].subject, group[0].body
+        else:
+            subject = f"{len(group)} new notifications from MavFinder"
+            body = "\n\n---\n\n".join(f"{m.subject}\n\n{m.body}" for m in group)
+        digests.append(Digest(recipient_id, channel, address, subject, body, group))
+    return digests
+
+
+def _send(channel, digests, throttle):
+    path = _channels().get(channel)
+    if path is None:
+        return [f"No sender configured for channel {channel}"] * len(digests)
+    try:
+        return import_string(path)().send(digests, throttle=throttle)
+    except Exception as e:
+        logger.exception("Sending %d %s digests failed: %s", len(digests), channel, e)
+        return [f"{type(e).__name__}: {e}"] * len(digests)
+
+
+def mark_sent(messages):
+    OutboundMessage.objects.filter(pk__in=[m.pk for m in messages]).update(
+        status=OutboundMessage.SENT, sent_at=timezone.now(), lease_expires_at=None, last_error="",
+    )
+
+
+def mark_failed(messages, error):
+    now = timezone.now()
+    for message in messages:
+        if message.attempts >= message.max_attempts:
+            changes = {"status": OutboundMessage.DEAD}
+        else:
+            changes = {"status": OutboundMessage.PENDING, "run_after": now + backoff_delay(message.attempts)}
+        OutboundMessage.objects.filter(pk=message.pk).update(lease_expires_at=None, last_error=error, **changes)
+
+
+def process_outbox(worker_id, limit=100, lease_seconds=300, throttle=lambda: None):
+    """Claim and deliver one batch of messages. Returns the number of messages claimed."""
+    messages = claim_messages(worker_id, limit=limit, lease_seconds=lease_seconds)
+    by_channel = {}
+    for digest in build_digests(messages):
+        by_channel.setdefault(digest.channel, []).append(digest)
+
+    sent = []
+    for channel, digests in by_channel.items():
+        for digest, error in zip(digests, _send(channel, digests, throttle)):
+            if error is None:
+                sent.extend(digest.messages)
+            else:
+                logger.warning("Delivery to %s over %s failed: %s", digest.address, channel, error)
+                mark_failed(digest.messages, error)
+    mark_sent(sent)
+    return len(messages)
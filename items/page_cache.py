@@ -0,0 +1,71 @@
+"""
+Versioned cache for rendered fragments of the public listing pages.
+
+Every key embeds a listing version; saving or deleting an Item or Category,
+or approving items, bumps it (see signals.py) so all cached fragments are
+dropped at once without tracking which pages an item appears on. The
+cache must be shared between workers (prod settings use Redis), or a bump
+only reaches the worker that handled the edit and the others serve stale
+listings until PUBLIC_PAGE_CACHE_TIMEOUT; `manage.py check --deploy` warns
+about a per-process cache.
+
+settings.PUBLIC_PAGE_CACHE names the cache alias (None disables caching)
+and PUBLIC_PAGE_CACHE_TIMEOUT bounds how long a fragment is kept.
+"""
+import hashlib
+import time
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.safestring import mark_safe
+
+VERSION_KEY = "public-pages:version"
+
+
+def _cache():
+    alias = getattr(settings, "PUBLIC_PAGE_CACHE", "default")
+    return caches[alias] if alias else None
+
+
+def _initial_version():
+    # Seeded from the clock so a version key lost to eviction never comes
+    # back as a number that older fragments were stored under.
+    return time.time_ns() // 1000
+
+
+def listing_version(cache):
+    return cache.get_or_set(VERSION_KEY, _initial_version, None)
+
+
+def bump_listing_version():
+    cache = _cache()
+    if cache is None:
+        return
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        cache.set(VERSION_KEY, _initial_version(), None)
+
+
+def fragment_key(cache, name, params):
+    query = urlencode(sorted(params.items()))
+    digest = hashlib.md5(query.encode()).hexdigest()
+    return f"public-pages:{listing_version(cache)}:{name}:{digest}"
+
+
+def cached_fragment(name, render, params=None):
+    """
+    HTML for fragment `name` with the given parameters (a dict of the
+    values the fragment depends on), calling render() and storing the
+    result on a miss.
+    """
+    cache = _cache()
+    if cache is None:
+        return render()
+    key = fragment_key(cache, name, params or {})
+    html = cache.get(key)
+    if html is None:
+        html = render()
+        cache.set(key, str(html), getattr(settings, "PUBLIC_PAGE_CACHE_TIMEOUT", 3600))
+    return mark_safe(html)
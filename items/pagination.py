@@ -0,0 +1,168 @@
+"""
+Keyset (cursor) pagination.
+
+Pages are selected with a WHERE on the ordering columns instead of OFFSET, so
+every page costs the same as the first. Cursors are opaque, URL-safe strings
+encoding the ordering values of the row at the page edge.
+"""
+import base64
+import json
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models import Q
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def _field_name(order):
+    return order.lstrip("-")
+
+
+class KeysetPage:
+    def __init__(self, object_list, next_cursor, previous_cursor, query, param):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+        self._query = query
+        self._param = param
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    @property
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    @property
+    def has_other_pages(self):
+        return self.has_next or self.has_previous
+
+    def _link(self, cursor):
+        query = self._query.copy()
+        query[self._param] = cursor
+        return query.urlencode()
+
+    @property
+    def next_query(self):
+        """Query string for the next page, keeping the request's other parameters."""
+        return self._link(self.next_cursor) if self.has_next else ""
+
+    @property
+    def previous_query(self):
+        return self._link(self.previous_cursor) if self.has_previous else ""
+
+
+class KeysetPaginator:
+    """
+    Paginate `queryset` by `ordering`, e.g. ("-date_reported", "-id").
+
+    All ordering fields must sort in the same direction and the last one must
+    be unique (normally the primary key) so every row has a distinct position.
+    Ordering on an annotation needs its output field in `annotations`, e.g.
+    {"rank": FloatField()}.
+    """
+
+    def __init__(self, queryset, ordering, per_page=25, annotations=None):
+        directions = {order.startswith("-") for order in ordering}
+        if len(directions) != 1:
+            raise ValueError("Keyset ordering fields must share one direction")
+        self.queryset = queryset
+        self.ordering = list(ordering)
+        self.descending = directions.pop()
+        self.per_page = per_page
+        self.annotations = annotations or {}
+        # (attribute name, field used to parse cursor values) per ordering column
+        self.fields = [self._column(_field_name(o)) for o in ordering]
+
+    def _column(self, name):
+        if name in self.annotations:
+            return name, self.annotations[name]
+        opts = self.queryset.model._meta
+        try:
+            field = opts.get_field(name)
+        except FieldDoesNotExist:
+            if name not in ("id", "pk"):
+                raise
+            field = opts.pk
+        return field.attname, field
+
+    # Cursor encoding
+
+    def encode(self, obj, direction):
+        values = []
+        for name, _field in self.fields:
+            value = getattr(obj, name)
+            values.append(value.isoformat() if hasattr(value, "isoformat") else value)
+        raw = json.dumps({"v": values, "d": direction}, separators=(",", ":"))
+        return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+    def decode(self, cursor):
+        try:
+            padded = cursor + "=" * (-len(cursor) % 4)
+            data = json.loads(base64.urlsafe_b64decode(padded.encode()))
+            values = [f.to_python(v) for (_name, f), v in zip(self.fields, data["v"], strict=True)]
+            direction = data["d"]
+        except (ValueError, KeyError, TypeError, ValidationError) as e:
+            raise InvalidCursor(str(e))
+        if direction not in ("next", "prev"):
+            raise InvalidCursor(direction)
+        return values, direction
+
+    def _after(self, values, forward):
+        """Q for rows strictly after (forward) or before the given position."""
+        # Going forward on a descending order means smaller values.
+        lookup = "lt" if self.descending == forward else "gt"
+        q = Q()
+        for i, (name, _field) in enumerate(self.fields):
+            step = Q(**{f"{name}__{lookup}": values[i]})
+            for (prior, _f), value in zip(self.fields[:i], values[:i]):
+                step &= Q(**{prior: value})
+            q |= step
+        return q
+
+    def _reversed(self):
+        return [o[1:] if o.startswith("-") else f"-{o}" for o in self.ordering]
+
+    def get_page(self, query, param="cursor"):
+        """
+        The page selected by query[param] (a QueryDict such as request.GET).
+        A missing or invalid cursor gives the first page.
+        """
+        cursor = query.get(param)
+        values, direction = None, "next"
+        if cursor:
+            try:
+                values, direction = self.decode(cursor)
+            except InvalidCursor:
+                values = None
+
+        qs = self.queryset
+        if values is None:
+            rows = list(qs.order_by(*self.ordering)[: self.per_page + 1])
+            more, moved = len(rows) > self.per_page, False
+        elif direction == "next":
+            rows = list(qs.filter(self._after(values, True)).order_by(*self.ordering)[: self.per_page + 1])
+            more, moved = len(rows) > self.per_page, True
+        else:
+            rows = list(qs.filter(self._after(values, False)).order_by(*self._reversed())[: self.per_page + 1])
+            more, moved = len(rows) > self.per_page, True
+            rows = rows[: self.per_page][::-1]
+
+        if direction == "next" or values is None:
+            rows = rows[: self.per_page]
+            has_next, has_previous = more, moved
+        else:
+            has_next, has_previous = moved, more
+
+        next_cursor = self.encode(rows[-1], "next") if rows and has_next else None
+        previous_cursor = self.encode(rows[0], "prev") if rows and has_previous else None
+        return KeysetPage(rows, next_cursor, previous_cursor, query, param)
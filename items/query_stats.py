@@ -0,0 +1,80 @@
+"""
+Per-request database query statistics.
+
+QueryStats hooks every database connection with an execute wrapper, so it
+works with DEBUG off and sees each statement once, before parameters are
+interpolated. Queries that differ only in their parameters share a
+fingerprint; a fingerprint seen more than once in a request is usually an
+N+1 loop.
+"""
+import re
+import time
+from collections import Counter
+from contextlib import ExitStack
+
+from django.db import connections
+
+# "IN (%s, %s, %s)" -> "IN (...)" so lists of different lengths match.
+_PLACEHOLDER_LIST_RE = re.compile(r"\((?:\s*%s\s*,)+\s*%s\s*\)")
+_SPACE_RE = re.compile(r"\s+")
+
+# Transaction bookkeeping, not application queries.
+_IGNORED_PREFIXES = ("SAVEPOINT", "RELEASE SAVEPOINT", "ROLLBACK TO SAVEPOINT")
+
+
+def fingerprint(sql):
+    return _SPACE_RE.sub(" ", _PLACEHOLDER_LIST_RE.sub("(...)", sql)).strip()
+
+
+class QueryStats:
+    """
+    Context manager recording the queries run inside it:
+
+        with QueryStats() as stats:
+            response = view(request)
+        stats.count, stats.duration, stats.duplicates()
+    """
+
+    def __init__(self, aliases=None):
+        self.aliases = aliases
+        self.queries = []  # (fingerprint, seconds)
+        self._stack = None
+
+    def __enter__(self):
+        self._stack = ExitStack()
+        aliases = self.aliases or list(connections)
+        for alias in aliases:
+            self._stack.enter_context(connections[alias].execute_wrapper(self._record))
+        return self
+
+    def __exit__(self, *exc):
+        self._stack.close()
+
+    def _record(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            if not sql.lstrip().upper().startswith(_IGNORED_PREFIXES):
+                self.queries.append((fingerprint(sql), time.perf_counter() - start))
+
+    @property
+    def count(self):
+        return len(self.queries)
+
+    @property
+    def duration(self):
+        """Total database time in seconds."""
+        return sum(seconds for _, seconds in self.queries)
+
+    def duplicates(self):
+        """{fingerprint: times run} for fingerprints run more than once."""
+        counts = Counter(fp for fp, _ in self.queries)
+        return {fp: n for fp, n in counts.items() if n > 1}
+
+    def summary(self):
+        duplicates = self.duplicates()
+        lines = [f"{self.count} queries, {self.duration * 1000:.1f} ms, {len(duplicates)} duplicated"]
+        for fp, n in sorted(duplicates.items(), key=lambda kv: -kv[1]):
+            lines.append(f"  {n}x {fp[:200]}")
+        return "\n".join(lines)
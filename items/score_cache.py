@@ -0,0 +1,157 @@
+"""
+Cache of pair score breakdowns.
+
+Entries are keyed by (lost id, found id, both items' updated_at, scoring
+version), so editing either item or changing the scoring makes old entries
+unreachable. Configure with settings.MATCH_PAIR_CACHE:
+
+    {"BACKEND": "memory", "MAX_ENTRIES": 10000}      # in-process LRU (default)
+    {"BACKEND": "django", "ALIAS": "default", "TIMEOUT": 86400}
+    {"BACKEND": None}                                  # disabled
+"""
+from collections import OrderedDict, defaultdict
+from threading import Lock
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+
+DEFAULT_CONFIG = {"BACKEND": "memory", "MAX_ENTRIES": 10000}
+
+
+def pair_key(lost, found, version):
+    return (
+        lost.pk,
+        found.pk,
+        lost.updated_at.isoformat() if lost.updated_at else "",
+        found.updated_at.isoformat() if found.updated_at else "",
+        version,
+    )
+
+
+class LocMemPairCache:
+    """In-process LRU cache bounded to max_entries."""
+
+    def __init__(self, max_entries=10000):
+        self.max_entries = max_entries
+        self._data = OrderedDict()
+        self._keys_by_item = defaultdict(set)
+        self._lock = Lock()
+
+    def __len__(self):
+        return len(self._data)
+
+    def get_many(self, keys):
+        found = {}
+        with self._lock:
+            for key in keys:
+                if key in self._data:
+                    self._data.move_to_end(key)
+                    found[key] = self._data[key]
+        return found
+
+    def set_many(self, mapping):
+        with self._lock:
+            for key, value in mapping.items():
+                self._data[key] = value
+                self._data.move_to_end(key)
+                self._keys_by_item[key[0]].add(key)
+                self._keys_by_item[key[1]].add(key)
+            while len(self._data) > self.max_entries:
+                key, _ = self._data.popitem(last=False)
+                self._forget(key)
+
+    def invalidate_item(self, item_id):
+        with self._lock:
+            for key in self._keys_by_item.pop(item_id, set()):
+                self._data.pop(key, None)
+                self._forget(key)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._keys_by_item.clear()
+
+    def _forget(self, key):
+        for item_id in key[:2]:
+            keys = self._keys_by_item.get(item_id)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._keys_by_item[item_id]
+
+
+class DjangoPairCache:
+    """
+    Pair cache stored in a Django cache alias, shared between workers.
+
+    Size bounds and LRU eviction come from the cache backend itself
+    (MAX_ENTRIES for LocMemCache, maxmemory-policy for Redis, ...).
+    """
+
+    GENERATION_KEY = "pairscore:generation"
+
+    def __init__(self, alias="default", timeout=86400):
+        self.cache = caches[alias]
+        self.timeout = timeout
+
+    def _prefix(self):
+        return f"pairscore:{self.cache.get_or_set(self.GENERATION_KEY, 1, None)}"
+
+    def _names(self, keys):
+        prefix = self._prefix()
+        return {":".join([prefix, *map(str, key)]): key for key in keys}
+
+    def get_many(self, keys):
+        names = self._names(keys)
+        return {names[name]: value for name, value in self.cache.get_many(list(names)).items()}
+
+    def set_many(self, mapping):
+        if not mapping:
+            return
+        names = self._names(mapping)
+        self.cache.set_many({name: mapping[key] for name, key in names.items()}, self.timeout)
+
+    def invalidate_item(self, item_id):
+        # updated_at is part of the key, so an edited item's old pairs are
+        # never read again; they age out via the timeout.
+        pass
+
+    def clear(self):
+        try:
+            self.cache.incr(self.GENERATION_KEY)
+        except ValueError:
+            self.cache.set(self.GENERATION_KEY, 2, None)
+
+
+_pair_cache = None
+_configured = False
+
+
+def get_pair_cache():
+    """The configured pair cache, or None when caching is disabled."""
+    global _pair_cache, _configured
+    if not _configured:
+        config = {**DEFAULT_CONFIG, **getattr(settings, "MATCH_PAIR_CACHE", {})}
+        backend = config.get("BACKEND")
+        if backend == "memory":
+            _pair_cache = LocMemPairCache(max_entries=config.get("MAX_ENTRIES", 10000))
+        elif backend == "django":
+            _pair_cache = DjangoPairCache(
+                alias=config.get("ALIAS", "default"),
+                timeout=config.get("TIMEOUT", 86400),
+            )
+        elif backend is None:
+            _pair_cache = None
+        else:
+            raise ValueError(f"Unknown MATCH_PAIR_CACHE backend: {backend!r}")
+        _configured = True
+    return _pair_cache
+
+
+@receiver(setting_changed)
+def _reset_pair_cache(setting, **kwargs):
+    global _pair_cache, _configured
+    if setting == "MATCH_PAIR_CACHE":
+        _pair_cache, _configured = None, False
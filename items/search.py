@@ -0,0 +1,105 @@
+"""
+Full-text search over items.
+
+SQLite uses an FTS5 table (items_item_fts, rowid = item id) kept in sync
+from Item save/delete signals and ranked with bm25(). PostgreSQL uses a GIN
+index on a tsvector expression and ts_rank(). Other databases fall back to
+icontains filters ordered by date.
+"""
+from django.db import connection
+from django.db.models import Q
+
+from .features import key, norm
+
+FTS_TABLE = "items_item_fts"
+FTS_FIELDS = ["title", "description", "brand", "model_or_markings", "room_or_area"]
+
+PG_VECTOR = "to_tsvector('english', {})".format(
+    " || ' ' || ".join(f"coalesce(items_item.{f}, '')" for f in FTS_FIELDS)
+)
+
+
+def _fts_query(tokens):
+    # Every term must appear; prefix matching so partial words as you type still hit.
+    return " ".join(f'"{t}"*' for t in tokens)
+
+
+def _pg_query(tokens):
+    return " & ".join(f"{t}:*" for t in tokens)
+
+
+def filter_items(qs, params):
+    """Apply item_list's status/category/building filters from `params` (e.g. request.GET)."""
+    status = params.get("status", "")
+    category = params.get("category", "")
+    building = params.get("building", "")
+    if status in ("LOST", "FOUND", "CLAIMED"):
+        qs = qs.filter(status=status)
+    if category.isdigit():
+        qs = qs.filter(category_id=category)
+    if building:
+        qs = qs.filter(building_key=key(building))
+    return qs
+
+
+def search(qs, q):
+    """
+    Filter an Item queryset to rows matching `q`, best matches first.
+    Matching rows get a `search_rank` (lower is better on SQLite, higher on
+    PostgreSQL; the ordering is already applied).
+    """
+    tokens = norm(q)
+    if not tokens:
+        return qs.none()
+
+    vendor = connection.vendor
+    if vendor == "sqlite":
+        return qs.extra(
+            tables=[FTS_TABLE],
+            where=[f"{FTS_TABLE}.rowid = items_item.id", f"{FTS_TABLE} MATCH %s"],
+            params=[_fts_query(tokens)],
+            select={"search_rank": f"bm25({FTS_TABLE}, 10.0, 1.0, 5.0, 5.0, 2.0)"},
+        ).order_by("search_rank", "-date_reported")
+    if vendor == "postgresql":
+        tsquery = _pg_query(tokens)
+        return qs.extra(
+            where=[f"{PG_VECTOR} @@ to_tsquery('english', %s)"],
+            params=[tsquery],
+            select={"search_rank": f"ts_rank({PG_VECTOR}, to_tsquery('english', %s))"},
+            select_params=[tsquery],
+        ).order_by("-search_rank", "-date_reported")
+
+    for t in tokens:
+        qs = qs.filter(
+            Q(title__icontains=t) | Q(description__icontains=t) | Q(brand__icontains=t)
+            | Q(model_or_markings__icontains=t) | Q(room_or_area__icontains=t)
+        )
+    return qs.order_by("-date_reported")
+
+
+def index_items(items):
+    """Write the search rows for saved items (no-op outside SQLite)."""
+    if connection.vendor != "sqlite":
+        return
+    items = list(items)
+    if not items:
+        return
+    with connection.cursor() as cursor:
+        cursor.executemany(
+            f"DELETE FROM {FTS_TABLE} WHERE rowid = %s", [(item.pk,) for item in items]
+        )
+        cursor.executemany(
+            f"INSERT INTO {FTS_TABLE} (rowid, {', '.join(FTS_FIELDS)}) VALUES (%s, %s, %s, %s, %s, %s)",
+            [(item.pk, *[getattr(item, f) or "" for f in FTS_FIELDS]) for item in items],
+        )
+
+
+def index_item(item):
+    index_items([item])
+
+
+def unindex_item(item_id):
+    if connection.vendor != "sqlite":
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {FTS_TABLE} WHERE rowid = %s", [item_id])
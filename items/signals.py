@@ -0,0 +1,115 @@
+from django.db import transaction
+from django.db.models import Q
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import Signal, receiver
+
+from . import live, page_cache, search, thumbnails, unread
+from .jobs import enqueue_thumbnail_job
+from .matching import refresh_best_scores
+from .models import Category, Item, Match, Notification
+from .score_cache import get_pair_cache
+from .token_index import index_item
+
+# Sent after items are approved with queryset.update(), which skips post_save.
+# Arguments: item_ids.
+items_approved = Signal()
+
+
+@receiver(post_save, sender=Item)
+def reindex_item_tokens(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    index_item(instance)
+
+
+@receiver(post_save, sender=Item)
+def reindex_item_search(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    search.index_item(instance)
+
+
+@receiver(post_delete, sender=Item)
+def unindex_item_search(sender, instance, **kwargs):
+    search.unindex_item(instance.pk)
+
+
+@receiver(post_save, sender=Item)
+@receiver(post_delete, sender=Item)
+def invalidate_pair_scores(sender, instance, **kwargs):
+    cache = get_pair_cache()
+    if cache is not None:
+        cache.invalidate_item(instance.pk)
+
+
+@receiver(post_save, sender=Item)
+def queue_photo_thumbnails(sender, instance, raw=False, **kwargs):
+    if raw or not thumbnails.is_stale(instance):
+        return
+    # Resizing is slow, so the worker does it rather than the upload request.
+    enqueue_thumbnail_job(instance)
+
+
+@receiver(post_save, sender=Match)
+def refresh_saved_match_scores(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    refresh_best_scores([instance.lost_item_id, instance.found_item_id])
+
+
+@receiver(post_delete, sender=Match)
+def refresh_deleted_match_scores(sender, instance, origin=None, **kwargs):
+    # Matches removed with their item are handled once per item below.
+    if isinstance(origin, Item) or getattr(origin, "model", None) is Item:
+        return
+    refresh_best_scores([instance.lost_item_id, instance.found_item_id])
+
+
+@receiver(pre_delete, sender=Item)
+def remember_match_partners(sender, instance, **kwargs):
+    instance._match_partner_ids = set(
+        Match.objects.filter(Q(lost_item=instance) | Q(found_item=instance))
+        .values_list("lost_item_id", "found_item_id")
+    )
+
+
+@receiver(post_delete, sender=Item)
+def refresh_match_partner_scores(sender, instance, **kwargs):
+    partners = {pk for pair in getattr(instance, "_match_partner_ids", ()) for pk in pair}
+    partners.discard(instance.pk)
+    refresh_best_scores(partners)
+
+
+@receiver(post_delete, sender=Item)
+def delete_photo_thumbnails(sender, instance, **kwargs):
+    if instance.photo_thumbnails:
+        thumbnails.delete_thumbnails(instance.photo_thumbnails, instance.photo.storage)
+
+
+@receiver(post_save, sender=Item)
+@receiver(post_delete, sender=Item)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(items_approved)
+def invalidate_public_pages(sender, raw=False, **kwargs):
+    if raw:
+        return
+    # Bump again on commit: a page rendered between the write and the commit
+    # would otherwise be cached under the new version with the old data.
+    page_cache.bump_listing_version()
+    transaction.on_commit(page_cache.bump_listing_version)
+
+
+def announce_notifications(notifications):
+    """Count new notifications as unread and push them to live streams on commit."""
+    for notification in notifications:
+        # Registered in this order, so the pushed event carries the new count.
+        unread.adjust(notification.recipient_id, 1)
+        transaction.on_commit(lambda n=notification: live.publish_notification(n))
+
+
+@receiver(post_save, sender=Notification)
+def announce_notification(sender, instance, created, raw=False, **kwargs):
+    if raw or not created:
+        return
+    announce_notifications([instance])
@@ -0,0 +1,35 @@
+"""
+StreamingHttpResponse bodies that stay streamed under WSGI and ASGI.
+
+Django 4.2 can only stream a body that matches the handler: under ASGI it
+reads a synchronous iterator into a list before sending anything (and
+under WSGI does the same with an asynchronous one). streaming_body() hands
+ASGI requests an async iterator that pulls each chunk from the synchronous
+one in the request's sync thread, which is where its database connection
+lives, so a QuerySet.iterator() cursor stays usable between chunks.
+"""
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+
+_DONE = object()
+
+
+async def _aiterate(iterator):
+    pull = sync_to_async(next, thread_sensitive=True)
+    try:
+        while True:
+            chunk = await pull(iterator, _DONE)
+            if chunk is _DONE:
+                return
+            yield chunk
+    finally:
+        close = getattr(iterator, "close", None)
+        if close is not None:
+            await sync_to_async(close, thread_sensitive=True)()
+
+
+def streaming_body(request, chunks):
+    """`chunks` (an iterable) as a StreamingHttpResponse body for the handler serving `request`."""
+    if isinstance(request, ASGIRequest):
+        return _aiterate(iter(chunks))
+    return chunks
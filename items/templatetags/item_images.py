@@ -0,0 +1,44 @@
+from django import template
+from django.utils.html import format_html
+
+register = template.Library()
+
+# Cards are at most ~320px wide, and full width on phones.
+DEFAULT_SIZES = "(max-width: 600px) 100vw, 320px"
+
+
+def _srcset(storage, variants):
+    return ", ".join(f"{storage.url(v['name'])} {v['width']}w" for v in variants)
+
+
+@register.simple_tag
+def item_photo(item, sizes=DEFAULT_SIZES, style="", css_class="", alt=None):
+    """
+    <picture> for item.photo with WebP and JPEG thumbnail srcsets, so the
+    browser downloads the smallest copy that fits. Falls back to the
+    original upload when no thumbnails have been built yet.
+    """
+    if not item.photo:
+        return ""
+    alt = item.title if alt is None else alt
+    variants = (item.photo_thumbnails or {}).get("variants", {})
+    jpeg, webp = variants.get("jpeg"), variants.get("webp")
+    if not jpeg:
+        return format_html(
+            '<img src="{}" alt="{}" class="{}" style="{}" loading="lazy" decoding="async">',
+            item.photo.url, alt, css_class, style,
+        )
+    storage = item.photo.storage
+    # width/height give the intrinsic size and aspect ratio. They come from
+    # the largest copy, so a photo only limited by a CSS max-width isn't
+    # drawn at the smallest thumbnail's width.
+    smallest, largest = jpeg[0], jpeg[-1]
+    webp_source = format_html(
+        '<source type="image/webp" srcset="{}" sizes="{}">', _srcset(storage, webp), sizes,
+    ) if webp else ""
+    return format_html(
+        '<picture>{}<img src="{}" srcset="{}" sizes="{}" width="{}" height="{}" alt="{}" '
+        'class="{}" style="{}" loading="lazy" decoding="async"></picture>',
+        webp_source, storage.url(smallest["name"]), _srcset(storage, jpeg), sizes,
+        largest["width"], largest["height"], alt, css_class, style,
+    )
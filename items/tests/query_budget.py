@@ -0,0 +1,20 @@
+"""Test helper for per-URL query budgets."""
+from django.test import TestCase
+
+from items.query_stats import QueryStats
+
+
+class QueryBudgetTestCase(TestCase):
+    def assertQueryBudget(self, budget, url, method="get", data=None, max_repeats=1):
+        """
+        Request `url` and fail if it runs more than `budget` queries, or runs
+        any query shape more than `max_repeats` times (the signature of an
+        N+1 loop).
+        """
+        with QueryStats() as stats:
+            response = getattr(self.client, method)(url, data or {})
+        self.assertLess(response.status_code, 400, f"{method.upper()} {url}")
+        repeated = {fp: n for fp, n in stats.duplicates().items() if n > max_repeats}
+        self.assertFalse(repeated, f"{method.upper()} {url} repeated queries:\n{stats.summary()}")
+        self.assertLessEqual(stats.count, budget, f"{method.upper()} {url} over budget:\n{stats.summary()}")
+        return response
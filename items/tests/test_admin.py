@@ -0,0 +1,75 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from items import unread
+from items.matching import COMPONENTS
+from items.models import Category, Item, Match
+
+User = get_user_model()
+
+
+def _fail(a, b):
+    raise AssertionError("admin view rescored a match")
+
+
+class AdminPerformanceTests(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_superuser(username="admin", password="testpass123", email="a@example.com")
+        self.category = Category.objects.create(name="Electronics")
+        self.client.login(username="admin", password="testpass123")
+        cache.clear()
+        unread.unread_count(self.admin.id)
+
+    def _pairs(self, n):
+        for i in range(n):
+            lost = Item.objects.create(owner=self.admin, title=f"Phone {i}", status=Item.LOST, category=self.category)
+            found = Item.objects.create(owner=self.admin, title=f"Phone {i}", status=Item.FOUND, category=self.category)
+            Match.objects.create(lost_item=lost, found_item=found, score=50)
+
+    def _queries(self, url):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(ctx.captured_queries)
+
+    def test_changelists_do_not_query_per_row(self):
+        """Item and Match changelists run the same number of queries for 2 or 10 rows."""
+        for name in ("admin:items_item_changelist", "admin:items_match_changelist"):
+            with self.subTest(name=name):
+                Match.objects.all().delete()
+                Item.objects.all().delete()
+                self._pairs(2)
+                few = self._queries(reverse(name))
+                self._pairs(8)
+                self.assertEqual(self._queries(reverse(name)), few)
+
+    def test_match_count_column(self):
+        """The annotated count covers both sides and skips retired matches."""
+        self._pairs(1)
+        lost = Item.objects.get(status=Item.LOST)
+        other = Item.objects.create(owner=self.admin, title="Other", status=Item.FOUND, category=self.category)
+        Match.objects.create(lost_item=lost, found_item=other, score=45, status=Match.RETIRED)
+        response = self.client.get(reverse("admin:items_item_changelist"))
+        counts = {row.pk: row.match_total for row in response.context["cl"].result_list}
+        self.assertEqual(counts[lost.pk], 1)
+        self.assertEqual(counts[other.pk], 0)
+
+    def test_match_explanation_uses_stored_breakdown(self):
+        """The change form explains the saved breakdown instead of rescoring the pair."""
+        self._pairs(1)
+        match = Match.objects.get()
+        match.score_breakdown = {
+            "building": 20.0, "color": 0.0, "brand_model_tokens": 12.5,
+            "title_desc_fuzzy": 15.0, "date_proximity": 0.0, "room_tokens": 0.0, "total": 47.5,
+        }
+        match.save()
+        with mock.patch.dict(COMPONENTS, {name: (_fail, fields) for name, (_p, fields) in COMPONENTS.items()}):
+            response = self.client.get(reverse("admin:items_match_change", args=[match.pk]))
+        self.assertContains(response, "Same building (+20); Brand/model similarity (+12.5)")
+        self.assertContains(response, "Total ≈ 47.5")
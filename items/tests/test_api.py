@@ -0,0 +1,116 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from items import unread
+from items.models import Category, Item, Match, Notification
+
+User = get_user_model()
+
+
+class ApiTests(TestCase):
+    def setUp(self):
+        self.owner = User.objects.create_user(username="owner", password="testpass123")
+        self.other = User.objects.create_user(username="other", password="testpass123")
+        category = Category.objects.create(name="Keys")
+        self.items = [
+            Item.objects.create(owner=self.owner, category=category, status=Item.LOST, title=f"Keys {n}",
+                                building="Library", approved=True)
+            for n in range(5)
+        ]
+        self.found = Item.objects.create(owner=self.other, category=category, status=Item.FOUND,
+                                         title="Found keys", approved=True)
+        self.hidden = Item.objects.create(owner=self.owner, category=category, status=Item.LOST,
+                                          title="Pending keys")
+        self.match = Match.objects.create(lost_item=self.items[0], found_item=self.found, score=70)
+        Match.objects.create(lost_item=self.items[1], found_item=self.items[2], score=65)
+
+    def _json(self, name, *args, status=200, **params):
+        response = self.client.get(reverse(f"items:{name}", args=args), params)
+        self.assertEqual(response.status_code, status, response.content)
+        return response.json()
+
+    def test_item_list_pages_and_selects_fields(self):
+        """Items page by cursor and ?fields= trims each object."""
+        page = self._json("api_items", fields="id,title", limit=4)
+        self.assertEqual(len(page["results"]), 4)
+        self.assertEqual(set(page["results"][0]), {"id", "title"})
+        rest = self.client.get(page["next"]).json()
+        self.assertEqual(len(rest["results"]), 2)
+        self.assertNotIn(self.hidden.pk, [r["id"] for r in page["results"] + rest["results"]])
+
+        error = self._json("api_items", status=400, fields="id,owner_password")
+        self.assertIn("owner_password", error["error"])
+
+    def test_etag_gives_not_modified_until_a_row_changes(self):
+        """If-None-Match with the current ETag gets a 304; an edit changes the ETag."""
+        url = reverse("items:api_items")
+        etag = self.client.get(url)["ETag"]
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        detail = reverse("items:api_item", args=[self.items[0].pk])
+        detail_etag = self.client.get(detail)["ETag"]
+        self.assertEqual(self.client.get(detail, HTTP_IF_NONE_MATCH=detail_etag).status_code, 304)
+
+        self.items[0].title = "Renamed keys"
+        self.items[0].save()
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+        self.assertEqual(self.client.get(detail, HTTP_IF_NONE_MATCH=detail_etag).status_code, 200)
+
+    def test_updated_since_feed(self):
+        """?updated_since= returns rows changed since then, oldest first."""
+        past = timezone.now() - timedelta(days=1)
+        Item.objects.update(updated_at=past)
+        since = timezone.now()
+        for item in (self.items[3], self.items[1]):
+            item.save()
+        page = self._json("api_items", updated_since=since.isoformat(), fields="id")
+        self.assertEqual([r["id"] for r in page["results"]], [self.items[3].pk, self.items[1].pk])
+        self._json("api_items", status=400, updated_since="yesterday")
+
+    def test_private_lists_are_scoped(self):
+        """Matches and notifications are limited to the signed-in user; unapproved items to the owner."""
+        self._json("api_matches", status=401)
+        self._json("api_item", self.hidden.pk, status=404)
+
+        self.client.login(username="other", password="testpass123")
+        matches = self._json("api_matches")["results"]
+        self.assertEqual([m["id"] for m in matches], [self.match.pk])
+        self._json("api_item", self.hidden.pk, status=404)
+
+        Notification.objects.create(recipient=self.other, title="Hi", message="m")
+        Notification.objects.create(recipient=self.owner, title="Not yours", message="m")
+        self.assertEqual([n["title"] for n in self._json("api_notifications")["results"]], ["Hi"])
+
+        self.client.login(username="owner", password="testpass123")
+        self.assertEqual(self._json("api_item", self.hidden.pk)["title"], "Pending keys")
+
+    def test_retired_matches_are_hidden(self):
+        """Retired matches are left out of the match list, as on item_detail."""
+        Match.objects.filter(pk=self.match.pk).update(status=Match.RETIRED)
+        self.client.login(username="other", password="testpass123")
+        self.assertEqual(self._json("api_matches")["results"], [])
+
+    def test_feed_reports_retired_matches(self):
+        """A match retired after a sync comes back in the feed with its new status."""
+        self.client.login(username="other", password="testpass123")
+        synced = self._json("api_matches", updated_since="2000-01-01T00:00Z")["results"]
+        self.assertEqual([(m["id"], m["status"]) for m in synced], [(self.match.pk, Match.PENDING)])
+
+        Match.objects.filter(pk=self.match.pk).update(status=Match.RETIRED, updated_at=timezone.now())
+        results = self._json("api_matches", updated_since=synced[-1]["updated_at"])["results"]
+        self.assertEqual([(m["id"], m["status"]) for m in results], [(self.match.pk, Match.RETIRED)])
+
+    def test_status_changes_touch_updated_at(self):
+        """Marking notifications read bumps updated_at so the feed picks it up."""
+        notification = Notification.objects.create(recipient=self.owner, title="Hi", message="m")
+        Notification.objects.filter(pk=notification.pk).update(updated_at=timezone.now() - timedelta(days=1))
+        since = timezone.now()
+        unread.mark_all_read(self.owner.id)
+
+        self.client.login(username="owner", password="testpass123")
+        results = self._json("api_notifications", updated_since=since.isoformat())["results"]
+        self.assertEqual([(n["id"], n["is_read"]) for n in results], [(notification.pk, True)])
@@ -0,0 +1,38 @@
+from django.test import TestCase
+
+from items.bench.runner import run_suite
+from items.bench.synthetic import generate
+from items.models import Item, ItemToken
+
+
+class BenchmarkSuiteTests(TestCase):
+    def _snapshot(self):
+        return list(Item.objects.order_by("pk").values_list("title", "building", "status", "date_lost_or_found"))
+
+    def test_generator_is_seeded_and_indexed(self):
+        """The same seed produces the same items, with features and token index filled in."""
+        self.assertEqual(generate(40, seed=3), 40)
+        first = self._snapshot()
+        self.assertTrue(ItemToken.objects.exists())
+        self.assertTrue(all(i.brand_tokens for i in Item.objects.all()))
+
+        Item.objects.all().delete()
+        generate(40, seed=3)
+        self.assertEqual(self._snapshot(), first)
+        self.assertIn(Item.FOUND, {row[2] for row in first})
+
+    def test_run_suite_reports_metrics(self):
+        """run_suite reports latency, queries and memory for each benchmark."""
+        generate(60, seed=1)
+        results = run_suite(samples=3)
+        self.assertEqual(set(results), {
+            "item_score_breakdown", "find_matches_for", "rebuild_match_breakdowns",
+            "home", "item_list", "item_list_search", "review_items",
+        })
+        for metrics in results.values():
+            self.assertLessEqual(metrics["p50_ms"], metrics["p95_ms"])
+            self.assertIn("queries_max", metrics)
+            self.assertIn("peak_memory_kib", metrics)
+        # Every call renders the listing rather than reading the page cache.
+        self.assertEqual(results["home"]["queries_mean"], results["home"]["queries_max"])
+        self.assertGreater(results["home"]["queries_mean"], 0)
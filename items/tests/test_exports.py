@@ -0,0 +1,108 @@
+import csv
+import io
+import json
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from asgiref.sync import sync_to_async
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from items import exports
+from items.models import Category, Item, Match, Notification
+
+User = get_user_model()
+
+
+class ExportTests(TestCase):
+    def setUp(self):
+        self.staff = User.objects.create_user(username="staff", password="testpass123", is_staff=True)
+        self.owner = User.objects.create_user(username="owner", password="testpass123")
+        self.keys = Category.objects.create(name="Keys")
+        self.bags = Category.objects.create(name="Bags")
+        self.lost = Item.objects.create(
+            owner=self.owner, category=self.keys, status=Item.LOST, title="Red keychain", building="Library",
+        )
+        self.found = Item.objects.create(
+            owner=self.staff, category=self.keys, status=Item.FOUND, title="Keys, red", building="Library",
+        )
+        self.bag = Item.objects.create(owner=self.owner, category=self.bags, status=Item.LOST, title="Backpack")
+        self.match = Match.objects.create(
+            lost_item=self.lost, found_item=self.found, score=72.5, score_breakdown={"total": 72.5, "color": 10},
+        )
+        Notification.objects.create(recipient=self.owner, match=self.match, title="Match", message="Look")
+        self.client.login(username="staff", password="testpass123")
+
+    def _get(self, dataset, **params):
+        response = self.client.get(reverse("items:export_data", args=[dataset]), params)
+        self.assertEqual(response.status_code, 200)
+        return b"".join(response.streaming_content).decode()
+
+    def test_items_csv_uses_item_list_filters(self):
+        """Item exports take the item_list filters and include unapproved items."""
+        rows = list(csv.DictReader(io.StringIO(self._get("items", category=self.keys.pk, status="LOST"))))
+        self.assertEqual([row["title"] for row in rows], ["Red keychain"])
+        self.assertEqual((rows[0]["category"], rows[0]["owner"]), ("Keys", "owner"))
+
+        rows = list(csv.DictReader(io.StringIO(self._get("items", q="backpack"))))
+        self.assertEqual([row["title"] for row in rows], ["Backpack"])
+
+    def test_matches_ndjson_includes_breakdown(self):
+        """Match rows carry the stored score breakdown as JSON."""
+        lines = self._get("matches", format="ndjson", building="library").splitlines()
+        row = json.loads(lines[0])
+        self.assertEqual(len(lines), 1)
+        self.assertEqual(row["score_breakdown"], {"total": 72.5, "color": 10})
+        self.assertEqual((row["lost_item_title"], row["found_item_title"]), ("Red keychain", "Keys, red"))
+
+        row = next(csv.DictReader(io.StringIO(self._get("matches"))))
+        self.assertEqual(json.loads(row["score_breakdown"])["color"], 10)
+
+    def test_date_range(self):
+        """since/until are inclusive dates on the creation date."""
+        Item.objects.filter(pk=self.bag.pk).update(date_reported=timezone.now() - timedelta(days=10))
+        today = timezone.localdate()
+        rows = list(csv.DictReader(io.StringIO(self._get("items", since=today.isoformat()))))
+        self.assertNotIn("Backpack", [row["title"] for row in rows])
+        rows = list(csv.DictReader(io.StringIO(self._get("items", until=(today - timedelta(days=1)).isoformat()))))
+        self.assertEqual([row["title"] for row in rows], ["Backpack"])
+        response = self.client.get(reverse("items:export_data", args=["items"]), {"since": "last week"})
+        self.assertEqual(response.status_code, 400)
+
+    def test_queries_do_not_grow_with_rows(self):
+        """Rows are fetched in chunks with their related objects, not one query per row."""
+        Item.objects.bulk_create([
+            Item(owner=self.owner, category=self.bags, status=Item.FOUND, title=f"Bag {n}") for n in range(50)
+        ])
+        qs = exports.export_queryset("items", {})
+        with CaptureQueriesContext(connection) as ctx:
+            body = "".join(exports.stream("items", "csv", qs))
+        self.assertEqual(len(ctx.captured_queries), 1)
+        self.assertEqual(len(body.splitlines()), 54)
+
+    async def test_asgi_streams_chunks(self):
+        """Under ASGI the body is an async iterator, not read into memory first."""
+        await sync_to_async(self.async_client.force_login)(self.staff)
+        with mock.patch.object(exports, "CHUNK_BYTES", 1):
+            response = await self.async_client.get(reverse("items:export_data", args=["items"]))
+            self.assertTrue(response.is_async)
+            chunks = [chunk async for chunk in response.streaming_content]
+        self.assertEqual(len(chunks), 4)
+        self.assertIn(b"Red keychain", b"".join(chunks))
+
+    def test_command_and_staff_only(self):
+        """The export_data command prints the same rows; the view is staff-only."""
+        out = StringIO()
+        call_command("export_data", "notifications", format="ndjson", stdout=out)
+        self.assertEqual(json.loads(out.getvalue())["recipient"], "owner")
+
+        self.client.login(username="owner", password="testpass123")
+        response = self.client.get(reverse("items:export_data", args=["items"]))
+        self.assertEqual(response.status_code, 302)
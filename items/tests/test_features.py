@@ -0,0 +1,66 @@
+from datetime import date
+from importlib import import_module
+from io import StringIO
+
+from django.apps import apps
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+
+from items.models import Item, Category
+
+User = get_user_model()
+
+
+class MatchFeatureTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="tester", password="testpass123")
+        self.category = Category.objects.create(name="Electronics")
+        self.item = Item.objects.create(
+            owner=self.user,
+            status="LOST",
+            title="Silver Dell laptop",
+            description="Lost in Mammel Hall",
+            category=self.category,
+            color_primary=" Silver ",
+            brand="Dell Inc.",
+            model_or_markings="Latitude 5400",
+            building="Mammel Hall ",
+            room_or_area="MH-110",
+            date_lost_or_found=date.today(),
+        )
+
+    def test_features_are_computed_on_save(self):
+        """Saving an item stores its normalized match features."""
+        item = Item.objects.get(pk=self.item.pk)
+        self.assertEqual(item.building_key, "mammel hall")
+        self.assertEqual(item.color_key, "silver")
+        self.assertEqual(item.brand_tokens, ["dell", "inc"])
+        self.assertEqual(item.model_tokens, ["5400", "latitude"])
+        self.assertEqual(item.room_tokens, ["110", "mh"])
+        self.assertTrue(item.title_shingles)
+
+    def test_update_fields_refreshes_features(self):
+        """save(update_fields=[...]) with a source field also writes the features."""
+        self.item.brand = "HP"
+        self.item.save(update_fields=["brand"])
+        self.assertEqual(Item.objects.get(pk=self.item.pk).brand_tokens, ["hp"])
+
+    def test_backfill_command_recomputes_features(self):
+        """backfill_match_features fills features for rows written without save(), batch by batch."""
+        other = Item.objects.create(owner=self.user, category=self.category, status="FOUND", title="Laptop",
+                                    brand="HP", building="PKI", date_lost_or_found=date.today())
+        Item.objects.update(building_key="", brand_tokens=[])
+        call_command("backfill_match_features", batch_size=1, stdout=StringIO())
+        item = Item.objects.get(pk=self.item.pk)
+        self.assertEqual(item.building_key, "mammel hall")
+        self.assertEqual(item.brand_tokens, ["dell", "inc"])
+        self.assertEqual(Item.objects.get(pk=other.pk).brand_tokens, ["hp"])
+
+    def test_migration_fills_features(self):
+        """The data migration fills features of rows that predate them."""
+        Item.objects.update(building_key="", brand_tokens=[])
+        migration = import_module("items.migrations.0018_fill_match_features")
+        migration.fill_features(apps, None)
+        self.assertEqual(Item.objects.get(pk=self.item.pk).brand_tokens, ["dell", "inc"])
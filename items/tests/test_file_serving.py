@@ -0,0 +1,108 @@
+import gzip
+import shutil
+import tempfile
+from io import StringIO
+from pathlib import Path
+from unittest import mock
+
+from django.core.management import call_command
+from django.http import Http404
+from django.test import AsyncRequestFactory, RequestFactory, SimpleTestCase, override_settings
+
+from items import file_serving
+from items.checks import check_static_manifest
+
+BODY = b"0123456789" * 300
+
+
+class FileServingTests(SimpleTestCase):
+    def setUp(self):
+        self.root = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.root, ignore_errors=True)
+        (self.root / "photo.jpg").write_bytes(BODY)
+        (self.root / "styles.0123456789ab.css").write_bytes(BODY)
+        self.factory = RequestFactory()
+
+    def _get(self, path, **headers):
+        request = self.factory.get(f"/media/{path}", **headers)
+        return file_serving.serve(request, path, document_root=str(self.root))
+
+    def _body(self, response):
+        return b"".join(response.streaming_content)
+
+    def test_full_response_and_conditional_get(self):
+        """Files stream with validators; a matching If-None-Match gives a 304."""
+        response = self._get("photo.jpg")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self._body(response), BODY)
+        self.assertEqual(response["Content-Type"], "image/jpeg")
+        self.assertEqual(response["Accept-Ranges"], "bytes")
+        self.assertIn("max-age=3600", response["Cache-Control"])
+        self.assertEqual(self._get("photo.jpg", HTTP_IF_NONE_MATCH=response["ETag"]).status_code, 304)
+
+    def test_range_requests(self):
+        """Single byte ranges give a 206; out-of-range ones a 416; a stale If-Range the whole file."""
+        response = self._get("photo.jpg", HTTP_RANGE="bytes=10-19")
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response["Content-Range"], f"bytes 10-19/{len(BODY)}")
+        self.assertEqual(self._body(response), BODY[10:20])
+
+        self.assertEqual(self._body(self._get("photo.jpg", HTTP_RANGE="bytes=-5")), BODY[-5:])
+        self.assertEqual(self._get("photo.jpg", HTTP_RANGE=f"bytes={len(BODY)}-").status_code, 416)
+        self.assertEqual(self._get("photo.jpg", HTTP_RANGE="bytes=0-4", HTTP_IF_RANGE='"stale"').status_code, 200)
+
+    @mock.patch.object(file_serving, "CHUNK_SIZE", 1000)
+    async def test_asgi_streams_chunks(self):
+        """Under ASGI the file is sent as an async iterator of chunks."""
+        request = AsyncRequestFactory().get("/media/photo.jpg", headers={"range": "bytes=500-"})
+        response = file_serving.serve(request, "photo.jpg", document_root=str(self.root))
+        self.assertEqual(response.status_code, 206)
+        self.assertTrue(response.is_async)
+        chunks = [chunk async for chunk in response.streaming_content]
+        self.assertEqual([len(chunk) for chunk in chunks], [1000, 1000, 500])
+        self.assertEqual(b"".join(chunks), BODY[500:])
+
+    def test_hashed_static_names_are_immutable(self):
+        response = self._get("styles.0123456789ab.css")
+        self.assertIn("immutable", response["Cache-Control"])
+        self.assertIn(f"max-age={file_serving.IMMUTABLE_MAX_AGE}", response["Cache-Control"])
+
+    def test_precompressed_variant(self):
+        """compress_static writes .gz copies, served to clients that accept gzip."""
+        call_command("compress_static", root=str(self.root), stdout=StringIO())
+        response = self._get("styles.0123456789ab.css", HTTP_ACCEPT_ENCODING="gzip, deflate")
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertEqual(response["Content-Type"], "text/css")
+        self.assertIn("Accept-Encoding", response["Vary"])
+        self.assertEqual(gzip.decompress(self._body(response)), BODY)
+
+        plain = self._get("styles.0123456789ab.css")
+        self.assertNotIn("Content-Encoding", plain)
+        self.assertNotEqual(plain["ETag"], response["ETag"])
+
+    def test_sendfile_offload(self):
+        """With X-Accel-Redirect configured the body is left to the front-end server."""
+        with override_settings(
+            FILE_SERVING_SENDFILE="x-accel-redirect",
+            FILE_SERVING_ACCEL_LOCATIONS={str(self.root): "/_protected/media/"},
+        ):
+            response = self._get("photo.jpg")
+        self.assertEqual(response["X-Accel-Redirect"], "/_protected/media/photo.jpg")
+        self.assertEqual(response.content, b"")
+        self.assertIn("ETag", response)
+
+    def test_rejects_paths_outside_root(self):
+        with self.assertRaises(Http404):
+            self._get("../etc/passwd")
+
+    def test_deploy_check_requires_static_manifest(self):
+        """check --deploy fails under hashed static storage until collectstatic has run."""
+        storages = {
+            "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+            "staticfiles": {"BACKEND": "django.contrib.staticfiles.storage.ManifestStaticFilesStorage"},
+        }
+        with override_settings(STORAGES=storages, STATIC_ROOT=str(self.root)):
+            self.assertEqual([e.id for e in check_static_manifest(None)], ["items.E001"])
+            (self.root / "staticfiles.json").write_text('{"paths": {}, "version": "1.1"}')
+            self.assertEqual(check_static_manifest(None), [])
+        self.assertEqual(check_static_manifest(None), [])
@@ -0,0 +1,136 @@
+import csv
+import json
+import os
+import tempfile
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from items import search
+from items.management.commands.import_items import Command
+from items.models import Category, Item, ItemToken, MatchJob
+
+User = get_user_model()
+
+FIELDS = ["external_id", "status", "title", "category", "building", "color_primary", "date_lost_or_found", "owner"]
+
+
+class ImportItemsTests(TestCase):
+    def setUp(self):
+        self.desk = User.objects.create_user(username="desk", email="desk@example.com", password="testpass123")
+        Category.objects.create(name="Electronics")
+        Category.objects.create(name="Keys")
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def _csv(self, rows, name="log.csv"):
+        path = os.path.join(self.tmp.name, name)
+        with open(path, "w", newline="") as f:
+            writer = csv.DictWriter(f, FIELDS)
+            writer.writeheader()
+            writer.writerows(rows)
+        return path
+
+    def _row(self, n, **overrides):
+        row = {
+            "external_id": str(n), "status": "FOUND", "title": f"Black phone {n}", "category": "electronics",
+            "building": "Library", "color_primary": "Black", "date_lost_or_found": "2026-09-01", "owner": "",
+        }
+        row.update(overrides)
+        return row
+
+    def _import(self, *paths, **opts):
+        out = StringIO()
+        call_command("import_items", *paths, owner="desk", stdout=out, **opts)
+        return out.getvalue()
+
+    def test_imports_rows_and_skips_them_on_rerun(self):
+        """Rows are inserted with features, indexes and match jobs; re-running skips them."""
+        path = self._csv([self._row(n) for n in range(5)])
+        self._import(path, source="library", batch_size=2)
+
+        items = Item.objects.order_by("external_id")
+        self.assertEqual([i.external_id for i in items], [f"library:{n}" for n in range(5)])
+        item = items[0]
+        self.assertEqual((item.owner, item.category.name, item.approved), (self.desk, "Electronics", False))
+        self.assertEqual(item.color_key, "black")
+        self.assertTrue(ItemToken.objects.filter(item=item).exists())
+        self.assertEqual(list(search.search(Item.objects.all(), "phone").order_by("pk")), list(items.order_by("pk")))
+        # One match job per batch of inserted items.
+        jobs = MatchJob.objects.filter(status=MatchJob.PENDING).order_by("pk")
+        self.assertEqual([len(job.item_ids) for job in jobs], [2, 2, 1])
+        self.assertEqual(sorted(pk for job in jobs for pk in job.item_ids), sorted(items.values_list("pk", flat=True)))
+
+        output = self._import(path, source="library")
+        self.assertIn("Imported 0 items; skipped 5 already imported", output)
+        self.assertEqual(Item.objects.count(), 5)
+
+    def test_invalid_rows_go_to_the_error_report(self):
+        """Rows failing ItemForm rules or lookups are reported, the rest imported."""
+        path = self._csv([
+            self._row(1),
+            self._row(2, status="CLAIMED"),
+            self._row(3, category="Umbrellas"),
+            self._row(4, owner="nobody"),
+            self._row(5, title=""),
+            self._row(1),
+        ])
+        report = os.path.join(self.tmp.name, "errors.csv")
+        output = self._import(path, errors=report)
+
+        self.assertIn("Imported 1 items; skipped 0 already imported, 5 invalid", output)
+        with open(report) as f:
+            rejected = {row["line"]: json.loads(row["errors"]) for row in csv.DictReader(f)}
+        self.assertEqual(set(rejected), {"3", "4", "5", "6", "7"})
+        self.assertIn("status", rejected["3"])
+        self.assertEqual(rejected["4"], {"category": ["Unknown category: 'Umbrellas'"]})
+        self.assertIn("owner", rejected["5"])
+        self.assertIn("title", rejected["6"])
+        self.assertIn("external_id", rejected["7"])
+
+    def test_dry_run_writes_nothing(self):
+        """--dry-run validates and counts without inserting."""
+        path = self._csv([self._row(n) for n in range(3)])
+        output = self._import(path, dry_run=True)
+        self.assertIn("Dry run: would import 3 items", output)
+        self.assertFalse(Item.objects.exists())
+        self.assertFalse(MatchJob.objects.exists())
+
+    def test_jsonl_lookups_are_cached(self):
+        """Categories and owners are looked up once per distinct value, not per row."""
+        path = os.path.join(self.tmp.name, "log.jsonl")
+        with open(path, "w") as f:
+            for n in range(40):
+                row = self._row(n, category="Keys" if n % 2 else "Electronics", owner="desk@example.com")
+                f.write(json.dumps(row) + "\n")
+            f.write("not json\n")
+
+        with CaptureQueriesContext(connection) as ctx:
+            output = self._import(path, batch_size=20)
+        self.assertIn("Imported 40 items; skipped 0 already imported, 1 invalid", output)
+        lookups = [q["sql"] for q in ctx.captured_queries if 'FROM "items_category"' in q["sql"]]
+        self.assertEqual(len(lookups), 2)
+        self.assertEqual(Item.objects.filter(category__name="Keys").count(), 20)
+
+    def test_concurrent_import_of_the_same_rows(self):
+        """Rows another import inserts after the existence check are skipped, not fatal to the batch."""
+        path = self._csv([self._row(n) for n in range(3)])
+        check = Command._not_imported
+
+        def racing_check(command, items):
+            new = check(command, items)
+            if "1" in items and not Item.objects.filter(external_id="1").exists():
+                Item.objects.create(owner=self.desk, category=Category.objects.get(name="Keys"),
+                                    status=Item.FOUND, title="Other desk", external_id="1")
+            return new
+
+        with mock.patch.object(Command, "_not_imported", racing_check):
+            output = self._import(path)
+        self.assertIn("Imported 2 items; skipped 1 already imported", output)
+        self.assertEqual(Item.objects.get(external_id="1").title, "Other desk")
+        self.assertEqual(Item.objects.count(), 3)
@@ -0,0 +1,105 @@
+from datetime import date
+from unittest import mock
+
+from django.test import TestCase
+from django.urls import reverse
+from django.contrib.auth import get_user_model
+
+from items.models import Item, Category, Match, MatchJob
+from items.jobs import process_jobs
+from items.matching import COMPONENTS, find_matches_for, item_score_breakdown, store_matches
+
+User = get_user_model()
+
+
+class IncrementalRematchTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="tester", password="testpass123")
+        self.electronics = Category.objects.create(name="Electronics")
+        fields = dict(
+            owner=self.user,
+            category=self.electronics,
+            color_primary="Silver",
+            brand="Dell",
+            model_or_markings="Latitude",
+            building="Mammel Hall",
+            room_or_area="MH 110",
+            date_lost_or_found=date.today(),
+            approved=True,
+        )
+        self.lost = Item.objects.create(status="LOST", title="Silver Dell laptop", **fields)
+        self.found = Item.objects.create(status="FOUND", title="Dell laptop", **fields)
+        store_matches(self.lost, find_matches_for(self.lost))
+        self.match = Match.objects.get()
+        self.client.login(username="tester", password="testpass123")
+
+    def _edit(self, item, **changes):
+        data = {
+            "status": item.status,
+            "title": item.title,
+            "description": item.description,
+            "category": item.category_id,
+            "color_primary": item.color_primary,
+            "brand": item.brand,
+            "model_or_markings": item.model_or_markings,
+            "building": item.building,
+            "room_or_area": item.room_or_area,
+            "date_lost_or_found": item.date_lost_or_found.isoformat(),
+        }
+        data.update(changes)
+        return self.client.post(reverse("items:item_update", args=[item.pk]), data)
+
+    def test_changed_match_fields(self):
+        """Items report which match fields changed since they were loaded."""
+        item = Item.objects.get(pk=self.found.pk)
+        self.assertEqual(item.changed_match_fields(), set())
+        item.color_primary = "Black"
+        item.category_id = None
+        self.assertEqual(item.changed_match_fields(), {"color_primary", "category_id"})
+        self.assertEqual(Item(title="x").changed_match_fields(), Item.MATCH_FIELDS)
+
+    def test_non_candidate_edit_rescores_only_affected_components(self):
+        """Editing the color updates the color component in place, without a job."""
+        text_points = mock.Mock(return_value=0.0)
+        with mock.patch.dict(COMPONENTS, {"title_desc_fuzzy": (text_points, {"title", "description"})}):
+            self._edit(self.found, color_primary="Black")
+        text_points.assert_not_called()
+
+        self.match.refresh_from_db()
+        found = Item.objects.get(pk=self.found.pk)
+        self.assertEqual(self.match.score_breakdown, item_score_breakdown(self.lost, found))
+        self.assertEqual(self.match.score_breakdown["color"], 0.0)
+        self.assertFalse(MatchJob.objects.exists())
+
+    def test_candidate_field_edit_queues_full_search(self):
+        """Editing the building queues a full candidate search."""
+        self._edit(self.found, building="PKI")
+        self.assertTrue(MatchJob.objects.filter(item=self.found, status=MatchJob.PENDING).exists())
+
+    def test_token_field_edit_finds_new_candidates(self):
+        """Fixing a typo in the title finds items that now share tokens with it."""
+        fields = dict(owner=self.user, category=self.electronics, date_lost_or_found=date.today(), approved=True)
+        bottle = Item.objects.create(status="FOUND", title="Green Hydro Flask water bottle",
+                                     brand="Hydro Flask", building="PKI", **fields)
+        lost = Item.objects.create(status="LOST", title="Grene Hyrdo Flsk botle", building="Library", **fields)
+        store_matches(lost, find_matches_for(lost))
+        self.assertFalse(Match.objects.filter(lost_item=lost).exists())
+
+        self._edit(lost, title="Green Hydro Flask water bottle", brand="Hydro Flask")
+        process_jobs("test")
+        self.assertTrue(Match.objects.filter(lost_item=lost, found_item=bottle).exists())
+
+    def test_weak_matches_are_retired_and_revived(self):
+        """Pending matches that fall below the threshold are retired, and come back if they recover."""
+        self._edit(self.found, title="Umbrella", brand="", model_or_markings="", color_primary="",
+                   room_or_area="")
+        process_jobs("test")
+        self.match.refresh_from_db()
+        self.assertEqual(self.match.status, Match.RETIRED)
+
+        found = Item.objects.get(pk=self.found.pk)
+        found.title, found.brand, found.color_primary = "Silver Dell laptop", "Dell", "Silver"
+        found.save()
+        store_matches(found, find_matches_for(found))
+        self.match.refresh_from_db()
+        self.assertEqual(self.match.status, Match.PENDING)
@@ -0,0 +1,107 @@
+from datetime import date, timedelta
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from django.contrib.auth import get_user_model
+
+from items.models import Item, Category, Match, MatchJob
+from items.jobs import enqueue_batch_match_job, enqueue_match_job, enqueue_match_jobs, claim_jobs, process_jobs
+
+User = get_user_model()
+
+
+class MatchJobQueueTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="tester", password="testpass123")
+        self.electronics = Category.objects.create(name="Electronics")
+        fields = dict(
+            owner=self.user,
+            category=self.electronics,
+            color_primary="Silver",
+            brand="Dell",
+            building="Mammel Hall",
+            date_lost_or_found=date.today(),
+            approved=True,
+        )
+        self.lost = Item.objects.create(status="LOST", title="Silver Dell laptop", **fields)
+        self.found = Item.objects.create(status="FOUND", title="Dell laptop", **fields)
+
+    def test_repeated_enqueues_share_one_pending_job(self):
+        """Queuing the same item twice keeps a single pending job."""
+        enqueue_match_job(self.lost)
+        enqueue_match_job(self.lost, include_unapproved=True)
+        enqueue_match_jobs([self.lost, self.found])
+
+        jobs = MatchJob.objects.filter(status=MatchJob.PENDING)
+        self.assertEqual(jobs.filter(item=self.lost).count(), 1)
+        self.assertTrue(jobs.get(item=self.lost).include_unapproved)
+        self.assertEqual(jobs.count(), 2)
+
+    def test_worker_generates_matches(self):
+        """run_match_worker --once runs pending jobs and stores their matches."""
+        enqueue_match_job(self.lost)
+        call_command("run_match_worker", once=True, stdout=StringIO())
+
+        match = Match.objects.get(lost_item=self.lost, found_item=self.found)
+        self.assertEqual(match.score, match.score_breakdown["total"])
+        self.assertEqual(MatchJob.objects.get().status, MatchJob.DONE)
+
+    def test_batch_job_matches_every_item(self):
+        """A batch job generates matches for each listed item that still exists."""
+        gone = Item.objects.create(owner=self.user, category=self.electronics, status="LOST", title="Gone")
+        enqueue_batch_match_job([self.lost, gone])
+        gone.delete()
+        process_jobs("test")
+
+        self.assertTrue(Match.objects.filter(lost_item=self.lost, found_item=self.found).exists())
+        self.assertEqual(MatchJob.objects.get().status, MatchJob.DONE)
+
+    def test_failures_back_off_then_go_dead(self):
+        """A failing job is retried later and is marked DEAD after max_attempts."""
+        job = enqueue_match_job(self.lost)
+        MatchJob.objects.filter(pk=job.pk).update(max_attempts=2)
+
+        with mock.patch("items.jobs.find_matches_for", side_effect=RuntimeError("boom")), \
+                self.assertLogs("items.jobs", level="ERROR"):
+            process_jobs("test")
+            job.refresh_from_db()
+            self.assertEqual(job.status, MatchJob.PENDING)
+            self.assertGreater(job.run_after, timezone.now())
+            self.assertEqual(claim_jobs("test"), [])
+
+            MatchJob.objects.filter(pk=job.pk).update(run_after=timezone.now())
+            process_jobs("test")
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, MatchJob.DEAD)
+        self.assertEqual(job.attempts, 2)
+        self.assertIn("boom", job.last_error)
+
+    def test_expired_lease_can_be_reclaimed(self):
+        """A job left RUNNING by a dead worker is claimed again after its lease."""
+        enqueue_match_job(self.lost)
+        self.assertEqual(len(claim_jobs("worker-a")), 1)
+        self.assertEqual(claim_jobs("worker-b"), [])
+
+        MatchJob.objects.update(lease_expires_at=timezone.now() - timedelta(seconds=1))
+        self.assertEqual([j.locked_by for j in claim_jobs("worker-b")], ["worker-b"])
+
+    def test_item_create_enqueues_instead_of_matching(self):
+        """Posting an item queues a job and creates no matches inline."""
+        self.client.login(username="tester", password="testpass123")
+        response = self.client.post(reverse("items:item_create"), {
+            "status": "FOUND",
+            "title": "Silver Dell laptop",
+            "category": self.electronics.pk,
+            "brand": "Dell",
+            "building": "Mammel Hall",
+            "date_lost_or_found": date.today().isoformat(),
+        })
+        item = Item.objects.latest("pk")
+        self.assertRedirects(response, reverse("items:item_detail", args=[item.pk]))
+        self.assertTrue(MatchJob.objects.filter(item=item, status=MatchJob.PENDING).exists())
+        self.assertFalse(Match.objects.filter(found_item=item).exists())
@@ -0,0 +1,101 @@
+import asyncio
+import threading
+import time
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import AsyncClient, TestCase, override_settings
+from django.urls import reverse
+
+from items import live
+from items.models import Notification
+
+User = get_user_model()
+
+
+class NotificationStreamTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        live._broker = None
+        self.user = User.objects.create_user(username="tester", password="testpass123")
+
+    def _notify(self, title="Match"):
+        with self.captureOnCommitCallbacks(execute=True):
+            return Notification.objects.create(recipient=self.user, title=title, message="m")
+
+    async def test_stream_pushes_new_notifications(self):
+        """A notification created after connecting is pushed with the new unread count."""
+        stream = live.event_stream(self.user.id)
+        self.assertTrue((await anext(stream)).startswith("retry:"))
+        self.assertEqual(await anext(stream), 'event: unread\ndata: {"unread":0}\n\n')
+
+        notification = await sync_to_async(self._notify)("Possible match")
+        chunk = await asyncio.wait_for(anext(stream), 1)
+        self.assertIn(f"id: {notification.id}\nevent: notification\n", chunk)
+        self.assertIn('"title":"Possible match"', chunk)
+        self.assertIn('"unread":1', chunk)
+
+        await stream.aclose()
+        self.assertEqual(live.get_broker().subscriber_count(), 0)
+
+    async def test_reconnect_replays_after_last_event_id(self):
+        """Notifications after Last-Event-ID are replayed before live events."""
+        first, second, third = [await sync_to_async(self._notify)(f"N{i}") for i in range(3)]
+        stream = live.event_stream(self.user.id, last_event_id=first.id)
+        chunks = [await anext(stream) for _ in range(4)]
+        await stream.aclose()
+        self.assertIn(f"id: {second.id}\n", chunks[1])
+        self.assertIn(f"id: {third.id}\n", chunks[2])
+        self.assertIn('"unread":3', chunks[3])
+
+    @override_settings(NOTIFICATION_STREAM_HEARTBEAT=0.01, NOTIFICATION_STREAM_MAX_AGE=0.2)
+    async def test_heartbeats_and_max_age(self):
+        """Idle streams send keepalive comments and close after the max age."""
+        chunks = [chunk async for chunk in live.event_stream(self.user.id)]
+        self.assertIn(": keepalive\n\n", chunks)
+
+    async def test_idle_streams_do_not_use_threads(self):
+        """Many open streams are coroutines on one loop, not threads."""
+        threads = threading.active_count()
+        streams = [live.event_stream(self.user.id) for _ in range(500)]
+        for stream in streams:
+            await anext(stream)  # subscribed and waiting
+        self.assertEqual(live.get_broker().subscriber_count(self.user.id), 500)
+        self.assertLessEqual(threading.active_count(), threads + 1)
+        for stream in streams:
+            await stream.aclose()
+
+    @override_settings(NOTIFICATION_STREAM_ENABLED=True)
+    async def test_anonymous_stream_is_refused(self):
+        """Anonymous clients get a 204 so EventSource stops reconnecting."""
+        response = await AsyncClient().get(reverse("items:notification_stream"))
+        self.assertEqual(response.status_code, 204)
+
+    @override_settings(NOTIFICATION_STREAM_ENABLED=True, NOTIFICATION_STREAM_MAX_AGE=5)
+    def test_wsgi_requests_are_refused(self):
+        """Under WSGI the stream would be buffered until it ends, so it gets a 204 at once."""
+        self.client.login(username="tester", password="testpass123")
+        started = time.monotonic()
+        response = self.client.get(reverse("items:notification_stream"))
+        self.assertEqual(response.status_code, 204)
+        self.assertEqual(response.content, b"")
+        self.assertLess(time.monotonic() - started, 1)
+
+    @override_settings(NOTIFICATION_STREAM_ENABLED=True, NOTIFICATION_STREAM_MAX_AGE=0.1)
+    async def test_asgi_stream_response(self):
+        """Over ASGI the view streams the events."""
+        client = AsyncClient()
+        await sync_to_async(client.force_login)(self.user)
+        response = await client.get(reverse("items:notification_stream"))
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        body = b"".join([chunk async for chunk in response.streaming_content]).decode()
+        self.assertTrue(body.startswith("retry:"))
+        self.assertIn("event: unread", body)
+
+    def test_script_only_when_enabled(self):
+        """Pages only open the stream when it is enabled."""
+        self.client.login(username="tester", password="testpass123")
+        self.assertNotContains(self.client.get(reverse("items:home")), "EventSource(")
+        with self.settings(NOTIFICATION_STREAM_ENABLED=True):
+            self.assertContains(self.client.get(reverse("items:home")), "EventSource(")
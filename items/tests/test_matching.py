@@ -1,10 +1,13 @@
 from datetime import date, timedelta
 
-from django.test import TestCase
+from django.test import TestCase, override_settings
 from django.contrib.auth import get_user_model
 
 from items.models import Item, Category
-from items.matching import item_score, find_matches_for
+from items.matching import (
+    item_score, item_score_breakdown, find_matches_for, score_candidates,
+    fuzzy, text_similarity, ScoringStats,
+)
 
 User = get_user_model()
 
@@ -130,7 +133,7 @@ class MatchingTests(TestCase):
         # If find_matches_for is written correctly, candidates for a LOST item
         # will all be FOUND items.
         matches = find_matches_for(self.lost_laptop)
-        for candidate, score in matches:
+        for candidate, score, _breakdown in matches:
             self.assertEqual(
                 candidate.status,
                 "FOUND",
@@ -161,3 +164,55 @@ class MatchingTests(TestCase):
             score, 40.0,
             f"Case differences lowered the score too much: {score}",
         )
+
+    def test_batch_scoring_matches_pairwise_scoring(self):
+        """score_candidates should return exactly what item_score_breakdown does."""
+        self.found_jacket.color_primary = ""
+        self.found_jacket.date_lost_or_found = None
+        candidates = [self.found_laptop, self.found_jacket, self.found_unapproved, self.lost_laptop]
+
+        batch = score_candidates(self.lost_laptop, candidates)
+
+        self.assertEqual(batch, [item_score_breakdown(self.lost_laptop, c) for c in candidates])
+        self.assertEqual(score_candidates(self.lost_laptop, []), [])
+
+    def test_trigram_similarity_is_bounded_for_long_text(self):
+        """Long descriptions are compared through fixed-size signatures."""
+        self.found_laptop.description = "silver dell laptop with stickers " * 200
+        self.found_laptop.save()
+        self.assertLessEqual(len(self.found_laptop.description_shingles), 64)
+        self.assertEqual(text_similarity(self.found_laptop, self.found_laptop), 1.0)
+        self.assertGreater(text_similarity(self.lost_laptop, self.found_laptop), 0.5)
+
+    @override_settings(MATCH_FUZZY_ENGINE="sequence")
+    def test_sequence_engine_is_compatibility_mode(self):
+        """MATCH_FUZZY_ENGINE="sequence" scores with SequenceMatcher as before."""
+        expected = max(
+            fuzzy(self.lost_laptop.title, self.found_laptop.title),
+            fuzzy(self.lost_laptop.description, self.found_laptop.description),
+        )
+        bd = item_score_breakdown(self.lost_laptop, self.found_laptop)
+        self.assertEqual(bd["title_desc_fuzzy"], round(20.0 * expected, 2))
+
+    def test_pruning_keeps_results_identical(self):
+        """Pruned pairs are exactly the ones that could not reach the threshold."""
+        weak = Item.objects.create(
+            owner=self.user,
+            status="FOUND",
+            title="Laptop",
+            category=self.electronics,
+            building="Arts and Sciences Hall",
+            date_lost_or_found=date.today() + timedelta(days=25),
+            approved=True,
+        )
+        candidates = [self.found_laptop, weak, self.found_unapproved]
+        stats = ScoringStats()
+
+        pruned = score_candidates(self.lost_laptop, candidates, threshold=40, stats=stats)
+        full = score_candidates(self.lost_laptop, candidates)
+
+        self.assertIsNone(pruned[1])
+        self.assertLess(full[1]["total"], 40)
+        self.assertEqual([pruned[0], pruned[2]], [full[0], full[2]])
+        self.assertEqual(stats.pruned, 1)
+        self.assertEqual(stats.scored, 2)
@@ -0,0 +1,170 @@
+import socketserver
+import threading
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from items import outbox
+from items.models import Category, Item, Match, Notification, OutboundMessage, Profile
+
+User = get_user_model()
+
+
+class SMTPStandIn(socketserver.ThreadingTCPServer):
+    """Just enough SMTP to accept mail; records connections and messages."""
+
+    allow_reuse_address = True
+    daemon_threads = True
+
+    def __init__(self):
+        self.connections = 0
+        self.messages = []
+        super().__init__(("127.0.0.1", 0), SMTPHandler)
+
+
+class SMTPHandler(socketserver.StreamRequestHandler):
+    def reply(self, line):
+        self.wfile.write(line.encode() + b"\r\n")
+
+    def handle(self):
+        self.server.connections += 1
+        self.reply("220 stand-in")
+        recipients = []
+        for raw in self.rfile:
+            command = raw.decode().strip().upper()
+            if command.startswith(("EHLO", "HELO")):
+                self.reply("250 stand-in")
+            elif command.startswith("RCPT"):
+                recipients.append(raw.decode().split(":", 1)[1].strip())
+                self.reply("250 OK")
+            elif command == "DATA":
+                self.reply("354 go ahead")
+                lines = []
+                for line in self.rfile:
+                    if line == b".\r\n":
+                        break
+                    lines.append(line.decode())
+                self.server.messages.append((recipients, "".join(lines)))
+                recipients = []
+                self.reply("250 queued")
+            elif command == "QUIT":
+                self.reply("221 bye")
+                return
+            else:  # MAIL, RSET, NOOP
+                self.reply("250 OK")
+
+
+class BrokenSender:
+    def send(self, digests, throttle=lambda: None):
+        raise ConnectionRefusedError("SMTP is down")
+
+
+@override_settings(OUTBOX_DIGEST_WINDOW=0, OUTBOX_CHANNELS={"EMAIL": "items.outbox.EmailSender"})
+class OutboxTests(TestCase):
+    def setUp(self):
+        self.staff = User.objects.create_user(username="staff", password="testpass123", is_staff=True)
+        self.users = [
+            User.objects.create_user(username=f"user{n}", email=f"user{n}@example.com", password="testpass123")
+            for n in range(3)
+        ]
+
+    def _notify(self, user, title="Match"):
+        notification = Notification.objects.create(
+            recipient=user, title=title, message="Details", url=f"/items/{user.pk}/",
+        )
+        outbox.enqueue_notifications([notification])
+        return notification
+
+    def test_notify_match_queues_email_without_sending(self):
+        """Staff notifying a match only queues email, per recipient preferences."""
+        category = Category.objects.create(name="Keys")
+        lost_owner, found_owner = self.users[:2]
+        Profile.objects.create(user=found_owner, preferred_contact_method=Profile.CONTACT_INAPP)
+        lost = Item.objects.create(owner=lost_owner, title="Keys", status=Item.LOST, category=category)
+        found = Item.objects.create(owner=found_owner, title="Keys", status=Item.FOUND, category=category)
+        match = Match.objects.create(lost_item=lost, found_item=found, score=80)
+
+        self.client.login(username="staff", password="testpass123")
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.post(reverse("items:notify_match", args=[match.pk]), {"title": "Match", "message": "Look"})
+
+        inserts = [q for q in ctx.captured_queries if q["sql"].startswith('INSERT INTO "items_notification"')]
+        self.assertEqual(len(inserts), 1)
+        self.assertEqual(Notification.objects.count(), 2)
+        message = OutboundMessage.objects.get()
+        self.assertEqual((message.recipient, message.address), (lost_owner, "user0@example.com"))
+        self.assertEqual(message.status, OutboundMessage.PENDING)
+        self.assertEqual(mail.outbox, [])
+
+    def test_worker_sends_one_digest_per_user(self):
+        """A user's pending messages are coalesced into a single email."""
+        self._notify(self.users[0], "First")
+        self._notify(self.users[0], "Second")
+        self._notify(self.users[1], "Only")
+
+        call_command("run_outbox_worker", once=True, stdout=StringIO())
+
+        self.assertEqual(len(mail.outbox), 2)
+        digest = next(m for m in mail.outbox if m.to == ["user0@example.com"])
+        self.assertEqual(digest.subject, "2 new notifications from MavFinder")
+        self.assertIn("First", digest.body)
+        self.assertIn("Second", digest.body)
+        self.assertIn("http://localhost:8000/items/", digest.body)
+        self.assertFalse(OutboundMessage.objects.exclude(status=OutboundMessage.SENT).exists())
+
+    def test_batch_reuses_one_smtp_connection(self):
+        """One batch opens one SMTP session for every recipient."""
+        server = SMTPStandIn()
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        for user in self.users:
+            self._notify(user)
+
+        with self.settings(
+            EMAIL_BACKEND="django.core.mail.backends.smtp.EmailBackend",
+            EMAIL_HOST="127.0.0.1", EMAIL_PORT=server.server_address[1],
+        ):
+            outbox.process_outbox("test")
+
+        self.assertEqual(server.connections, 1)
+        self.assertEqual(sorted(r for rs, _ in server.messages for r in rs),
+                         [f"<user{n}@example.com>" for n in range(3)])
+
+    @override_settings(OUTBOX_CHANNELS={"EMAIL": "items.tests.test_outbox.BrokenSender"})
+    def test_failures_back_off_then_go_dead(self):
+        """Failed deliveries are retried later and marked DEAD after max_attempts."""
+        self._notify(self.users[0])
+        OutboundMessage.objects.update(max_attempts=2)
+
+        with self.assertLogs("items.outbox", level="WARNING"):
+            outbox.process_outbox("test")
+        message = OutboundMessage.objects.get()
+        self.assertEqual(message.status, OutboundMessage.PENDING)
+        self.assertGreater(message.run_after, timezone.now())
+        self.assertIn("SMTP is down", message.last_error)
+
+        OutboundMessage.objects.update(run_after=timezone.now())
+        with self.assertLogs("items.outbox", level="WARNING"):
+            outbox.process_outbox("test")
+        self.assertEqual(OutboundMessage.objects.get().status, OutboundMessage.DEAD)
+
+    def test_rate_limiter_spaces_sends(self):
+        """RateLimiter sleeps so calls are at least 1/rate seconds apart."""
+        now, slept = [0.0], []
+
+        def sleep(seconds):
+            slept.append(seconds)
+            now[0] += seconds
+
+        limiter = outbox.RateLimiter(rate=4, clock=lambda: now[0], sleep=sleep)
+        for _ in range(3):
+            limiter()
+        self.assertEqual(slept, [0.25, 0.25])
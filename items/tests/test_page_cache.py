@@ -0,0 +1,78 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from items.checks import check_shared_caches
+from items.models import Category, Item
+
+User = get_user_model()
+
+
+class PublicPageCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="tester", password="testpass123")
+        self.staff = User.objects.create_user(username="staff", password="testpass123", is_staff=True)
+        self.category = Category.objects.create(name="Electronics")
+        self.item = Item.objects.create(owner=self.user, title="Black phone", category=self.category, approved=True)
+
+    def test_listing_fragments_are_cached_per_filter(self):
+        """Repeat anonymous views render from the cache; other filters are cached separately."""
+        # item_list still loads the categories for its filter form.
+        for url, queries in ((reverse("items:home"), 0), (reverse("items:item_list"), 1)):
+            with self.subTest(url=url):
+                self.client.get(url)
+                with self.assertNumQueries(queries):
+                    self.assertContains(self.client.get(url), "Black phone")
+        response = self.client.get(reverse("items:item_list"), {"status": "FOUND"})
+        self.assertNotContains(response, "Black phone")
+
+    def test_item_changes_invalidate_cached_pages(self):
+        """Saving, approving or deleting items bumps the listing version."""
+        url = reverse("items:item_list")
+        self.client.get(url)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.item.title = "Blue phone"
+            self.item.save()
+        self.assertContains(self.client.get(url), "Blue phone")
+
+        pending = Item.objects.create(owner=self.user, title="Red umbrella", category=self.category)
+        self.assertNotContains(self.client.get(url), "Red umbrella")
+        self.client.login(username="staff", password="testpass123")
+        self.client.post(reverse("items:review_items"), {"action": "approve", "item_ids": [pending.pk]})
+        self.assertContains(self.client.get(url), "Red umbrella")
+
+        self.item.delete()
+        self.assertNotContains(self.client.get(reverse("items:home")), "Blue phone")
+
+    def test_item_detail_conditional_get(self):
+        """A matching ETag or an unchanged Last-Modified gives a 304; an edit gives a 200."""
+        url = reverse("items:item_detail", args=[self.item.pk])
+        response = self.client.get(url)
+        etag, last_modified = response["ETag"], response["Last-Modified"]
+
+        with self.assertNumQueries(1):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(self.client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified).status_code, 304)
+
+        self.item.title = "Edited"
+        self.item.save()
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+        # Logging in changes the page chrome, so the anonymous ETag no longer matches.
+        self.client.login(username="staff", password="testpass123")
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_owner_view_is_not_conditional(self):
+        """The owner's page lists matches, which the item's ETag doesn't cover."""
+        self.client.login(username="tester", password="testpass123")
+        response = self.client.get(reverse("items:item_detail", args=[self.item.pk]))
+        self.assertNotIn("ETag", response)
+
+    def test_deploy_check_flags_per_process_cache(self):
+        """check --deploy warns when fragments live in a per-process cache, unless caching is off."""
+        self.assertIn("items.W002", [w.id for w in check_shared_caches(None)])
+        with self.settings(PUBLIC_PAGE_CACHE=None):
+            self.assertNotIn("items.W002", [w.id for w in check_shared_caches(None)])
@@ -0,0 +1,58 @@
+from django.http import QueryDict
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from django.contrib.auth import get_user_model
+
+from items.models import Item, Category, Notification
+from items.pagination import KeysetPaginator
+
+User = get_user_model()
+
+
+class KeysetPaginationTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="tester", password="testpass123")
+        category = Category.objects.create(name="Electronics")
+        for n in range(7):
+            Item.objects.create(owner=self.user, title=f"Item {n}", category=category, approved=True)
+        # Several rows share a timestamp, so the id tie-breaker matters.
+        Item.objects.filter(title__in=["Item 2", "Item 3", "Item 4"]).update(date_reported=timezone.now())
+        self.expected = list(Item.objects.order_by("-date_reported", "-id"))
+        self.paginator = KeysetPaginator(Item.objects.all(), ("-date_reported", "-id"), per_page=3)
+
+    def _page(self, query=""):
+        return self.paginator.get_page(QueryDict(query))
+
+    def test_walks_forward_and_back(self):
+        """Following next then previous links visits every row once, in order."""
+        pages = [self._page()]
+        while pages[-1].has_next:
+            pages.append(self._page(pages[-1].next_query))
+        self.assertEqual([i for p in pages for i in p], self.expected)
+        self.assertEqual([len(p) for p in pages], [3, 3, 1])
+        self.assertFalse(pages[0].has_previous)
+
+        back = self._page(pages[-1].previous_query)
+        self.assertEqual(list(back), list(pages[1]))
+        first = self._page(back.previous_query)
+        self.assertEqual(list(first), list(pages[0]))
+        self.assertFalse(first.has_previous)
+        self.assertTrue(first.has_next)
+
+    def test_invalid_cursor_gives_first_page(self):
+        """A garbled cursor falls back to the first page instead of erroring."""
+        self.assertEqual(list(self._page("cursor=not-a-cursor")), self.expected[:3])
+
+    def test_notifications_view_pages_with_cursor(self):
+        """The notifications list renders one page and links to the next."""
+        for n in range(30):
+            Notification.objects.create(recipient=self.user, title=f"N{n}", message="m")
+        self.client.login(username="tester", password="testpass123")
+        response = self.client.get(reverse("items:notifications"))
+        page = response.context["page"]
+        self.assertEqual(len(page), 25)
+        self.assertContains(response, f"?{page.next_query}")
+
+        response = self.client.get(reverse("items:notifications") + "?" + page.next_query)
+        self.assertEqual(len(response.context["page"]), 5)
@@ -0,0 +1,202 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.urls import reverse
+
+from items import unread, urls
+from items.models import Category, Item, Match, Notification
+from items.query_stats import QueryStats, fingerprint
+from items.tests.query_budget import QueryBudgetTestCase
+
+User = get_user_model()
+
+# Max queries per route, measured with several rows of every kind so a
+# per-row query shows up as a repeat. Session and user lookups are included;
+# item_list covers the search path and item_delete the cascade.
+BUDGETS = {
+    "home": 1,
+    "item_list": 3,
+    "item_create": 3,
+    "item_detail": 4,
+    "item_update": 4,
+    "item_delete": 16,  # cascades through matches, notifications and their outbox rows, then rescores partners
+    "account": 5,
+    "match_review": 3,
+    "review_items": 6,
+    "notify_match": 3,
+    # Rows are read while the response streams, after the view returns.
+    "export_data": 2,
+    "api_items": 3,
+    "api_item": 3,
+    "api_matches": 3,
+    "api_notifications": 3,
+    "notifications": 3,
+    "notification_mark_read": 4,
+    "notifications_mark_all_read": 3,
+    # Opening the stream; its body only reads the cached unread count.
+    "notification_stream": 2,
+}
+
+# Max queries for the form submissions that write, with several items and
+# matches around so a per-row query shows up as a repeat.
+POST_BUDGETS = {
+    # Insert, search/token index and outbox rows, the match job, the listing version.
+    "item_create": 11,
+    # As create, plus the edited item's matches: rescored in place for a
+    # color edit, a queued candidate search for a title edit.
+    "item_update": 12,
+    # Approving three items: one UPDATE each for items, tokens and jobs.
+    "review_items_approve": 8,
+    # Rejecting every match: one UPDATE per target status.
+    "review_items_matches": 3,
+    "notification_mark_read": 4,
+}
+
+
+class QueryBudgetTests(QueryBudgetTestCase):
+    def setUp(self):
+        self.staff = User.objects.create_user(username="staff", password="testpass123", is_staff=True)
+        self.owner = User.objects.create_user(username="owner", password="testpass123")
+        categories = [Category.objects.create(name=name) for name in ("Electronics", "Keys", "Bags")]
+        self.lost, self.found = [], []
+        for n in range(6):
+            category = categories[n % 3]
+            self.lost.append(Item.objects.create(
+                owner=self.owner, title=f"Black phone {n}", status=Item.LOST, category=category,
+                approved=n % 2 == 0, building="Library",
+            ))
+            self.found.append(Item.objects.create(
+                owner=self.staff, title=f"Phone found {n}", status=Item.FOUND, category=category,
+                approved=True, building="Library",
+            ))
+        self.matches = [
+            Match.objects.create(lost_item=lost, found_item=found, score=60 + n)
+            for n, (lost, found) in enumerate(zip(self.lost, self.found))
+        ]
+        self.notifications = [
+            Notification.objects.create(recipient=self.owner, match=m, title="Match", message="m")
+            for m in self.matches
+        ]
+        # Budgets are for the common case, with unread counts already cached.
+        cache.clear()
+        for user in (self.staff, self.owner):
+            unread.unread_count(user.id)
+
+    def _login(self, user):
+        self.client.login(username=user.username, password="testpass123")
+
+    def test_every_route_has_a_budget(self):
+        """New routes must declare a budget here."""
+        self.assertEqual({p.name for p in urls.urlpatterns}, set(BUDGETS))
+
+    def test_public_pages(self):
+        self.assertQueryBudget(BUDGETS["home"], reverse("items:home"))
+        self.assertQueryBudget(BUDGETS["item_list"], reverse("items:item_list"))
+        self.assertQueryBudget(BUDGETS["item_list"], reverse("items:item_list") + "?q=phone")
+        self.assertQueryBudget(BUDGETS["item_detail"], reverse("items:item_detail", args=[self.found[0].pk]))
+
+    def test_owner_pages(self):
+        self._login(self.owner)
+        item = self.lost[0]
+        self.assertQueryBudget(BUDGETS["item_detail"], reverse("items:item_detail", args=[item.pk]))
+        self.assertQueryBudget(BUDGETS["item_create"], reverse("items:item_create"))
+        self.assertQueryBudget(BUDGETS["item_update"], reverse("items:item_update", args=[item.pk]))
+        self.assertQueryBudget(BUDGETS["account"], reverse("items:account"))
+        self.assertQueryBudget(BUDGETS["notifications"], reverse("items:notifications"))
+        self.assertQueryBudget(BUDGETS["notification_stream"], reverse("items:notification_stream"))
+        self.assertQueryBudget(BUDGETS["api_items"], reverse("items:api_items"))
+        self.assertQueryBudget(BUDGETS["api_item"], reverse("items:api_item", args=[item.pk]))
+        self.assertQueryBudget(BUDGETS["api_matches"], reverse("items:api_matches"))
+        self.assertQueryBudget(BUDGETS["api_notifications"], reverse("items:api_notifications"))
+        self.assertQueryBudget(
+            BUDGETS["notification_mark_read"],
+            reverse("items:notification_mark_read", args=[self.notifications[0].pk]),
+        )
+        self.assertQueryBudget(
+            BUDGETS["notifications_mark_all_read"], reverse("items:notifications_mark_all_read"), method="post",
+        )
+        self.assertQueryBudget(BUDGETS["item_delete"], reverse("items:item_delete", args=[item.pk]))
+
+    def test_staff_pages(self):
+        self._login(self.staff)
+        self.assertQueryBudget(BUDGETS["match_review"], reverse("items:match_review"))
+        # The pending and approved pages are the same query with a different flag.
+        for query in ("", "?sort=score"):
+            self.assertQueryBudget(BUDGETS["review_items"], reverse("items:review_items") + query, max_repeats=2)
+        self.assertQueryBudget(BUDGETS["notify_match"], reverse("items:notify_match", args=[self.matches[0].pk]))
+        for dataset in ("items", "matches", "notifications"):
+            self.assertQueryBudget(BUDGETS["export_data"], reverse("items:export_data", args=[dataset]))
+
+    def _item_form(self, item, **changes):
+        data = {
+            "status": item.status, "title": item.title, "description": item.description,
+            "category": item.category_id, "color_primary": item.color_primary, "brand": item.brand,
+            "model_or_markings": item.model_or_markings, "building": item.building,
+            "room_or_area": item.room_or_area, "date_lost_or_found": "2026-09-01",
+        }
+        data.update(changes)
+        return data
+
+    def test_owner_writes(self):
+        self._login(self.owner)
+        item = self.lost[0]
+        self.assertQueryBudget(
+            POST_BUDGETS["item_create"], reverse("items:item_create"), method="post",
+            data=self._item_form(item, title="Blue phone"),
+        )
+        self.assertTrue(Item.objects.filter(title="Blue phone").exists())
+        for changes in ({"color_primary": "Red"}, {"title": "Red phone"}):
+            self.assertQueryBudget(
+                POST_BUDGETS["item_update"], reverse("items:item_update", args=[item.pk]), method="post",
+                data=self._item_form(item, **changes),
+            )
+        self.assertEqual(Item.objects.get(pk=item.pk).title, "Red phone")
+        self.assertQueryBudget(
+            POST_BUDGETS["notification_mark_read"],
+            reverse("items:notification_mark_read", args=[self.notifications[1].pk]), method="post",
+        )
+
+    def test_staff_writes(self):
+        self._login(self.staff)
+        pending = [item.pk for item in self.lost if not item.approved]
+        self.assertQueryBudget(
+            POST_BUDGETS["review_items_approve"], reverse("items:review_items"), method="post",
+            data={"action": "approve", "item_ids": pending},
+        )
+        self.assertFalse(Item.objects.filter(approved=False).exists())
+        self.assertQueryBudget(
+            POST_BUDGETS["review_items_matches"], reverse("items:review_items"), method="post",
+            data={f"match_status_{match.pk}": Match.REJECTED for match in self.matches},
+        )
+        self.assertFalse(Match.objects.exclude(status=Match.REJECTED).exists())
+
+
+class QueryStatsTests(QueryBudgetTestCase):
+    def test_fingerprint_ignores_parameters_and_list_length(self):
+        """Queries differing only in parameters or IN-list length share a fingerprint."""
+        self.assertEqual(
+            fingerprint('SELECT * FROM "t" WHERE "id" IN (%s, %s)'),
+            fingerprint('SELECT * FROM "t"  WHERE "id" IN (%s,%s,%s)'),
+        )
+
+    def test_counts_duplicates(self):
+        """A per-row lookup is reported as a duplicated fingerprint."""
+        category = Category.objects.create(name="Electronics")
+        with QueryStats() as stats:
+            for _ in range(3):
+                Category.objects.get(pk=category.pk)
+            list(Item.objects.all())
+        self.assertEqual(stats.count, 4)
+        self.assertEqual(list(stats.duplicates().values()), [3])
+
+    def test_middleware_reports_headers(self):
+        """Responses carry the query count and DB time when the middleware is on."""
+        response = self.client.get(reverse("items:home"))
+        self.assertIn("X-Query-Count", response)
+        self.assertIn("db;dur=", response["Server-Timing"])
+
+    async def test_middleware_reports_headers_under_asgi(self):
+        """Async requests are counted too, including the sync views they reach."""
+        cache.clear()
+        response = await self.async_client.get(reverse("items:home"))
+        self.assertEqual(response["X-Query-Count"], "1")
+        self.assertIn("db;dur=", response["Server-Timing"])
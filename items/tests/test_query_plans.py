@@ -0,0 +1,176 @@
+"""
+Query-plan regression tests: run the hot paths, EXPLAIN every query they
+issue and fail if a large table is read in full, whether row by row or
+through a whole index. Runs on SQLite and PostgreSQL; PostgreSQL prefers
+sequential scans on tiny test tables, so they are disabled for the EXPLAIN
+to show whether an index could be used at all.
+
+A whole-index walk is allowed in one case: a LIMITed query with no sort
+step, where the index supplies the ORDER BY and the walk stops after LIMIT
+rows. Paginated endpoints must also not sort in a temporary structure,
+which would read every matching row before the first page.
+"""
+import json
+import re
+from collections import namedtuple
+from datetime import date
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from items import unread
+from items.matching import candidate_queryset
+from items.models import Category, Item, Match, Notification
+
+User = get_user_model()
+
+HOT_TABLES = {"items_item", "items_match", "items_notification", "items_itemtoken"}
+
+# scans: [(table, index or None)] for each table read without a search
+# condition; sorts: whether rows are sorted after being read.
+Plan = namedtuple("Plan", "scans sorts text")
+
+# Django's table aliases ("items_match" U0 in subqueries, "items_item" T3
+# for repeated joins), which SQLite reports instead of the table name.
+ALIAS_RE = re.compile(r'(?:FROM|JOIN)\s+"(\w+)"\s+(?:AS\s+)?"?([A-Z]\d+)\b')
+SQLITE_SCAN_RE = re.compile(r"^SCAN (\w+)(?: USING (?:COVERING )?INDEX (\w+))?")
+LIMIT_RE = re.compile(r"\bLIMIT\b")
+
+
+def _sqlite_plan(cursor, sql):
+    cursor.execute("EXPLAIN QUERY PLAN " + sql)
+    details = [row[-1] for row in cursor.fetchall()]
+    aliases = {alias: table for table, alias in ALIAS_RE.findall(sql)}
+    scans = []
+    for detail in details:
+        match = SQLITE_SCAN_RE.match(detail)
+        if match:
+            scans.append((aliases.get(match[1], match[1]), match[2]))
+    sorts = any(d.startswith("USE TEMP B-TREE") and "ORDER BY" in d for d in details)
+    return Plan(scans, sorts, "\n".join(details))
+
+
+def _postgresql_nodes(node):
+    yield node
+    for child in node.get("Plans", ()):
+        yield from _postgresql_nodes(child)
+
+
+def _postgresql_plan(cursor, sql):
+    cursor.execute("SET LOCAL enable_seqscan = off")
+    cursor.execute("EXPLAIN (FORMAT JSON) " + sql)
+    plan = cursor.fetchone()[0]
+    plan = json.loads(plan) if isinstance(plan, str) else plan
+    scans, sorts = [], False
+    for node in _postgresql_nodes(plan[0]["Plan"]):
+        kind = node["Node Type"]
+        if kind == "Seq Scan":
+            scans.append((node["Relation Name"], None))
+        elif kind in ("Index Scan", "Index Only Scan") and "Index Cond" not in node:
+            scans.append((node["Relation Name"], node["Index Name"]))
+        elif kind in ("Sort", "Incremental Sort"):
+            sorts = True
+    return Plan(scans, sorts, json.dumps(plan, indent=1))
+
+
+def explain(sql):
+    with connection.cursor() as cursor:
+        if connection.vendor == "postgresql":
+            return _postgresql_plan(cursor, sql)
+        return _sqlite_plan(cursor, sql)
+
+
+def plan_problems(sql, plan, paginated=False):
+    """Why `plan` for `sql` reads too much of a hot table; empty if it doesn't."""
+    limited = bool(LIMIT_RE.search(sql))
+    problems = []
+    for table, index in plan.scans:
+        if table not in HOT_TABLES:
+            continue
+        if index and limited and not plan.sorts:
+            continue  # ordered index walk that stops after LIMIT rows
+        problems.append(f"full scan of {table}" + (f" (all of {index})" if index else ""))
+    reads_hot = any(f'"{table}"' in sql for table in HOT_TABLES)
+    if paginated and limited and plan.sorts and reads_hot:
+        problems.append("sorts every matching row for one page")
+    return problems
+
+
+class QueryPlanTests(TestCase):
+    def setUp(self):
+        if connection.vendor not in ("sqlite", "postgresql"):
+            self.skipTest(f"No plan checks for {connection.vendor}")
+        cache.clear()
+        self.staff = User.objects.create_user(username="staff", password="testpass123", is_staff=True)
+        self.owner = User.objects.create_user(username="owner", password="testpass123")
+        category = Category.objects.create(name="Electronics")
+        fields = dict(category=category, building="Library", date_lost_or_found=date(2026, 9, 1), approved=True)
+        self.lost = Item.objects.create(owner=self.owner, status=Item.LOST, title="Black phone", **fields)
+        self.found = Item.objects.create(owner=self.staff, status=Item.FOUND, title="Phone, black", **fields)
+        Match.objects.create(lost_item=self.lost, found_item=self.found, score=70)
+        Notification.objects.create(recipient=self.owner, title="Match", message="m")
+
+    def assertIndexed(self, run, paginated=False):
+        """
+        Every SELECT issued by run() reads the hot tables through an index
+        search (or an ordered, LIMITed index walk); with `paginated`, none
+        sorts its rows after reading them.
+        """
+        with CaptureQueriesContext(connection) as ctx:
+            response = run()
+        if hasattr(response, "status_code"):
+            self.assertEqual(response.status_code, 200)
+        selects = [q["sql"] for q in ctx.captured_queries if q["sql"].lstrip().upper().startswith("SELECT")]
+        self.assertTrue(selects, "nothing to explain")
+        for sql in selects:
+            plan = explain(sql)
+            problems = plan_problems(sql, plan, paginated)
+            self.assertFalse(problems, f"{'; '.join(problems)}:\n{sql}\n{plan.text}")
+
+    def test_match_candidates(self):
+        self.assertIndexed(lambda: list(candidate_queryset(self.lost)))
+        self.assertIndexed(lambda: list(candidate_queryset(self.found, include_unapproved=True)))
+
+    def test_public_listings(self):
+        self.assertIndexed(lambda: self.client.get(reverse("items:home")), paginated=True)
+        for query in ("", "?status=LOST", "?building=library", "?status=FOUND&building=Library"):
+            cache.clear()
+            self.assertIndexed(lambda: self.client.get(reverse("items:item_list") + query), paginated=True)
+
+    def test_public_api(self):
+        for query in ("", "?status=FOUND", "?updated_since=2026-01-01T00:00Z"):
+            self.assertIndexed(lambda: self.client.get(reverse("items:api_items") + query), paginated=True)
+        self.assertIndexed(lambda: self.client.get(reverse("items:api_item", args=[self.lost.pk])))
+
+    def test_unread_count_uses_partial_index(self):
+        self.assertIndexed(lambda: unread.count_unread(self.owner.id))
+        sql = str(Notification.objects.filter(recipient_id=self.owner.id, is_read=False).values("id").query)
+        self.assertIn("notification_unread_idx", explain(sql).text)
+
+    def test_owner_and_notification_pages(self):
+        self.client.login(username="owner", password="testpass123")
+        self.assertIndexed(lambda: self.client.get(reverse("items:item_detail", args=[self.lost.pk])))
+        self.assertIndexed(lambda: self.client.get(reverse("items:notifications")), paginated=True)
+
+    def test_owner_api(self):
+        self.client.login(username="owner", password="testpass123")
+        for query in ("", "?updated_since=2026-01-01T00:00Z"):
+            self.assertIndexed(lambda: self.client.get(reverse("items:api_notifications") + query), paginated=True)
+            # An owner's matches are searched through their own items from
+            # both sides, so the page is sorted, but only over those rows.
+            self.assertIndexed(lambda: self.client.get(reverse("items:api_matches") + query))
+
+    def test_staff_review_pages(self):
+        self.client.login(username="staff", password="testpass123")
+        for query in ("", "?sort=score"):
+            self.assertIndexed(lambda: self.client.get(reverse("items:review_items") + query), paginated=True)
+        self.assertIndexed(lambda: self.client.get(reverse("items:match_review")), paginated=True)
+
+    def test_staff_api(self):
+        self.client.login(username="staff", password="testpass123")
+        for query in ("", "?updated_since=2026-01-01T00:00Z"):
+            self.assertIndexed(lambda: self.client.get(reverse("items:api_matches") + query), paginated=True)
@@ -0,0 +1,84 @@
+import json
+import os
+import tempfile
+from datetime import date, timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+
+from items.models import Item, Category, Match
+from items.matching import item_score_breakdown
+
+User = get_user_model()
+
+
+class RebuildMatchBreakdownsTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="tester", password="testpass123")
+        self.electronics = Category.objects.create(name="Electronics")
+        self.clothing = Category.objects.create(name="Clothing")
+        self.matches = []
+        for i, category in enumerate([self.electronics, self.electronics, self.clothing]):
+            fields = dict(owner=self.user, category=category, brand="Dell", building="Mammel Hall",
+                          date_lost_or_found=date.today(), approved=True)
+            lost = Item.objects.create(status="LOST", title=f"Dell laptop {i}", **fields)
+            found = Item.objects.create(status="FOUND", title=f"Laptop {i}", **fields)
+            self.matches.append(Match.objects.create(lost_item=lost, found_item=found, score=0))
+
+    def _run(self, **opts):
+        call_command("rebuild_match_breakdowns", stdout=StringIO(), **opts)
+        return {m.pk: m for m in Match.objects.all()}
+
+    def test_rescores_all_matches(self):
+        """Every match gets the current breakdown and total."""
+        for workers in (1, 2):
+            Match.objects.update(score=0, score_breakdown={})
+            rebuilt = self._run(chunk_size=2, workers=workers)
+            for m in self.matches:
+                expected = item_score_breakdown(m.lost_item, m.found_item)
+                self.assertEqual(rebuilt[m.pk].score_breakdown, expected)
+                self.assertEqual(rebuilt[m.pk].score, expected["total"])
+
+    def test_reads_matches_in_keyset_chunks(self):
+        """Matches are read a chunk at a time by pk, never as one full list."""
+        with CaptureQueriesContext(connection) as ctx:
+            call_command("rebuild_match_breakdowns", chunk_size=2, stdout=StringIO())
+        reads = [q["sql"] for q in ctx.captured_queries
+                 if q["sql"].startswith("SELECT") and 'FROM "items_match"' in q["sql"] and "COUNT(" not in q["sql"]]
+        self.assertEqual(len(reads), 3)  # two chunks, then an empty one
+        for sql in reads:
+            self.assertIn("LIMIT 2", sql)
+
+    def test_category_filter(self):
+        """--category limits the run to matches in that category."""
+        rebuilt = self._run(category="clothing")
+        self.assertEqual([m.pk for m in rebuilt.values() if m.score_breakdown], [self.matches[2].pk])
+
+    def test_since_filter(self):
+        """--since picks matches created, or with either item updated, on or after the date."""
+        old = timezone.now() - timedelta(days=10)
+        Match.objects.update(created_at=old)
+        Item.objects.update(updated_at=old)
+        Item.objects.filter(pk=self.matches[1].found_item_id).update(updated_at=timezone.now())
+        for workers in (1, 2):
+            Match.objects.update(score_breakdown={})
+            rebuilt = self._run(since=timezone.localdate() - timedelta(days=1), workers=workers)
+            self.assertEqual([m.pk for m in rebuilt.values() if m.score_breakdown], [self.matches[1].pk])
+
+    def test_resume_from_checkpoint(self):
+        """--resume skips matches at or before the recorded checkpoint."""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "rebuild.json")
+            with open(path, "w") as f:
+                json.dump({"last_match_id": self.matches[0].pk}, f)
+
+            rebuilt = self._run(checkpoint=path, resume=True)
+
+            self.assertEqual(rebuilt[self.matches[0].pk].score_breakdown, {})
+            self.assertTrue(rebuilt[self.matches[1].pk].score_breakdown)
+            self.assertFalse(os.path.exists(path))
@@ -0,0 +1,136 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from items.models import Category, Item, Match
+
+User = get_user_model()
+
+
+class ReviewQueueTests(TestCase):
+    def setUp(self):
+        self.staff = User.objects.create_user(username="staff", password="testpass123", is_staff=True)
+        self.category = Category.objects.create(name="Electronics")
+        self.client.login(username="staff", password="testpass123")
+
+    def _item(self, title, status=Item.LOST, approved=False, age_days=0):
+        item = Item.objects.create(
+            owner=self.staff, title=title, status=status, category=self.category, approved=approved,
+        )
+        Item.objects.filter(pk=item.pk).update(date_reported=timezone.now() - timedelta(days=age_days))
+        return item
+
+    def _populate(self, n):
+        for i in range(n):
+            lost = self._item(f"Lost {i}")
+            found = self._item(f"Found {i}", status=Item.FOUND, approved=True)
+            Match.objects.create(lost_item=lost, found_item=found, score=50 + i)
+
+    def _queries(self, query=""):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse("items:review_items") + query)
+        self.assertEqual(response.status_code, 200)
+        return len(ctx.captured_queries)
+
+    def test_query_count_does_not_grow_with_items(self):
+        """Matches are prefetched per page rather than queried per item."""
+        self._populate(2)
+        few = self._queries()
+        self._populate(8)
+        self.assertEqual(self._queries(), few)
+        self.assertEqual(self._queries("?sort=score"), few)
+
+    def test_pending_rows_show_stored_matches(self):
+        """Candidate matches come from Match rows, best first, skipping retired ones."""
+        lost = self._item("Black phone")
+        good = self._item("Phone A", status=Item.FOUND, approved=True)
+        better = self._item("Phone B", status=Item.FOUND, approved=True)
+        retired = self._item("Phone C", status=Item.FOUND, approved=True)
+        Match.objects.create(lost_item=lost, found_item=good, score=55)
+        Match.objects.create(lost_item=lost, found_item=better, score=80)
+        Match.objects.create(lost_item=lost, found_item=retired, score=90, status=Match.RETIRED)
+
+        response = self.client.get(reverse("items:review_items"))
+        row = response.context["items_with_matches"][0]
+        self.assertEqual(row["item"], lost)
+        self.assertEqual([(m["item"], m["score"]) for m in row["matches"]], [(better, 80), (good, 55)])
+
+    def test_sorts_by_score_and_age(self):
+        """sort=score puts items with the best stored match first; sort=oldest reverses age."""
+        old = self._item("Old", age_days=5)
+        new = self._item("New", age_days=0)
+        unmatched = self._item("Unmatched", age_days=2)
+        found = self._item("Found", status=Item.FOUND, approved=True)
+        Match.objects.create(lost_item=old, found_item=found, score=90)
+        other = self._item("Other found", status=Item.FOUND, approved=True)
+        Match.objects.create(lost_item=new, found_item=other, score=45)
+
+        def pending(sort):
+            response = self.client.get(reverse("items:review_items"), {"sort": sort})
+            return [row["item"] for row in response.context["items_with_matches"]]
+
+        self.assertEqual(pending("score"), [old, new, unmatched])
+        self.assertEqual(pending("oldest"), [old, unmatched, new])
+        self.assertEqual(pending("newest"), [new, unmatched, old])
+
+    def test_best_match_score_follows_match_changes(self):
+        """The stored best score tracks rescoring, retirement and deletion of matches."""
+        lost = self._item("Black phone")
+        found = self._item("Phone", status=Item.FOUND, approved=True)
+        other = self._item("Other phone", status=Item.FOUND, approved=True)
+        strong = Match.objects.create(lost_item=lost, found_item=found, score=90)
+        Match.objects.create(lost_item=lost, found_item=other, score=60)
+
+        def best(item):
+            return Item.objects.values_list("best_match_score", flat=True).get(pk=item.pk)
+
+        self.assertEqual((best(lost), best(found), best(other)), (90, 90, 60))
+        strong.status = Match.RETIRED
+        strong.save()
+        self.assertEqual((best(lost), best(found)), (60, Item.NO_MATCH_SCORE))
+        other.delete()
+        self.assertEqual(best(lost), Item.NO_MATCH_SCORE)
+        strong.delete()
+        self.assertEqual(best(found), Item.NO_MATCH_SCORE)
+
+    def test_score_sort_pages_by_stored_score(self):
+        """sort=score keyset-pages on the stored column, so deep pages don't rank every item."""
+        self._populate(30)
+        response = self.client.get(reverse("items:review_items"), {"sort": "score"})
+        first = [item.best_match_score for item in response.context["pending_page"]]
+        cursor = response.context["pending_page"].next_cursor
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse("items:review_items"), {"sort": "score", "pending_cursor": cursor})
+        second = [item.best_match_score for item in response.context["pending_page"]]
+        self.assertEqual(first + second, sorted(first + second, reverse=True))
+        self.assertEqual(second[-1], 50)
+        # No per-item score subquery in the page query.
+        page_query = next(q["sql"] for q in ctx.captured_queries if q["sql"].startswith('SELECT "items_item"'))
+        self.assertNotIn("items_match", page_query)
+
+    def test_match_statuses_use_one_update_per_status(self):
+        """Posted status changes are grouped into a single UPDATE per status."""
+        self._populate(4)
+        m1, m2, m3, m4 = Match.objects.order_by("id")
+        data = {
+            f"match_status_{m1.id}": Match.CONFIRMED,
+            f"match_status_{m2.id}": Match.CONFIRMED,
+            f"match_status_{m3.id}": Match.REJECTED,
+            f"match_status_{m4.id}": "",
+            "match_status_bogus": Match.CONFIRMED,
+        }
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.post(reverse("items:review_items") + "?sort=score", data)
+        updates = [q for q in ctx.captured_queries if q["sql"].startswith("UPDATE") and "items_match" in q["sql"]]
+        self.assertEqual(len(updates), 2)
+        self.assertRedirects(response, reverse("items:review_items") + "?sort=score")
+        statuses = dict(Match.objects.values_list("id", "status"))
+        self.assertEqual(
+            [statuses[m.id] for m in (m1, m2, m3, m4)],
+            [Match.CONFIRMED, Match.CONFIRMED, Match.REJECTED, Match.PENDING],
+        )
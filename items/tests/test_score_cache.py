@@ -0,0 +1,69 @@
+from datetime import date
+
+from django.test import TestCase, override_settings
+from django.contrib.auth import get_user_model
+
+from items.models import Item, Category
+from items.matching import find_matches_for, ScoringStats
+from items.score_cache import LocMemPairCache, get_pair_cache
+
+User = get_user_model()
+
+
+class PairScoreCacheTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="tester", password="testpass123")
+        category = Category.objects.create(name="Electronics")
+        fields = dict(
+            owner=self.user,
+            category=category,
+            color_primary="Silver",
+            brand="Dell",
+            model_or_markings="Latitude",
+            building="Mammel Hall",
+            room_or_area="MH 110",
+            date_lost_or_found=date.today(),
+            approved=True,
+        )
+        self.lost = Item.objects.create(status="LOST", title="Silver Dell laptop", **fields)
+        self.found = Item.objects.create(status="FOUND", title="Dell laptop", **fields)
+
+    def test_lru_eviction_and_item_invalidation(self):
+        """The in-process cache evicts least recently used entries and drops an item's pairs."""
+        cache = LocMemPairCache(max_entries=2)
+        cache.set_many({(1, 2, "", "", "v"): "a", (1, 3, "", "", "v"): "b"})
+        cache.get_many([(1, 2, "", "", "v")])
+        cache.set_many({(4, 5, "", "", "v"): "c"})
+        self.assertEqual(set(cache.get_many([(1, 2, "", "", "v"), (1, 3, "", "", "v")])), {(1, 2, "", "", "v")})
+
+        cache.invalidate_item(1)
+        self.assertEqual(len(cache), 1)
+
+    def _stats(self, item):
+        stats = ScoringStats()
+        matches = find_matches_for(item, stats=stats)
+        return matches, stats
+
+    def test_repeat_scoring_hits_cache_until_item_is_edited(self):
+        """A rescore reuses the cached pair; saving either item forces a fresh score."""
+        get_pair_cache().clear()
+        first, stats = self._stats(self.lost)
+        self.assertEqual(stats.cache_hits, 0)
+
+        second, stats = self._stats(self.found)
+        self.assertEqual(stats.cache_hits, 1)
+        self.assertEqual(second[0][2], first[0][2])
+
+        self.found.color_primary = "Black"
+        self.found.save()
+        third, stats = self._stats(self.lost)
+        self.assertEqual(stats.cache_hits, 0)
+        self.assertEqual(third[0][2]["color"], 0.0)
+
+    @override_settings(MATCH_PAIR_CACHE={"BACKEND": "django", "ALIAS": "default"})
+    def test_django_cache_backend(self):
+        """The Django cache backend stores and serves pair breakdowns."""
+        get_pair_cache().clear()
+        self._stats(self.lost)
+        _, stats = self._stats(self.lost)
+        self.assertEqual(stats.cache_hits, 1)
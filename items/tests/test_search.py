@@ -0,0 +1,63 @@
+from django.test import TestCase
+from django.urls import reverse
+from django.contrib.auth import get_user_model
+
+from items.models import Item, Category
+from items import search
+
+User = get_user_model()
+
+
+class ItemSearchTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="tester", password="testpass123")
+        self.electronics = Category.objects.create(name="Electronics")
+        self.clothing = Category.objects.create(name="Clothing")
+
+        def make(title, description="", category=None, **extra):
+            return Item.objects.create(
+                owner=self.user, title=title, description=description,
+                category=category or self.electronics, approved=True, **extra
+            )
+
+        self.laptop = make("Silver Dell laptop", "Left in Mammel Hall", building="Mammel Hall")
+        self.charger = make("Charger", "Power brick for a Dell laptop", building="PKI", status="FOUND")
+        self.jacket = make("Black jacket", "North Face", category=self.clothing, building="Mammel Hall")
+
+    def _search(self, q):
+        return list(search.search(Item.objects.all(), q))
+
+    def test_results_are_ranked(self):
+        """Title hits outrank description hits."""
+        self.assertEqual(self._search("dell laptop"), [self.laptop, self.charger])
+
+    def test_prefix_matching(self):
+        """Partial words match, so results update while typing."""
+        self.assertEqual(self._search("jack"), [self.jacket])
+        self.assertEqual(self._search("!!"), [])
+
+    def test_index_follows_save_and_delete(self):
+        """Edits and deletes are reflected in the index."""
+        self.jacket.title = "Black raincoat"
+        self.jacket.save()
+        self.assertEqual(self._search("raincoat"), [self.jacket])
+        self.assertEqual(self._search("jacket"), [])
+
+        self.jacket.delete()
+        self.assertEqual(self._search("raincoat"), [])
+
+    def test_item_list_filters_and_paginates(self):
+        """item_list keeps q/status and adds category, building and page parameters."""
+        url = reverse("items:item_list")
+        response = self.client.get(url, {"q": "dell", "status": "FOUND"})
+        self.assertEqual(list(response.context["items"]), [self.charger])
+
+        response = self.client.get(url, {"building": " mammel hall", "category": self.clothing.pk})
+        self.assertEqual(list(response.context["items"]), [self.jacket])
+
+        for n in range(30):
+            Item.objects.create(owner=self.user, title=f"Laptop {n}", category=self.electronics, approved=True)
+        response = self.client.get(url, {"q": "laptop", "page": 2})
+        self.assertEqual(response.context["page"].number, 2)
+        self.assertEqual(len(response.context["items"]), 32 - 24)
+        self.assertContains(response, "q=laptop&amp;page=1")
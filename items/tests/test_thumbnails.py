@@ -0,0 +1,105 @@
+import shutil
+import tempfile
+from io import BytesIO, StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.template import Context, Template
+from django.test import TestCase, override_settings
+from PIL import Image
+
+from items.jobs import process_jobs
+from items.models import Category, Item, MatchJob
+
+User = get_user_model()
+
+
+def jpeg_upload(name="phone.jpg", size=(1000, 750)):
+    image = Image.new("RGB", size, "navy")
+    exif = Image.Exif()
+    exif[0x010F] = "PhoneMaker"  # Make
+    buf = BytesIO()
+    image.save(buf, "JPEG", exif=exif)
+    return SimpleUploadedFile(name, buf.getvalue(), content_type="image/jpeg")
+
+
+class ThumbnailTests(TestCase):
+    def setUp(self):
+        self.media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media, ignore_errors=True)
+        override = override_settings(MEDIA_ROOT=self.media, ITEM_THUMBNAIL_WIDTHS=(160, 320, 640))
+        override.enable()
+        self.addCleanup(override.disable)
+        self.user = User.objects.create_user(username="tester", password="testpass123")
+        self.category = Category.objects.create(name="Electronics")
+
+    def _item(self, photo):
+        item = Item.objects.create(owner=self.user, title="Phone", category=self.category, photo=photo)
+        process_jobs("test")
+        return Item.objects.get(pk=item.pk)
+
+    def test_upload_queues_the_build(self):
+        """Saving a new photo queues a thumbnail job instead of resizing in the request."""
+        item = Item.objects.create(owner=self.user, title="Phone", category=self.category, photo=jpeg_upload())
+        self.assertEqual(item.photo_thumbnails, {})
+        job = MatchJob.objects.get(item=item, kind=MatchJob.THUMBNAILS)
+        item.title = "Black phone"
+        item.save()
+        self.assertEqual(MatchJob.objects.filter(item=item, kind=MatchJob.THUMBNAILS).get(), job)
+
+        process_jobs("test")
+        self.assertEqual(Item.objects.get(pk=item.pk).photo_thumbnails["source"], item.photo.name)
+        item.refresh_from_db()
+        item.save()
+        self.assertFalse(MatchJob.objects.filter(status=MatchJob.PENDING).exists())
+
+    def test_upload_builds_stripped_thumbnails(self):
+        """Saving a photo writes WebP and JPEG copies at each width, without EXIF."""
+        item = self._item(jpeg_upload())
+        manifest = Item.objects.get(pk=item.pk).photo_thumbnails
+        self.assertEqual(manifest["source"], item.photo.name)
+        for fmt, pil_format in (("webp", "WEBP"), ("jpeg", "JPEG")):
+            variants = manifest["variants"][fmt]
+            self.assertEqual([(v["width"], v["height"]) for v in variants], [(160, 120), (320, 240), (640, 480)])
+            for v in variants:
+                with item.photo.storage.open(v["name"]) as f, Image.open(f) as thumb:
+                    self.assertEqual(thumb.format, pil_format)
+                    self.assertEqual((thumb.width, thumb.height), (v["width"], v["height"]))
+                    self.assertFalse(thumb.getexif())
+
+    def test_small_photos_are_not_upscaled(self):
+        """Widths above the original are skipped."""
+        manifest = self._item(jpeg_upload(size=(200, 100))).photo_thumbnails
+        self.assertEqual([v["width"] for v in manifest["variants"]["jpeg"]], [160])
+
+    def test_replacing_photo_removes_old_thumbnails(self):
+        """A new photo rebuilds the manifest and deletes the previous files."""
+        item = self._item(jpeg_upload("first.jpg"))
+        old = [v["name"] for v in item.photo_thumbnails["variants"]["jpeg"]]
+        item.photo = jpeg_upload("second.jpg")
+        item.save()
+        process_jobs("test")
+        item.refresh_from_db()
+        self.assertIn("second", item.photo_thumbnails["source"])
+        for name in old:
+            self.assertFalse(item.photo.storage.exists(name))
+
+    def test_template_tag_emits_srcset(self):
+        """List pages reference thumbnails via srcset instead of the original upload."""
+        item = self._item(jpeg_upload())
+        html = Template("{% load item_images %}{% item_photo item %}").render(Context({"item": item}))
+        self.assertIn('type="image/webp"', html)
+        self.assertIn("-320w.jpg 320w", html)
+        # Intrinsic size of the largest copy, so CSS max-width decides the drawn size.
+        self.assertIn('width="640" height="480"', html)
+        self.assertNotIn(f'"{item.photo.url}"', html)
+
+    def test_build_thumbnails_backfills(self):
+        """The command builds thumbnails for photos saved before the pipeline existed."""
+        item = self._item(jpeg_upload())
+        Item.objects.filter(pk=item.pk).update(photo_thumbnails={})
+        out = StringIO()
+        call_command("build_thumbnails", stdout=out)
+        self.assertIn("Built thumbnails for 1 items", out.getvalue())
+        self.assertEqual(len(Item.objects.get(pk=item.pk).photo_thumbnails["variants"]["jpeg"]), 3)
@@ -0,0 +1,84 @@
+from datetime import date
+from importlib import import_module
+from io import StringIO
+
+from django.apps import apps
+from django.core.management import call_command
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+
+from items.models import Item, ItemToken, Category
+from items.matching import candidate_queryset, find_matches_for
+from items import token_index
+
+User = get_user_model()
+
+
+class TokenIndexTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="tester", password="testpass123")
+        self.electronics = Category.objects.create(name="Electronics")
+        self.lost = Item.objects.create(
+            owner=self.user,
+            status="LOST",
+            title="Silver Dell laptop",
+            category=self.electronics,
+            color_primary="Silver",
+            brand="Dell",
+            model_or_markings="Latitude 5400",
+            building="Mammel Hall",
+            room_or_area="MH 110",
+            date_lost_or_found=date.today(),
+            approved=True,
+        )
+        # Same laptop, logged under a different spelling of the building.
+        self.found = Item.objects.create(
+            owner=self.user,
+            status="FOUND",
+            title="Dell laptop",
+            category=self.electronics,
+            color_primary="Silver",
+            brand="Dell",
+            model_or_markings="Latitude 5400",
+            building="Mammel",
+            room_or_area="MH 110",
+            date_lost_or_found=date.today(),
+            approved=True,
+        )
+
+    def test_index_is_kept_current_on_save_and_delete(self):
+        """Saving replaces an item's tokens; deleting removes them."""
+        tokens = set(ItemToken.objects.filter(item=self.found).values_list("token", flat=True))
+        self.assertEqual(tokens, {"dell", "laptop", "latitude", "5400", "mh", "110"})
+
+        self.found.brand = "HP"
+        self.found.save()
+        self.assertTrue(ItemToken.objects.filter(item=self.found, token="hp").exists())
+
+        self.found.delete()
+        self.assertFalse(ItemToken.objects.filter(item_id=self.found.pk).exists())
+
+    def test_candidates_found_across_building_spellings(self):
+        """Shared tokens surface a candidate even when the building differs."""
+        candidates = list(candidate_queryset(self.lost))
+        self.assertEqual(candidates, [self.found])
+        self.assertGreater(candidates[0].token_weight, 0)
+        self.assertIn(self.found, [m[0] for m in find_matches_for(self.lost)])
+
+    def test_approval_scope_follows_bulk_update(self):
+        """set_approved keeps the index in step with queryset.update(approved=...)."""
+        Item.objects.filter(pk=self.found.pk).update(approved=False)
+        token_index.set_approved([self.found.pk], approved=False)
+        self.assertEqual(list(candidate_queryset(self.lost)), [])
+        self.assertEqual(list(candidate_queryset(self.lost, include_unapproved=True)), [self.found])
+
+    def test_rebuild_fills_index_for_existing_items(self):
+        """The rebuild command and the data migration index items that have no rows."""
+        expected = sorted(ItemToken.objects.values_list("item_id", "token", "weight"))
+        ItemToken.objects.all().delete()
+        call_command("rebuild_token_index", batch_size=1, stdout=StringIO())
+        self.assertEqual(sorted(ItemToken.objects.values_list("item_id", "token", "weight")), expected)
+
+        ItemToken.objects.all().delete()
+        import_module("items.migrations.0019_fill_item_tokens").fill_item_tokens(apps, None)
+        self.assertEqual(list(candidate_queryset(self.lost)), [self.found])
@@ -0,0 +1,92 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import RequestFactory, TestCase
+from django.urls import reverse
+
+from items import unread
+from items.checks import check_shared_caches
+from items.context_processors import unread_notifications
+from items.models import Category, Item, Match, Notification
+
+User = get_user_model()
+
+
+class UnreadCountTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.staff = User.objects.create_user(username="staff", password="testpass123", is_staff=True)
+        self.owner = User.objects.create_user(username="owner", password="testpass123")
+        category = Category.objects.create(name="Electronics")
+        lost = Item.objects.create(owner=self.owner, title="Phone", status=Item.LOST, category=category)
+        found = Item.objects.create(owner=self.staff, title="Phone", status=Item.FOUND, category=category)
+        self.match = Match.objects.create(lost_item=lost, found_item=found, score=70)
+
+    def _notify(self, n=1):
+        return [
+            Notification.objects.create(recipient=self.owner, title=f"N{i}", message="m")
+            for i in range(n)
+        ]
+
+    def _processor_count(self):
+        request = RequestFactory().get("/")
+        request.user = self.owner
+        return unread_notifications(request)["unread_notifications_count"]
+
+    def test_context_processor_is_free_once_cached(self):
+        """Only the first render counts; later renders read the cache."""
+        self._notify(3)
+        with self.assertNumQueries(1):
+            self.assertEqual(self._processor_count(), 3)
+        with self.assertNumQueries(0):
+            self.assertEqual(self._processor_count(), 3)
+
+    def test_notify_and_mark_read_adjust_the_count(self):
+        """notify_match increments and marking read decrements, without recounting."""
+        self.assertEqual(unread.unread_count(self.owner.id), 0)
+        self.client.login(username="staff", password="testpass123")
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse("items:notify_match", args=[self.match.id]), {"title": "T", "message": "M"})
+        with self.assertNumQueries(0):
+            self.assertEqual(unread.unread_count(self.owner.id), 1)
+
+        self.client.login(username="owner", password="testpass123")
+        notification = Notification.objects.get(recipient=self.owner)
+        for _ in range(2):  # a second click must not decrement again
+            with self.captureOnCommitCallbacks(execute=True):
+                self.client.get(reverse("items:notification_mark_read", args=[notification.id]))
+        with self.assertNumQueries(0):
+            self.assertEqual(unread.unread_count(self.owner.id), 0)
+
+    def test_mark_all_read(self):
+        """Mark-all-read clears every unread notification with one UPDATE."""
+        self._notify(4)
+        self.assertEqual(unread.unread_count(self.owner.id), 4)
+        self.client.login(username="owner", password="testpass123")
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(reverse("items:notifications_mark_all_read"))
+        self.assertRedirects(response, reverse("items:notifications"))
+        self.assertFalse(Notification.objects.filter(is_read=False).exists())
+        self.assertEqual(unread.unread_count(self.owner.id), 0)
+
+    def test_reconcile_command_corrects_drift(self):
+        """The reconciler rewrites stale cached counts from the database."""
+        self._notify(2)
+        self.assertEqual(unread.unread_count(self.owner.id), 2)
+        Notification.objects.all().delete()  # bypasses the counter
+        cache.set(f"unread-notifications:{self.staff.id}", 5)
+
+        out = StringIO()
+        call_command("reconcile_unread_counts", stdout=out)
+        self.assertIn("Reconciled 2 users", out.getvalue())
+        self.assertEqual(unread.unread_count(self.owner.id), 0)
+        self.assertEqual(unread.unread_count(self.staff.id), 0)
+
+    def test_deploy_check_flags_per_process_cache(self):
+        """check --deploy warns when the counts live in a per-process cache."""
+        self.assertIn("items.W001", [w.id for w in check_shared_caches(None)])
+        shared = {"default": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"}}
+        with self.settings(CACHES=shared):
+            self.assertEqual(check_shared_caches(None), [])
@@ -0,0 +1,129 @@
+"""
+Resized, EXIF-stripped derivatives of item photos.
+
+generate(item) writes WebP and JPEG copies of item.photo at each width in
+settings.ITEM_THUMBNAIL_WIDTHS (never upscaling) next to the upload, under
+thumbs/, and stores a manifest of them on item.photo_thumbnails:
+
+    {"source": "items/phone.jpg",
+     "variants": {"webp": [{"width": 160, "height": 120, "name": "thumbs/items/phone-160w.webp"}, ...],
+                  "jpeg": [...]}}
+
+Saving an item with a new photo queues a thumbnail job (items.jobs), so
+the resizing happens in run_match_worker rather than the upload request;
+until it runs, pages show the original upload. The build_thumbnails
+command backfills existing photos.
+"""
+import logging
+import os
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WIDTHS = (160, 320, 640)
+
+# Format name in the manifest -> (Pillow format, file extension, save options)
+FORMATS = {
+    "webp": ("WEBP", "webp", {"quality": 78, "method": 4}),
+    "jpeg": ("JPEG", "jpg", {"quality": 82, "optimize": True, "progressive": True}),
+}
+
+
+def thumbnail_widths():
+    return sorted(getattr(settings, "ITEM_THUMBNAIL_WIDTHS", DEFAULT_WIDTHS))
+
+
+def _target_widths(width):
+    widths = [w for w in thumbnail_widths() if w < width]
+    # Always keep one copy, at most the original width, so small photos are
+    # still re-encoded without their metadata.
+    return widths or [min(width, thumbnail_widths()[0])]
+
+
+def _thumb_name(source, width, ext):
+    base, _ = os.path.splitext(source)
+    return f"thumbs/{base}-{width}w.{ext}"
+
+
+def _open(photo):
+    photo.open("rb")
+    try:
+        image = Image.open(photo)
+        # Decode JPEGs at a reduced scale when the largest thumbnail allows it.
+        image.draft("RGB", (max(thumbnail_widths()), max(thumbnail_widths())))
+        image = ImageOps.exif_transpose(image)
+        image.load()
+    finally:
+        photo.close()
+    return image
+
+
+def _has_alpha(image):
+    return image.mode in ("RGBA", "LA", "PA") or "transparency" in image.info
+
+
+def _encode(image, fmt):
+    pil_format, _ext, options = FORMATS[fmt]
+    mode = "RGBA" if fmt == "webp" and _has_alpha(image) else "RGB"
+    if image.mode != mode:
+        image = image.convert(mode)
+    buf = BytesIO()
+    # No exif= argument, so EXIF (GPS position, camera serial...) is dropped.
+    image.save(buf, pil_format, **options)
+    return buf.getvalue()
+
+
+def delete_thumbnails(manifest, storage):
+    for variants in manifest.get("variants", {}).values():
+        for variant in variants:
+            storage.delete(variant["name"])
+
+
+def generate(item):
+    """Write thumbnails for item.photo and return the manifest (not saved)."""
+    photo = item.photo
+    storage = photo.storage
+    image = _open(photo)
+    manifest = {"source": photo.name, "variants": {}}
+    for width in _target_widths(image.width):
+        height = max(1, round(image.height * width / image.width))
+        resized = image.resize((width, height), Image.LANCZOS)
+        for fmt, (_pil, ext, _options) in FORMATS.items():
+            name = _thumb_name(photo.name, width, ext)
+            storage.delete(name)
+            name = storage.save(name, ContentFile(_encode(resized, fmt)))
+            manifest["variants"].setdefault(fmt, []).append({"width": width, "height": height, "name": name})
+    return manifest
+
+
+def is_stale(item):
+    """Whether item.photo_thumbnails was built for a different photo (or none)."""
+    source = item.photo.name if item.photo else ""
+    return (item.photo_thumbnails or {}).get("source", "") != source
+
+
+def ensure_thumbnails(item):
+    """
+    Bring item.photo_thumbnails in line with item.photo, regenerating when
+    the photo changed and removing stale files. Returns whether it changed.
+    """
+    if not is_stale(item):
+        return False
+    manifest = item.photo_thumbnails or {}
+    source = item.photo.name if item.photo else ""
+    storage = item.photo.storage
+    delete_thumbnails(manifest, storage)
+    new = {}
+    if source:
+        try:
+            new = generate(item)
+        except (OSError, UnidentifiedImageError, Image.DecompressionBombError):
+            logger.exception("Could not build thumbnails for item %s (%s)", item.pk, source)
+            new = {"source": source, "variants": {}}
+    item.photo_thumbnails = new
+    type(item).objects.filter(pk=item.pk).update(photo_thumbnails=new)
+    return True
@@ -0,0 +1,104 @@
+"""
+Inverted token index used to generate match candidates.
+
+Each item's brand, model/markings, title and room tokens are stored as
+ItemToken rows. Candidates for an item are the opposite-status items that
+share the most token weight with it.
+"""
+from django.db.models import Sum
+
+from .features import norm
+from .models import Item, ItemToken
+
+# Weight of a shared token, by the field it came from. Defined on Item so
+# that edits to these fields trigger a full candidate search.
+FIELD_WEIGHTS = Item.TOKEN_FIELD_WEIGHTS
+
+
+def item_tokens(item):
+    """Map of token -> weight for an item (weights add up across fields)."""
+    weights = {}
+    for field, weight in FIELD_WEIGHTS:
+        for tok in {t[:80] for t in norm(getattr(item, field))}:
+            weights[tok] = weights.get(tok, 0.0) + weight
+    return weights
+
+
+def _rows(item, token_model=ItemToken):
+    return [
+        token_model(
+            item_id=item.pk,
+            token=tok,
+            weight=weight,
+            status=item.status,
+            category_id=item.category_id,
+            approved=item.approved,
+        )
+        for tok, weight in item_tokens(item).items()
+    ]
+
+
+def index_item(item):
+    """Replace the index rows of one saved item."""
+    ItemToken.objects.filter(item_id=item.pk).delete()
+    ItemToken.objects.bulk_create(_rows(item))
+
+
+def index_items(items, batch_size=1000, token_model=ItemToken):
+    """Replace the index rows of many saved items."""
+    items = list(items)
+    token_model.objects.filter(item_id__in=[i.pk for i in items]).delete()
+    token_model.objects.bulk_create(
+        [row for item in items for row in _rows(item, token_model)], batch_size=batch_size
+    )
+
+
+def rebuild(item_model=Item, token_model=ItemToken, batch_size=500):
+    """
+    Re-index every item (the models can be historical ones in a migration),
+    walking the table in pk order one batch at a time so no cursor is open
+    while a batch is written. Returns the number of items indexed.
+    """
+    indexed, last_pk = 0, 0
+    while True:
+        batch = list(item_model.objects.filter(pk__gt=last_pk).order_by("pk")[:batch_size])
+        if not batch:
+            return indexed
+        index_items(batch, token_model=token_model)
+        indexed += len(batch)
+        last_pk = batch[-1].pk
+
+
+def set_approved(item_ids, approved=True):
+    """Keep the index scope in step with Item.objects.filter(...).update(approved=...)."""
+    ItemToken.objects.filter(item_id__in=item_ids).update(approved=approved)
+
+
+def ranked_candidate_ids(item, status, start, end, include_unapproved=False, limit=50):
+    """
+    Ids of `status` items in the same category and date window as `item`,
+    ranked by the total weight of the tokens they share with it.
+
+    Returns a list of (item_id, shared_weight), best first.
+    """
+    tokens = item_tokens(item)
+    if not tokens:
+        return []
+
+    qs = ItemToken.objects.filter(
+        token__in=list(tokens),
+        status=status,
+        category_id=item.category_id,
+        item__date_lost_or_found__range=(start, end),
+    )
+    if not include_unapproved:
+        qs = qs.filter(approved=True)
+    if item.pk:
+        qs = qs.exclude(item_id=item.pk)
+
+    rows = (
+        qs.values("item_id")
+        .annotate(shared=Sum("weight"))
+        .order_by("-shared", "-item_id")[:limit]
+    )
+    return [(r["item_id"], r["shared"]) for r in rows]
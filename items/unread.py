@@ -0,0 +1,88 @@
+"""
+Per-user unread notification counts, kept in the cache.
+
+A count is computed with one COUNT on a cache miss and then adjusted in
+place as notifications are created and read, so the navbar badge costs no
+queries. Entries expire after settings.UNREAD_COUNT_TIMEOUT, and the
+reconcile_unread_counts command rewrites them from the database to correct
+drift (e.g. notifications removed by a cascade delete). Configure the cache
+alias with settings.UNREAD_COUNT_CACHE; it must be shared between workers
+(prod settings use Redis), or an increment in one worker never reaches the
+others. `manage.py check --deploy` warns about a per-process cache.
+"""
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models import Count
+from django.utils import timezone
+
+from .models import Notification
+
+
+def _cache():
+    return caches[getattr(settings, "UNREAD_COUNT_CACHE", "default")]
+
+
+def _timeout():
+    return getattr(settings, "UNREAD_COUNT_TIMEOUT", 86400)
+
+
+def _key(user_id):
+    return f"unread-notifications:{user_id}"
+
+
+def count_unread(user_id):
+    """Unread count straight from the database."""
+    return Notification.objects.filter(recipient_id=user_id, is_read=False).count()
+
+
+def unread_count(user_id):
+    cache = _cache()
+    value = cache.get(_key(user_id))
+    if value is None or value < 0:
+        value = count_unread(user_id)
+        cache.set(_key(user_id), value, _timeout())
+    return value
+
+
+def adjust(user_id, delta):
+    """
+    Add `delta` to a user's cached count once the current transaction
+    commits. A missing entry is left missing; the next read recounts.
+    """
+    def apply():
+        try:
+            _cache().incr(_key(user_id), delta)
+        except ValueError:
+            pass
+    transaction.on_commit(apply)
+
+
+def mark_read(notification_id, user_id):
+    """Mark one notification read; returns whether it was unread."""
+    updated = Notification.objects.filter(
+        id=notification_id, recipient_id=user_id, is_read=False
+    ).update(is_read=True, updated_at=timezone.now())
+    if updated:
+        adjust(user_id, -1)
+    return bool(updated)
+
+
+def mark_all_read(user_id):
+    """Mark all of a user's notifications read with one UPDATE; returns how many changed."""
+    updated = Notification.objects.filter(recipient_id=user_id, is_read=False).update(is_read=True, updated_at=timezone.now())
+    transaction.on_commit(lambda: _cache().set(_key(user_id), 0, _timeout()))
+    return updated
+
+
+def reconcile(user_ids):
+    """Rewrite the cached counts of `user_ids` from the database; returns the counts."""
+    user_ids = list(user_ids)
+    counts = dict.fromkeys(user_ids, 0)
+    counts.update(
+        Notification.objects.filter(recipient_id__in=user_ids, is_read=False)
+        .values_list("recipient_id")
+        .annotate(n=Count("id"))
+    )
+    _cache().set_many({_key(user_id): n for user_id, n in counts.items()}, _timeout())
+    return counts
@@ -1,5 +1,5 @@
 from django.urls import path
-from . import views
+from . import api, views
 app_name = 'items'
 
 urlpatterns = [
@@ -13,7 +13,14 @@ urlpatterns = [
   path('admin-review/matches/', views.match_review, name='match_review'),
   path("staff/review-items/", views.review_items, name="review_items"),
   path("staff/notify-match/<int:match_id>/", views.notify_match, name="notify_match"),
+  path("staff/export/<slug:dataset>/", views.export_data, name="export_data"),
   path("notifications/", views.notifications, name="notifications"),
   path("notifications/<int:notif_id>/read/", views.notification_mark_read, name="notification_mark_read"),
+  path("notifications/stream/", views.notification_stream, name="notification_stream"),
+  path("notifications/read-all/", views.notifications_mark_all_read, name="notifications_mark_all_read"),
+  path("api/items/", api.items, name="api_items"),
+  path("api/items/<int:pk>/", api.item, name="api_item"),
+  path("api/matches/", api.matches, name="api_matches"),
+  path("api/notifications/", api.notifications, name="api_notifications"),
 
 ]
@@ -4,30 +4,72 @@ from django.contrib.auth import login
 from django.contrib.auth.forms import UserCreationForm
 from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib import messages
-from django.core.mail import send_mail
-from django.db.models import Q
+from django.core.paginator import Paginator
+from django.db.models import Prefetch, prefetch_related_objects
 from django.db import transaction
-from django.http import HttpResponseForbidden
-from django.shortcuts import render, redirect
+from django.http import Http404, HttpResponse, HttpResponseBadRequest, HttpResponseForbidden, QueryDict, StreamingHttpResponse
+from django.views.decorators.http import require_POST
+from django.template.loader import render_to_string
+from django.utils.cache import get_conditional_response, patch_cache_control, quote_etag
+from django.utils.http import http_date
+from django.utils import timezone
 from django.urls import reverse
-from .models import Item, Match, Notification, Profile
+from .models import Category, Item, Match, Notification, Profile
 from .forms import ItemForm, ProfileForm, NotifyMatchForm, UserProfileForm
-from .matching import find_matches_for
+from . import exports, live, outbox, page_cache, search, token_index, unread
+from .streaming import streaming_body
+from .jobs import enqueue_match_job, enqueue_match_jobs, refresh_matches_after_edit
 from .forms_auth import SignupForm
+from .pagination import KeysetPaginator
+from .signals import announce_notifications, items_approved
+from asgiref.sync import sync_to_async
+from collections import defaultdict
+import hashlib
 import logging
 
 logger = logging.getLogger(__name__)
 
 def home(request):
-    items = Item.objects.filter(approved=True)[:12]
-    return render(request, 'items/home.html', {'items': items})
+    # The lazy queryset only runs when the fragment isn't cached.
+    recent_items = page_cache.cached_fragment('home', lambda: render_to_string(
+        'items/_home_items.html', {'items': Item.objects.filter(approved=True).select_related('category')[:12]},
+    ))
+    return render(request, 'items/home.html', {'recent_items': recent_items})
+
+ITEMS_PER_PAGE = 24
+NOTIFICATIONS_PER_PAGE = 25
+REVIEW_PER_PAGE = 25
 
 def item_list(request):
     q = request.GET.get('q',''); status = request.GET.get('status','')
-    qs = Item.objects.filter(approved=True)
-    if q: qs = qs.filter(Q(title__icontains=q)|Q(description__icontains=q)|Q(brand__icontains=q))
-    if status in ('LOST','FOUND','CLAIMED'): qs = qs.filter(status=status)
-    return render(request, 'items/item_list.html', {'items': qs, 'q': q, 'status': status})
+    category = request.GET.get('category',''); building = request.GET.get('building','')
+    qs = search.filter_items(Item.objects.filter(approved=True).select_related('category'), request.GET)
+
+    # Results are cached per filter/page combination; other query
+    # parameters are dropped so they neither split the cache nor leak
+    # into the cached pager links.
+    params = QueryDict(mutable=True)
+    for name in ('q', 'status', 'category', 'building', 'page', 'cursor'):
+        if request.GET.get(name):
+            params[name] = request.GET[name]
+
+    def render_results():
+        if q:
+            # Search results are ranked, so they page by number.
+            page = Paginator(search.search(qs, q), ITEMS_PER_PAGE).get_page(params.get('page'))
+        else:
+            page = KeysetPaginator(qs, ('-date_reported', '-id'), ITEMS_PER_PAGE).get_page(params)
+        filters = params.copy()
+        filters.pop('page', None)
+        return render_to_string('items/_item_list_results.html', {
+            'items': page.object_list, 'page': page, 'filters': filters.urlencode(), 'q': q,
+        })
+
+    return render(request, 'items/item_list.html', {
+        'results': page_cache.cached_fragment('item_list', render_results, params.dict()),
+        'q': q, 'status': status, 'category': category, 'building': building,
+        'categories': Category.objects.order_by('name'),
+    })
 
 @login_required
 def item_create(request):
@@ -40,16 +82,8 @@ def item_create(request):
                     item.owner = request.user
                     # New posts start unapproved
                     item.save()
-                    try:
-                        # Only compare against approved items
-                        for other, score in find_matches_for(item, include_unapproved=False):
-                            if item.status == "LOST":
-                                Match.objects.get_or_create(lost_item=item, found_item=other, defaults={"score": score})
-                            else:
-                                Match.objects.get_or_create(lost_item=other, found_item=item, defaults={"score": score})
-                    except Exception as e:
-                        logger.exception("Match generation failed for item %s: %s", item.pk, e)
-                        messages.warning(request, "Item posted, but match generation will run later.")
+                    # Matches are generated by the match worker; only compare against approved items
+                    enqueue_match_job(item, include_unapproved=False)
 
                 messages.success(request, "Item posted successfully and awaiting approval.")
                 return redirect("items:item_detail", pk=item.pk)
@@ -63,15 +97,37 @@ def item_create(request):
         form = ItemForm()
     return render(request, "items/item_form.html", {"form": form})
 
+def _item_detail_etag(request, item):
+    """
+    ETag for a non-owner's view of an item: the item's own state plus what
+    the page chrome shows for this visitor (who they are, their unread badge).
+    """
+    parts = [item.pk, item.updated_at.isoformat(), item.category_id]
+    if request.user.is_authenticated:
+        parts += [request.user.pk, unread.unread_count(request.user.id)]
+    return hashlib.md5(repr(parts).encode()).hexdigest()
+
 def item_detail(request, pk):
-    item = get_object_or_404(Item, pk=pk)
+    item = get_object_or_404(Item.objects.select_related('category'), pk=pk)
     matches = []
-    if request.user.is_authenticated and request.user == item.owner:
+    if request.user.is_authenticated and request.user.id == item.owner_id:
+        # The owner also sees matches, which change without touching the item.
         if item.status == 'LOST':
-            matches = Match.objects.filter(lost_item=item).select_related('found_item')
+            matches = Match.objects.filter(lost_item=item).exclude(status=Match.RETIRED).select_related('found_item')
         elif item.status == 'FOUND':
-            matches = Match.objects.filter(found_item=item).select_related('lost_item')
-    return render(request, 'items/item_detail.html', {'item': item, 'matches': matches})
+            matches = Match.objects.filter(found_item=item).exclude(status=Match.RETIRED).select_related('lost_item')
+        return render(request, 'items/item_detail.html', {'item': item, 'matches': matches})
+
+    etag = quote_etag(_item_detail_etag(request, item))
+    last_modified = int(item.updated_at.timestamp())
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is None:
+        response = render(request, 'items/item_detail.html', {'item': item, 'matches': matches})
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    # Let browsers keep the page but revalidate it (cheaply, via 304) each time.
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
 
 @user_passes_test(lambda u: u.is_staff)
 def match_review(request):
@@ -117,7 +173,11 @@ def my_account(request):
         user_form = ProfileForm(instance=request.user)
         prof_form = UserProfileForm(instance=profile)
 
-    my_items = Item.objects.filter(owner=request.user).order_by("-date_reported")
+    my_items = KeysetPaginator(
+        Item.objects.filter(owner=request.user).select_related("category"),
+        ("-date_reported", "-id"),
+        ITEMS_PER_PAGE,
+    ).get_page(request.GET)
 
     return render(
         request,
@@ -126,6 +186,7 @@ def my_account(request):
             "user_form": user_form,
             "profile_form": prof_form,
             "my_items": my_items,
+            "page": my_items,
         },
     )
 
@@ -137,7 +198,10 @@ def item_update(request, pk):
     if request.method == "POST":
         form = ItemForm(request.POST, request.FILES, instance=item)
         if form.is_valid():
-            form.save()
+            changed = item.changed_match_fields()
+            with transaction.atomic():
+                form.save()
+                refresh_matches_after_edit(item, changed)
             messages.success(request, "Item updated.")
             return redirect("items:item_detail", pk=item.pk)
     else:
@@ -155,23 +219,105 @@ def item_delete(request, pk):
 
 @login_required
 def notifications(request):
-    qs = Notification.objects.filter(recipient=request.user).order_by("-created_at")
-    return render(request, "items/notifications.html", {"notifications": qs})
+    page = KeysetPaginator(
+        Notification.objects.filter(recipient=request.user),
+        ("-created_at", "-id"),
+        NOTIFICATIONS_PER_PAGE,
+    ).get_page(request.GET)
+    return render(request, "items/notifications.html", {"notifications": page, "page": page})
 
 @login_required
 def notification_mark_read(request, notif_id):
     n = get_object_or_404(Notification, id=notif_id, recipient=request.user)
-    n.is_read = True
-    n.save(update_fields=["is_read"])
+    if not n.is_read:
+        unread.mark_read(n.id, request.user.id)
     if n.url:
         return redirect(n.url)
     return redirect("items:notifications")
 
+def _stream_user_id(request):
+    return request.user.id if request.user.is_authenticated else None
+
+async def notification_stream(request):
+    """Server-sent events with the user's new notifications; see items.live."""
+    # 204 tells EventSource not to reconnect.
+    if not live.stream_enabled(request):
+        return HttpResponse(status=204)
+    user_id = await sync_to_async(_stream_user_id)(request)
+    if user_id is None:
+        return HttpResponse(status=204)
+    last_event_id = request.headers.get("Last-Event-ID") or request.GET.get("last_event_id")
+    last_event_id = int(last_event_id) if last_event_id and last_event_id.isdigit() else None
+    response = StreamingHttpResponse(live.event_stream(user_id, last_event_id), content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"  # don't let nginx buffer the stream
+    return response
+
+@login_required
+@require_POST
+def notifications_mark_all_read(request):
+    count = unread.mark_all_read(request.user.id)
+    if count:
+        messages.success(request, f"Marked {count} notification(s) as read.")
+    return redirect("items:notifications")
+
+REVIEW_SORTS = {
+    "newest": ("-date_reported", "-id"),
+    "oldest": ("date_reported", "id"),
+    "score": ("-best_match_score", "-id"),
+}
+REVIEW_MATCHES_PER_ITEM = 5
+
+
+def _review_page(request, approved, sort, param):
+    return KeysetPaginator(
+        Item.objects.filter(approved=approved).select_related("category"),
+        REVIEW_SORTS[sort],
+        REVIEW_PER_PAGE,
+    ).get_page(request.GET, param=param)
+
+
+def _prefetch_stored_matches(items):
+    """Load the items' non-retired matches, best first, in one query per side."""
+    stored = (
+        Match.objects.exclude(status=Match.RETIRED)
+        .select_related("lost_item", "found_item")
+        .order_by("-score")
+    )
+    prefetch_related_objects(
+        items,
+        Prefetch("lost_matches", queryset=stored, to_attr="review_lost_matches"),
+        Prefetch("found_matches", queryset=stored, to_attr="review_found_matches"),
+    )
+
+
+def _stored_matches(item):
+    matches = item.review_lost_matches + item.review_found_matches
+    return sorted(matches, key=lambda m: m.score, reverse=True)
+
+
+def _apply_match_statuses(post):
+    """Apply match_status_<id> fields with one UPDATE per target status."""
+    ids_by_status = defaultdict(set)
+    for key, value in post.items():
+        match_id = key.removeprefix("match_status_")
+        if match_id == key or not match_id.isdigit():
+            continue
+        if value in (Match.PENDING, Match.CONFIRMED, Match.REJECTED):
+            ids_by_status[value].add(int(match_id))
+
+    updated = 0
+    with transaction.atomic():
+        for status, ids in ids_by_status.items():
+            updated += Match.objects.filter(id__in=ids).exclude(status=status).update(
+                status=status, updated_at=timezone.now(),
+            )
+    return updated
+
+
 @staff_member_required
 def review_items(request):
 
-    pending_items = Item.objects.filter(approved=False).order_by("-date_reported")
-
     if request.method == "POST":
         action = request.POST.get("action")
 
@@ -181,60 +327,51 @@ def review_items(request):
                 messages.warning(request, "No items selected for approval.")
             else:
                 qs = Item.objects.filter(id__in=ids)
-                count = qs.update(approved=True)
+                count = qs.update(approved=True, updated_at=timezone.now())
+                token_index.set_approved(ids)
+                items_approved.send(sender=Item, item_ids=ids)
+                enqueue_match_jobs(qs, include_unapproved=True)
                 messages.success(request, f"Approved {count} item(s).")
 
-        updated_matches = 0
-        valid_statuses = {Match.PENDING, Match.CONFIRMED, Match.REJECTED}
-        for key, value in request.POST.items():
-            if not key.startswith("match_status_"):
-                continue
-            if not value:
-                continue
-
-            match_id = key.replace("match_status_", "", 1)
-            try:
-                match_obj = Match.objects.get(id=match_id)
-            except Match.DoesNotExist:
-                continue
-
-            if value in valid_statuses and match_obj.status != value:
-                match_obj.status = value
-                match_obj.save(update_fields=["status"])
-                updated_matches += 1
-
+        updated_matches = _apply_match_statuses(request.POST)
         if updated_matches:
             messages.success(request, f"Updated {updated_matches} match(es).")
 
-        return redirect("items:review_items")
+        return redirect(request.get_full_path())
+
+    sort = request.GET.get("sort")
+    if sort not in REVIEW_SORTS:
+        sort = "newest"
+
+    pending_items = _review_page(request, False, sort, "pending_cursor")
+    approved_items = _review_page(request, True, sort, "approved_cursor")
+    _prefetch_stored_matches([*pending_items, *approved_items])
 
-    # Pending items + potential matches
-    items_with_matches = []
-    for item in pending_items:
-        raw_matches = find_matches_for(item, include_unapproved=True)
-        items_with_matches.append({
+    # Pending items + their best stored candidate matches
+    items_with_matches = [
+        {
             "item": item,
             "matches": [
-                {"item": m[0], "score": m[1]}
-                for m in raw_matches[:5]
+                {"item": m.found_item if m.lost_item_id == item.id else m.lost_item, "score": m.score}
+                for m in _stored_matches(item)[:REVIEW_MATCHES_PER_ITEM]
             ],
-        })
+        }
+        for item in pending_items
+    ]
 
     # Approved items + existing matched items
-    approved_items = Item.objects.filter(approved=True).order_by("-date_reported")
-    approved_items_with_matches = []
-    for item in approved_items:
-        matches = Match.objects.filter(
-            Q(lost_item=item) | Q(found_item=item)
-        ).select_related("lost_item", "found_item").order_by("-score")
-        approved_items_with_matches.append({
-            "item": item,
-            "matches": matches,
-        })
+    approved_items_with_matches = [
+        {"item": item, "matches": _stored_matches(item)}
+        for item in approved_items
+    ]
 
     context = {
         "items_with_matches": items_with_matches,
         "approved_items_with_matches": approved_items_with_matches,
+        "pending_page": pending_items,
+        "approved_page": approved_items,
+        "sort": sort,
+        "sort_choices": [("newest", "Newest"), ("oldest", "Oldest"), ("score", "Best match score")],
     }
     return render(request, "items/review_items.html", context)
 
@@ -276,19 +413,47 @@ def notify_match(request, match_id):
             title = form.cleaned_data["title"]
             message_text = form.cleaned_data["message"]
 
-            for u in recipients:
-                Notification.objects.create(
-                    recipient=u,
-                    match=match,
-                    title=title,
-                    message=message_text,
-                    url=match_url,
-                    created_by=request.user,
-                )
-
-            messages.success(request, f"In-app notification created for {len(recipients)} user(s).")
+            with transaction.atomic():
+                notifications = Notification.objects.bulk_create([
+                    Notification(
+                        recipient=u,
+                        match=match,
+                        title=title,
+                        message=message_text,
+                        url=match_url,
+                        created_by=request.user,
+                    )
+                    for u in recipients
+                ])
+                # bulk_create sends no post_save, so do what the signal would.
+                announce_notifications(notifications)
+                # Email goes out from run_outbox_worker, not this request.
+                queued = outbox.enqueue_notifications(notifications)
+
+            messages.success(
+                request,
+                f"In-app notification created for {len(recipients)} user(s); {queued} message(s) queued for delivery.",
+            )
             return redirect("items:review_items")
     else:
         form = NotifyMatchForm(initial={"title": default_title, "message": default_message})
 
     return render(request, "items/notify_match.html", {"match": match, "form": form, "recipients": recipients})
+
+@staff_member_required
+def export_data(request, dataset):
+    """Stream a dataset as CSV or NDJSON (?format=), filtered like item_list; see items.exports."""
+    if dataset not in exports.DATASETS:
+        raise Http404("Unknown export")
+    fmt = request.GET.get("format", "csv")
+    if fmt not in exports.FORMATS:
+        return HttpResponseBadRequest("format must be csv or ndjson")
+    try:
+        qs = exports.export_queryset(dataset, request.GET)
+    except ValueError as e:
+        return HttpResponseBadRequest(str(e))
+    body = streaming_body(request, exports.stream(dataset, fmt, qs))
+    response = StreamingHttpResponse(body, content_type=exports.FORMATS[fmt])
+    filename = f"mavfinder-{dataset}-{timezone.localdate():%Y%m%d}.{fmt}"
+    response["Content-Disposition"] = f'attachment; filename="{filename}"'
+    return response
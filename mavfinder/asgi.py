@@ -1,3 +1,5 @@
+# Serve this app (e.g. `uvicorn mavfinder.asgi:application`) to keep
+# notification streams (items.live) off worker threads.
 import os
 from django.core.asgi import get_asgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE','mavfinder.settings.base')
@@ -20,6 +20,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # Outermost, so session and auth queries are counted too.
+    "items.middleware.QueryStatsMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -29,6 +31,11 @@ MIDDLEWARE = [
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
 
+# Per-request query count/time headers and N+1 warnings (see
+# items.middleware.QueryStatsMiddleware); on by default when DEBUG is.
+QUERY_STATS_ENABLED = DEBUG
+QUERY_STATS_WARN_QUERIES = 30
+
 ROOT_URLCONF = "mavfinder.urls"
 
 TEMPLATES = [
@@ -42,6 +49,7 @@ TEMPLATES = [
                 "django.template.context_processors.request",
                 "django.contrib.auth.context_processors.auth",
                 "django.contrib.messages.context_processors.messages",
+                "items.context_processors.unread_notifications",
             ],
         },
     },
@@ -76,10 +84,56 @@ STATICFILES_DIRS = [BASE_DIR / "static"]
 MEDIA_URL = "/media/"
 MEDIA_ROOT = BASE_DIR / "media"
 
+# Media/static serving (items.file_serving). Set FILE_SERVING_SENDFILE to
+# "x-sendfile" (Apache) or "x-accel-redirect" (nginx, with
+# FILE_SERVING_ACCEL_LOCATIONS mapping each document root to an internal
+# location) to hand file bodies to the front-end server.
+FILE_SERVING_SENDFILE = None
+FILE_SERVING_ACCEL_LOCATIONS = {}
+FILE_SERVING_MAX_AGE = 3600
+
+# Widths of the WebP/JPEG thumbnails built for item photos (items.thumbnails).
+ITEM_THUMBNAIL_WIDTHS = (160, 320, 640)
+
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
+# Title/description similarity for matching: "trigram" compares precomputed
+# signatures; "sequence" runs difflib.SequenceMatcher on the raw text.
+MATCH_FUZZY_ENGINE = "trigram"
+
+# Cache of pair score breakdowns. "memory" is a per-process LRU; use
+# {"BACKEND": "django", "ALIAS": "default"} to share it between workers.
+MATCH_PAIR_CACHE = {"BACKEND": "memory", "MAX_ENTRIES": 10000}
+
+# Cached per-user unread notification counts (items.unread); run the
+# reconcile_unread_counts command periodically to correct drift.
+UNREAD_COUNT_CACHE = "default"
+UNREAD_COUNT_TIMEOUT = 86400
+
+# Live notification stream (items.live). Only enable it when the site is
+# served by the ASGI app (mavfinder/asgi.py): under WSGI a stream can't be
+# sent until it ends. The in-process broker only reaches streams in the
+# same process; multi-worker deployments need a shared one.
+NOTIFICATION_STREAM_ENABLED = False
+NOTIFICATION_BROKER = "items.live.InProcessBroker"
+NOTIFICATION_STREAM_HEARTBEAT = 15
+NOTIFICATION_STREAM_MAX_AGE = 600
+
+# Versioned cache of the home/item_list result fragments (items.page_cache),
+# invalidated by item and category changes. None disables it.
+PUBLIC_PAGE_CACHE = "default"
+PUBLIC_PAGE_CACHE_TIMEOUT = 3600
+
 # Dev-friendly email: prints emails to your terminal
 EMAIL_BACKEND = "django.core.mail.backends.console.EmailBackend"
 DEFAULT_FROM_EMAIL = "mavfinder@localhost"
 
+# Outbound notifications (items.outbox), delivered by run_outbox_worker.
+# Channels map Profile contact methods to sender classes; a user's messages
+# within OUTBOX_DIGEST_WINDOW seconds go out as one digest.
+OUTBOX_CHANNELS = {"EMAIL": "items.outbox.EmailSender"}
+OUTBOX_DIGEST_WINDOW = 60
+OUTBOX_RATE_LIMIT = None  # messages per second
+SITE_URL = "http://localhost:8000"
+
 
@@ -1,6 +1,25 @@
+import os
+
 from .base import *  # noqa
 DEBUG = False
 ALLOWED_HOSTS = ["yourdomain.com"]
 SECURE_PROXY_SSL_HEADER = ("HTTP_X_FORWARDED_PROTO", "https")
 SESSION_COOKIE_SECURE = True
 CSRF_COOKIE_SECURE = True
+QUERY_STATS_ENABLED = False
+
+# Unread counts (items.unread) and listing fragments (items.page_cache) are
+# adjusted in place, so every worker has to see the same cache.
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": os.environ.get("REDIS_URL", "redis://127.0.0.1:6379/1"),
+    }
+}
+
+# Hashed static names (styles.1a2b3c4d5e6f.css) are served with far-future
+# immutable caching; run collectstatic and then compress_static on deploy.
+STORAGES = {
+    "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+    "staticfiles": {"BACKEND": "django.contrib.staticfiles.storage.ManifestStaticFilesStorage"},
+}
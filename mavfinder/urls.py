@@ -1,17 +1,16 @@
 from django.contrib import admin
 from django.urls import path, include, re_path
 from django.views.generic import RedirectView
-from django.views.static import serve
 from django.conf import settings
-from django.conf.urls.static import static
+from items import file_serving
 from items import views as item_views
 
 urlpatterns = [
     path('admin/', admin.site.urls),
-    re_path(r'^media/(?P<path>.*)$', serve, {'document_root':
-    settings.MEDIA_ROOT}), #serve media files when deployed
-    re_path(r'^static/(?P<path>.*)$', serve, {'document_root':
-    settings.STATIC_ROOT}), #serve static files when deployed
+    # Media and collected static files when deployed without a separate file
+    # server; see items.file_serving for Range/ETag/sendfile support.
+    re_path(r'^media/(?P<path>.*)$', file_serving.serve, {'document_root': settings.MEDIA_ROOT}),
+    re_path(r'^static/(?P<path>.*)$', file_serving.serve, {'document_root': settings.STATIC_ROOT}),
 
     # Auth
     path('accounts/', include('django.contrib.auth.urls')),
@@ -21,11 +20,3 @@ urlpatterns = [
     # App
     path('', include(('items.urls', 'items'), namespace='items')),
 ]
-
-
-if settings.DEBUG:
-    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
-
-urlpatterns += [
-    re_path(r'^media/(?P<path>.*)$', serve, {'document_root': settings.MEDIA_ROOT}),
-]